@@ -7,16 +7,18 @@ import time
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from signalry.classify import MockClassifier
 from signalry.connectors import get_registry
 from signalry.connectors.realistic_mock import RealisticMockConnector
+from signalry.crosssource import CrossSourceIndex
 from signalry.filter import filter_signals
 from signalry.models import Outcome, ResponseType
 from signalry.momentum import detect_momentum, get_momentum_summary
+from signalry.pains import PainIndex
 from signalry.pipeline import Pipeline
 from signalry.queue import ReviewQueue
 
@@ -55,6 +57,8 @@ def verify_token(token: str) -> bool:
 
 queue = ReviewQueue()
 pipeline = Pipeline(queue=queue)
+pains = pipeline.pains
+cross_sources = CrossSourceIndex(pains).attach(queue)
 registry = get_registry()
 
 class RunRequest(BaseModel):
@@ -108,6 +112,14 @@ def discard_signal(signal_id: str):
 def get_stats():
     return queue.stats()
 
+@app.get("/clusters/cross-source")
+def cross_source_clusters(hours: float = 48, min_sources: int = Query(2, ge=1)):
+    """Pains seen on at least `min_sources` channels in the last `hours`."""
+    return {
+        "clusters": cross_sources.multi_source(hours=hours, min_sources=min_sources),
+        "stats": cross_sources.stats(),
+    }
+
 @app.get("/connectors")
 def list_connectors():
     return {"connectors": [c.health() for c in registry.list_all()]}
@@ -168,19 +180,20 @@ def chat(request: ChatRequest):
         momentum_items = [i for i in all_items if i.classification.momentum_flag]
         pain_groups: Dict[str, list] = {}
         for item in momentum_items:
-            pain = item.classification.primary_pain
-            if pain not in pain_groups:
-                pain_groups[pain] = []
-            pain_groups[pain].append(item.to_dict())
+            key = pains.key(item.classification.primary_pain)
+            if key not in pain_groups:
+                pain_groups[key] = []
+            pain_groups[key].append(item.to_dict())
         clusters = [
             {
-                "pain": pain,
+                "pain": pains.label(key),
+                "pain_key": key,
                 "signal_count": len(items),
                 "unique_actors": len(set(i["signal"]["actor"] for i in items)),
                 "sources": list(set(i["signal"]["source"] for i in items)),
                 "signals": items,
             }
-            for pain, items in pain_groups.items()
+            for key, items in pain_groups.items()
         ]
         if clusters:
             parts = [f"{c['signal_count']} signals about {c['pain']}" for c in clusters]
@@ -234,6 +247,7 @@ def seed_signals(persona: Optional[str] = None, clear: bool = False):
     """
     if persona or clear:
         queue.clear()
+        cross_sources.clear()
 
     connector = RealisticMockConnector()
     raw_signals = connector.fetch(keywords=[], limit=50, persona=persona)
@@ -241,17 +255,13 @@ def seed_signals(persona: Optional[str] = None, clear: bool = False):
     filtered = filter_signals(raw_signals)
     classifier = MockClassifier()
     classifications = classifier.classify_batch(filtered)
-    classifications = detect_momentum(filtered, classifications)
+    classifications = detect_momentum(filtered, classifications, pains=pains)
 
-    added = 0
-    dupes = 0
-    for signal, cls in zip(filtered, classifications):
-        if queue.add(signal, cls):
-            added += 1
-        else:
-            dupes += 1
+    queued = queue.add_many(zip(filtered, classifications))
+    added = sum(queued)
+    dupes = len(queued) - added
 
-    momentum = get_momentum_summary(classifications, filtered)
+    momentum = get_momentum_summary(classifications, filtered, pains=pains)
 
     return {
         "seeded": added,
@@ -0,0 +1 @@
+"""Microbenchmarks. Run from the repo root, e.g. `python -m benchmarks.bench_filter`."""
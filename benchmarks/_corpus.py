@@ -0,0 +1,62 @@
+"""Synthetic corpus shared by the benchmarks — built from the bundled mock data."""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from signalry.models import Signal
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+_FILLER = [
+    "honestly", "this week", "for our team", "again", "lol", "at work",
+    "on mobile", "since the update", "fwiw", "in prod", "tbh", "today",
+]
+
+
+def base_texts() -> List[str]:
+    """All post texts from data/mock_posts.json and data/realistic_signals.json."""
+    texts: List[str] = []
+    for name in ("mock_posts.json", "realistic_signals.json"):
+        path = DATA_DIR / name
+        if path.exists():
+            texts.extend(item.get("text", "") for item in json.loads(path.read_text()))
+    return texts
+
+
+def make_signals(n: int, seed: int = 7, dupe_rate: float = 0.0) -> List[Signal]:
+    """n signals with lightly varied text; `dupe_rate` re-uses earlier source_ids."""
+    rng = random.Random(seed)
+    texts = base_texts()
+    now = datetime.utcnow()
+    signals: List[Signal] = []
+    for i in range(n):
+        text = rng.choice(texts)
+        if rng.random() < 0.5:
+            text = f"{text} {rng.choice(_FILLER)}"
+        source_id = f"bench_{i}"
+        if signals and rng.random() < dupe_rate:
+            source_id = rng.choice(signals).source_id
+        signals.append(Signal(
+            id=f"sig_{i}",
+            actor=f"user{rng.randrange(max(n // 4, 1))}",
+            text=text,
+            timestamp=now - timedelta(minutes=rng.randrange(48 * 60)),
+            source_id=source_id,
+        ))
+    return signals
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Best wall-clock time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,112 @@
+"""
+Burst detection backfill: per-row add() vs from_queue() (SQL bucketing).
+
+Fills a review-queue DB with --n signals over one week and --pains
+pains, plus --spiking pains that get a day's volume in the last 3h,
+then times building a BurstDetector from it:
+
+- rows:      SELECT (pain, timestamp) per signal, canonical keys,
+             add_many() — one Python add() per signal
+- sql:       BurstDetector.from_queue() — SQLite groups by (pain,
+             bucket), Python writes one count per bucket
+
+Both must rank the same emerging pains. Also: emerging() over every
+pain, ring memory.
+
+    python -m benchmarks.bench_burst [--n 1000000] [--pains 500] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from signalry.burst import BurstDetector
+from signalry.pains import PainIndex
+from signalry.queue import ReviewQueue
+
+from ._corpus import best_of
+
+
+def _name(kind: str, i: int) -> str:
+    """Distinct pain names ("pain 1" and "pain 12" would share a canonical key)."""
+    return f"{kind} {hashlib.sha1(f'{kind}{i}'.encode()).hexdigest()[:12]}"
+
+
+def _fill(queue: ReviewQueue, n: int, pains: int, spiking: int, now: datetime,
+          seed: int = 7) -> None:
+    rng = random.Random(seed)
+    week = 7 * 86400
+    rows = [(_name("pain", rng.randrange(pains)), rng.randrange(week)) for _ in range(n)]
+    for p in range(spiking):                        # a day's volume in the last 3h
+        rows += [(_name("spike", p), rng.randrange(3 * 3600)) for _ in range(n // pains // 7)]
+    with queue._conn() as conn:
+        for start in range(0, len(rows), 50_000):
+            chunk = list(enumerate(rows[start:start + 50_000], start))
+            conn.executemany(
+                "INSERT INTO signals (id, source, actor, text, timestamp, source_id, metrics) "
+                "VALUES (?, 'x', ?, 'post', ?, ?, '{}')",
+                [(f"s{i}", f"user{i % 5000}", (now - timedelta(seconds=age)).isoformat(), f"src{i}")
+                 for i, (_, age) in chunk])
+            conn.executemany(
+                "INSERT INTO classifications (signal_id, intent_stage, primary_pain, urgency, "
+                "confidence, momentum_flag, recommended_action) "
+                "VALUES (?, 'requesting', ?, 'medium', 0.7, 0, '')",
+                [(f"s{i}", pain) for i, (pain, _) in chunk])
+        conn.execute("ANALYZE")
+
+
+def _rows_path(queue: ReviewQueue, pains: PainIndex, now: datetime) -> BurstDetector:
+    detector = BurstDetector(pains=pains)
+    with queue.read() as conn:
+        rows = conn.execute(
+            "SELECT c.primary_pain, s.timestamp FROM signals s "
+            "JOIN classifications c ON c.signal_id = s.id WHERE s.timestamp >= ?",
+            ((now - detector.span).isoformat(),)).fetchall()
+    keys = pains.keys(pain for pain, _ in rows)
+    detector.add_many((keys[pain], datetime.fromisoformat(ts)) for pain, ts in rows)
+    return detector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--pains", type=int, default=500)
+    parser.add_argument("--spiking", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = ReviewQueue(os.path.join(tmp, "bench.db"))
+        _fill(queue, args.n, args.pains, args.spiking, now)
+        pains = PainIndex()
+        pains.keys([_name("pain", i) for i in range(args.pains)]
+                   + [_name("spike", p) for p in range(args.spiking)])  # warm, not timed
+
+        rows = _rows_path(queue, pains, now)
+        sql = BurstDetector.from_queue(queue, pains=pains, now=now)
+        assert rows.emerging(now=now) == sql.emerging(now=now)
+
+        t_rows = best_of(lambda: _rows_path(queue, pains, now), repeat=args.repeat)
+        t_sql = best_of(lambda: BurstDetector.from_queue(queue, pains=pains, now=now),
+                        repeat=args.repeat)
+        t_score = best_of(lambda: sql.emerging(now=now))
+
+    found = [e["pain_key"] for e in sql.emerging(now=now)]
+    print(f"\n{sql.observed:,} signals, {len(sql._rings)} pains, "
+          f"ring {sql.size} x {sql.bucket_seconds // 60} min")
+    print(f"  rows + add():      {t_rows:7.2f}s")
+    print(f"  from_queue (SQL):  {t_sql:7.2f}s  ({t_rows / t_sql:.1f}x)")
+    print(f"  emerging():        {t_score * 1000:7.1f}ms")
+    print(f"  ring memory:       {sql.memory_bytes / 1024:7.1f} KiB")
+    print(f"  emerging pains:    {len(found)} "
+          f"({sum(p.startswith('spike') for p in found)}/{args.spiking} planted spikes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+LLM client overhead: a new Anthropic client per call vs the pooled, long-lived client.
+
+Runs against signalry.stub_server (no network, no API key), so the
+numbers are client setup + connection cost, not model latency.
+
+    python -m benchmarks.bench_client_pool [--n 200] [--batches 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from signalry.classify import LLMClassifier
+from signalry.stub_server import StubAnthropicServer
+
+from ._corpus import make_signals
+
+
+class PerCallClassifier(LLMClassifier):
+    """The old behaviour: build a fresh client for every request."""
+
+    def classify(self, signal):
+        anthropic = self._sdk()
+        client = anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url,
+                                     timeout=self.timeout)
+        try:
+            response = client.messages.create(**self._request(signal))
+        finally:
+            client.close()
+        return self._to_classification(signal, self._response_json(response))
+
+    def classify_batch(self, signals):
+        # One client per batch, on a fresh event loop each time.
+        return asyncio.run(self.classify_batch_async(
+            signals, concurrency=self.concurrency, latencies=self.latencies))
+
+
+def _measure(server, fn):
+    connections = server.connections
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, server.connections - connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=200, help="sequential classify() calls")
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    signals = make_signals(max(args.n, args.batch_size))
+    with StubAnthropicServer() as server:
+        per_call = PerCallClassifier(api_key="bench", base_url=server.base_url,
+                                     concurrency=args.concurrency)
+        pooled = LLMClassifier(api_key="bench", base_url=server.base_url,
+                               concurrency=args.concurrency)
+        for clf in (per_call, pooled):      # warm up imports before timing
+            clf.classify(signals[0])
+            clf.classify_batch(signals[:2])
+
+        print(f"sequential classify() x {args.n}")
+        for name, clf in (("per-call client", per_call), ("pooled client", pooled)):
+            t, conns = _measure(server, lambda: [clf.classify(s) for s in signals[:args.n]])
+            print(f"  {name:<16} {t / args.n * 1000:7.2f} ms/call   connections opened: {conns}")
+
+        batch = signals[:args.batch_size]
+        print(f"classify_batch() x {args.batches} batches of {len(batch)} "
+              f"(concurrency {args.concurrency})")
+        for name, clf in (("per-batch client", per_call), ("pooled client", pooled)):
+            t, conns = _measure(server, lambda: [clf.classify_batch(batch)
+                                                 for _ in range(args.batches)])
+            print(f"  {name:<16} {t / (args.batches * len(batch)) * 1000:7.2f} ms/signal"
+                  f"   connections opened: {conns}")
+        pooled.close()
+
+
+if __name__ == "__main__":
+    main()
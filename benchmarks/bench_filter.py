@@ -0,0 +1,46 @@
+"""
+Intent/noise matching: per-pattern loop vs compiled single-pass matcher.
+
+    python -m benchmarks.bench_filter [--n 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from signalry.filter import _MATCHER, has_explicit_intent, is_noise
+
+from ._corpus import best_of, make_signals
+
+
+def per_pattern(texts):
+    return [not is_noise(t) and has_explicit_intent(t) for t in texts]
+
+
+def compiled(texts):
+    out = []
+    for t in texts:
+        hits = _MATCHER.scan(t)
+        out.append("noise" not in hits and "intent" in hits)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [s.text for s in make_signals(args.n)]
+    assert per_pattern(texts) == compiled(texts), "keep/drop decisions differ"
+
+    old = best_of(lambda: per_pattern(texts), args.repeat)
+    new = best_of(lambda: compiled(texts), args.repeat)
+    print(f"texts:        {len(texts)}")
+    print(f"per-pattern:  {old * 1e3:8.1f} ms  ({old / len(texts) * 1e6:.2f} µs/post)")
+    print(f"compiled:     {new * 1e3:8.1f} ms  ({new / len(texts) * 1e6:.2f} µs/post)")
+    print(f"speedup:      {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+MockClassifier: per-keyword scans vs the one-pass keyword automaton.
+
+"scans" is the rule code before the automaton (tests/test_mock_keywords.py
+keeps it as the reference); the other rows are MockClassifier on each
+KeywordAutomaton backend available here.
+
+    python -m benchmarks.bench_mock_classifier [--n 20000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import time
+
+from signalry.classify import MockClassifier
+from signalry.keywords import AHO_CORASICK, SCAN, KeywordAutomaton
+from signalry.models import Classification
+from tests.test_mock_keywords import reference_fields
+
+from ._corpus import make_signals
+
+
+def _old_classify(signal):
+    """Old rules plus building the Classification, so rows do equal work."""
+    intent, pain, urgency, confidence = reference_fields(signal.text)
+    return Classification(
+        signal_id=signal.id, intent_stage=intent, primary_pain=pain, urgency=urgency,
+        confidence=confidence, momentum_flag=False,
+        recommended_action=f"Engage {signal.actor} — address {pain} before they leave",
+    )
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    signals = make_signals(args.n)
+
+    backends = [SCAN]
+    if importlib.util.find_spec("ahocorasick") is not None:
+        backends.append(AHO_CORASICK)
+    else:
+        print("pyahocorasick not installed — aho-corasick row skipped")
+
+    rows = [("scans (old)", lambda: [_old_classify(s) for s in signals])]
+    for backend in backends:
+        clf = type("Mock", (MockClassifier,), {
+            "_keywords": KeywordAutomaton(MockClassifier._keywords.keywords, backend=backend),
+        })()
+        rows.append((f"automaton/{backend}", lambda clf=clf: [clf.classify(s) for s in signals]))
+
+    print(f"signals: {args.n}  keywords: {len(MockClassifier._keywords.keywords)}")
+    print(f"{'variant':<24} {'µs/signal':>10} {'signals/s':>12}")
+    for name, fn in rows:
+        elapsed = _best(fn, args.repeat)
+        print(f"{name:<24} {elapsed / args.n * 1e6:>10.1f} {args.n / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
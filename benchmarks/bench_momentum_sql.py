@@ -0,0 +1,109 @@
+"""
+Momentum over the full history: load + detect_momentum vs SQL aggregates.
+
+Fills a review-queue DB with --n signals (default 1M: 5k actors, 50k
+pains, 30 days of timestamps) straight through executemany, then times:
+
+- python:  SELECT the joined rows, build Signal/Classification objects,
+           detect_momentum() — what a caller without the SQL path does
+- sql:     ReviewQueue.momentum_clusters() on the new indexes
+- sql, no new indexes: the same queries after dropping them
+
+    python -m benchmarks.bench_momentum_sql [--n 1000000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from signalry.models import Classification, IntentStage, Signal, Urgency
+from signalry.momentum import detect_momentum
+from signalry.queue import ReviewQueue
+
+from ._corpus import best_of
+
+_NEW_INDEXES = ("idx_signals_timestamp", "idx_signals_id_actor",
+                "idx_classifications_signal_pain")
+
+
+def _fill(queue: ReviewQueue, n: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # log-uniform over 50k pains: a busy head of clusters, a long tail of one-offs
+    pains = [f"pain {i}" for i in range(50_000)]
+    with queue._conn() as conn:
+        for start in range(0, n, 50_000):
+            ids = range(start, min(n, start + 50_000))
+            conn.executemany(
+                "INSERT INTO signals (id, source, actor, text, timestamp, source_id, metrics) "
+                "VALUES (?, 'x', ?, 'post', ?, ?, '{}')",
+                [(f"s{i}", f"user{rng.randrange(5000)}",
+                  (now - timedelta(seconds=rng.randrange(30 * 86400))).isoformat(), f"src{i}")
+                 for i in ids])
+            conn.executemany(
+                "INSERT INTO classifications (signal_id, intent_stage, primary_pain, urgency, "
+                "confidence, momentum_flag, recommended_action) "
+                "VALUES (?, 'requesting', ?, 'medium', 0.7, 0, '')",
+                [(f"s{i}", pains[int(50_000 ** rng.random()) - 1]) for i in ids])
+    with queue._conn() as conn:
+        conn.execute("ANALYZE")
+
+
+def _python_path(queue: ReviewQueue) -> int:
+    signals, classifications = [], []
+    with queue.read() as conn:
+        rows = conn.execute(
+            "SELECT s.id, s.actor, s.timestamp, c.primary_pain FROM signals s "
+            "JOIN classifications c ON c.signal_id = s.id")
+        for sid, actor, ts, pain in rows:
+            signals.append(Signal(id=sid, actor=actor, text="",
+                                  timestamp=datetime.fromisoformat(ts)))
+            classifications.append(Classification(
+                signal_id=sid, intent_stage=IntentStage.REQUESTING, primary_pain=pain,
+                urgency=Urgency.MEDIUM, confidence=0.7))
+    detect_momentum(signals, classifications)
+    return sum(c.momentum_flag for c in classifications)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-python", action="store_true",
+                        help="skip the load + detect_momentum row (slow at 1M)")
+    args = parser.parse_args()
+
+    queue = ReviewQueue(os.path.join(tempfile.mkdtemp(), "momentum.db"))
+    start = time.perf_counter()
+    _fill(queue, args.n)
+    print(f"signals: {args.n:,}  (filled in {time.perf_counter() - start:.1f}s)")
+
+    found = queue.momentum_clusters()
+    print(f"momentum pains: {len(found['pains'])}  "
+          f"persistent (actor, pain) pairs: {len(found['persistent']):,}")
+    print(f"{'path':<22} {'seconds':>9}")
+    if not args.skip_python:
+        t_python = best_of(lambda: _python_path(queue), 1)
+        print(f"{'python':<22} {t_python:>9.2f}")
+    t_sql = best_of(queue.momentum_clusters, args.repeat)
+    print(f"{'sql':<22} {t_sql:>9.2f}")
+
+    with queue._conn() as conn:
+        for name in _NEW_INDEXES:
+            conn.execute(f"DROP INDEX {name}")
+    t_bare = best_of(queue.momentum_clusters, args.repeat)
+    print(f"{'sql, no new indexes':<22} {t_bare:>9.2f}")
+
+    queue = ReviewQueue(str(queue.db_path))                     # re-creates the indexes
+    start = time.perf_counter()
+    flagged = queue.apply_momentum()
+    print(f"apply_momentum: {flagged:,} flagged in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Packed classification: tokens per signal and throughput across pack sizes.
+
+Runs against signalry.stub_server with a fixed per-request latency to
+stand in for the model round trip. Token counts are the stub's
+approximation (~4 chars/token) — compare them relative to pack_size=1.
+
+    python -m benchmarks.bench_packing [--n 400] [--sizes 1,5,10,20] [--latency 0.2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from signalry.classify import LLMClassifier
+from signalry.stub_server import StubAnthropicServer
+
+from ._corpus import make_signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=400)
+    parser.add_argument("--sizes", default="1,5,10,20")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    signals = make_signals(args.n)
+    sizes = [int(x) for x in args.sizes.split(",")]
+
+    with StubAnthropicServer(latency=args.latency) as server:
+        print(f"signals: {args.n}  concurrency: {args.concurrency}  "
+              f"stub latency: {args.latency * 1000:.0f} ms")
+        print(f"{'pack':>5} {'requests':>9} {'in tok/sig':>11} {'out tok/sig':>12} "
+              f"{'signals/s':>10}")
+        for size in sizes:
+            with LLMClassifier(api_key="bench", base_url=server.base_url,
+                               concurrency=args.concurrency, pack_size=size) as clf:
+                clf.classify_batch(signals[:size])      # warm up
+                clf.reset_stats()
+                start = time.perf_counter()
+                clf.classify_batch(signals)
+                elapsed = time.perf_counter() - start
+                stats = clf.stats()
+            print(f"{size:>5} {stats['requests']:>9} "
+                  f"{stats['tokens']['input'] / args.n:>11.1f} "
+                  f"{stats['tokens']['output'] / args.n:>12.1f} "
+                  f"{args.n / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Filter scaling: serial filter_signals vs filter_signals_parallel on 1..N workers.
+
+    python -m benchmarks.bench_parallel_filter [--n 200000] [--max-workers 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+from signalry.filter import filter_signals, filter_signals_parallel
+
+from ._corpus import best_of, make_signals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    signals = make_signals(args.n, dupe_rate=0.05)
+    expected = [s.id for s in filter_signals(signals)]
+
+    serial = best_of(lambda: filter_signals(signals), args.repeat)
+    print(f"signals: {len(signals)}  kept: {len(expected)}")
+    print(f"serial        {serial:7.2f} s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        got = filter_signals_parallel(signals, workers=workers, chunk_size=args.chunk_size)
+        assert [s.id for s in got] == expected, "parallel output differs from serial"
+        t = best_of(lambda: filter_signals_parallel(
+            signals, workers=workers, chunk_size=args.chunk_size), args.repeat)
+        print(f"workers={workers:<3}   {t:7.2f} s   {serial / t:5.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
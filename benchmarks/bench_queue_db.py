@@ -0,0 +1,146 @@
+"""
+ReviewQueue ops/sec: a connection per call vs the connection manager.
+
+Three setups on the same workload:
+
+- per-call:  sqlite3.connect() on every call, SQLite defaults (rollback
+             journal, synchronous=FULL) — ReviewQueue before db.py
+- legacy:    ConnectionManager, long-lived connections, default PRAGMAs
+- wal:       ConnectionManager, profile "wal" (the default)
+
+Single-threaded ops/sec for add(), add_many() (items/sec, one batch
+of --n), stats(), list_pending(50) and get_outcome(), then a mixed
+run: --threads reader threads (stats + list_pending, as the API
+serves them) against one writer thread adding, for --seconds.
+
+fsync cost depends on the disk: on tmpfs (/tmp here, often) commits
+are nearly free; pass --dir on a real disk to see synchronous=NORMAL
+pay off.
+
+    python -m benchmarks.bench_queue_db [--n 2000] [--threads 4] [--seconds 3] [--dir PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from signalry.models import Classification, Signal
+from signalry.queue import ReviewQueue
+
+
+class PerCallConnections:
+    """What ReviewQueue did before: a fresh connection for every call."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    read = write = _connect
+
+    def close(self):
+        pass
+
+
+def _make_queue(kind: str, path: str) -> ReviewQueue:
+    if kind == "per-call":
+        queue = ReviewQueue(path, pragmas="legacy")
+        queue._db.close()
+        queue._db = PerCallConnections(path)
+        return queue
+    return ReviewQueue(path, pragmas=kind)
+
+
+def _item(i: int):
+    sig = Signal(actor=f"user{i % 500}", text=f"post {i}", source_id=f"src{i}",
+                 timestamp=datetime.utcnow())
+    return sig, Classification(signal_id=sig.id, primary_pain=f"pain {i % 40}")
+
+
+def _rate(fn, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - start)
+
+
+def _mixed(queue: ReviewQueue, threads: int, seconds: float, offset: int):
+    stop = time.perf_counter() + seconds
+    reads = [0] * threads
+    writes = [0]
+
+    def reader(k):
+        while time.perf_counter() < stop:
+            queue.stats()
+            queue.list_pending(limit=50)
+            reads[k] += 1
+
+    def writer():
+        i = offset
+        while time.perf_counter() < stop:
+            queue.add(*_item(i))
+            i += 1
+            writes[0] += 1
+
+    workers = [threading.Thread(target=reader, args=(k,)) for k in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(reads) / seconds, writes[0] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--dir", default=None, help="directory for the DB files (default: a temp dir)")
+    args = parser.parse_args()
+
+    print(f"\nops/sec, {args.n:,} ops each; mixed = {args.threads} reader threads "
+          f"(stats + list_pending) + 1 writer, {args.seconds:.0f}s")
+    print(f"{'setup':>9} {'add':>8} {'add_many':>9} {'stats':>8} {'list50':>8} {'outcome':>8} "
+          f"{'mixed rd':>9} {'mixed wr':>9}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for kind in ("per-call", "legacy", "wal"):
+            queue = _make_queue(kind, os.path.join(tmp, f"{kind}.db"))
+            ids = []
+
+            def add(i):
+                sig, cls = _item(i)
+                queue.add(sig, cls)
+                ids.append(sig.id)
+
+            r_add = _rate(add, args.n)
+            batch = [_item(i) for i in range(10 * args.n, 11 * args.n)]
+            start = time.perf_counter()
+            queue.add_many(batch)
+            r_many = args.n / (time.perf_counter() - start)
+            r_stats = _rate(lambda i: queue.stats(), args.n)
+            r_list = _rate(lambda i: queue.list_pending(limit=50), args.n // 4)
+            r_outcome = _rate(lambda i: queue.get_outcome(ids[i]), args.n)
+            rd, wr = _mixed(queue, args.threads, args.seconds, offset=20 * args.n)
+            queue.close()
+            print(f"{kind:>9} {r_add:>8,.0f} {r_many:>9,.0f} {r_stats:>8,.0f} {r_list:>8,.0f} "
+                  f"{r_outcome:>8,.0f} {rd:>9,.0f} {wr:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Momentum sketches: memory and accuracy vs exact sets and counters.
+
+- distinct actors: Python set of actor names vs HyperLogLog
+- (actor, pain) repeats: Counter vs CountMinSketch per width — the
+  false-repeat rate is the share of pairs seen once whose estimate
+  reaches 2 (what would wrongly trip ACTOR_REPEAT_THRESHOLD)
+- detect_momentum on a synthetic history: exact vs sketches, flags that
+  differ
+
+    python -m benchmarks.bench_sketches [--max 1000000] [--trials 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from signalry.models import Classification, Signal
+from signalry.momentum import MomentumSketches, detect_momentum
+from signalry.pains import PainIndex
+from signalry.sketches import CountMinSketch, HyperLogLog
+
+
+def _set_bytes(items) -> int:
+    return sys.getsizeof(items) + sum(sys.getsizeof(i) for i in items)
+
+
+def _counter_bytes(counter) -> int:
+    return sys.getsizeof(counter) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in counter.items())
+
+
+def _sizes(limit):
+    n = 1000
+    while n <= limit:
+        yield n
+        n *= 10
+
+
+def bench_hll(limit, trials):
+    print(f"\ndistinct actors — set vs HyperLogLog (p=12, standard error "
+          f"{HyperLogLog().relative_error:.1%})")
+    print(f"{'actors':>10} {'set KiB':>10} {'hll KiB':>8} {'mean |err|':>11} {'max |err|':>10}")
+    for n in _sizes(limit):
+        errors = []
+        for t in range(trials if n < limit else 1):
+            actors = [f"user_{t}_{i}" for i in range(n)]
+            hll = HyperLogLog()
+            hll.update(actors)
+            errors.append(abs(hll.count() / n - 1))
+        print(f"{n:>10,} {_set_bytes(set(actors)) / 1024:>10,.0f} {hll.memory_bytes / 1024:>8.1f} "
+              f"{sum(errors) / len(errors):>11.2%} {max(errors):>10.2%}")
+
+
+def bench_cms(limit, widths):
+    print("\n(actor, pain) repeats — Counter vs CountMinSketch (depth 4, conservative update)")
+    print(f"{'signals':>10} {'pairs':>9} {'counter KiB':>12} {'width':>9} {'cms KiB':>8} "
+          f"{'false repeats':>14} {'max over':>9} {'bound e*N':>10}")
+    rng = random.Random(7)
+    for n in _sizes(limit):
+        counter: Counter = Counter()
+        for _ in range(n):
+            actor = f"user{int(rng.paretovariate(1.2) * 10)}" if rng.random() < 0.5 \
+                else f"user{rng.randrange(10 * n)}"          # heavy repeaters + long tail
+            counter[f"{actor}\x1fpain {rng.randrange(500)}"] += 1
+        ones = [k for k, c in counter.items() if c == 1]
+        for width in widths:
+            cms = CountMinSketch(width=width)
+            for key, count in counter.items():
+                for _ in range(count):
+                    cms.add(key)
+            false = sum(1 for k in ones if cms.estimate(k) >= 2)
+            over = max(cms.estimate(k) - c for k, c in counter.items())
+            print(f"{n:>10,} {len(counter):>9,} {_counter_bytes(counter) / 1024:>12,.0f} "
+                  f"{width:>9,} {cms.memory_bytes / 1024:>8,.0f} "
+                  f"{false / max(len(ones), 1):>14.3%} {over:>9} {cms.error_bound():>10.1f}")
+
+
+def bench_detect(n):
+    print(f"\ndetect_momentum on {n:,} signals ({2 * n:,} actors, 100k pains, 4 days)")
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    signals, classifications = [], []
+    for i in range(n):
+        sig = Signal(id=f"s{i}", actor=f"user{rng.randrange(2 * n)}", text="",
+                     timestamp=now - timedelta(minutes=rng.randrange(4 * 24 * 60)))
+        signals.append(sig)
+        classifications.append(Classification(signal_id=sig.id,
+                                              primary_pain=f"pain {int(100_000 ** rng.random())}"))
+    pains = PainIndex()
+    pains.keys(c.primary_pain for c in classifications)       # warm: time momentum, not keying
+    rows = []
+    for name, sketches in (("exact", None), ("sketches", MomentumSketches())):
+        cls = [Classification(signal_id=c.signal_id, primary_pain=c.primary_pain)
+               for c in classifications]
+        start = time.perf_counter()
+        detect_momentum(signals, cls, pains=pains, sketches=sketches)
+        rows.append((name, time.perf_counter() - start, [c.momentum_flag for c in cls], sketches))
+    exact = rows[0][2]
+    for name, seconds, flags, sketches in rows:
+        differ = sum(a != b for a, b in zip(flags, exact))
+        memory = f"{sketches.memory_bytes / 1024:,.0f} KiB" if sketches else "-"
+        print(f"  {name:<9} {seconds:>6.2f}s  flagged {sum(flags):>6,}  differ {differ:>4}  "
+              f"sketch memory {memory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max", type=int, default=1_000_000, help="largest stream size")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--cms-widths", default="65536,1048576",
+                        help="comma-separated count-min widths")
+    parser.add_argument("--detect", type=int, default=100_000, help="signals for detect_momentum")
+    args = parser.parse_args()
+    bench_hll(args.max, args.trials)
+    bench_cms(args.max, [int(w) for w in args.cms_widths.split(",")])
+    bench_detect(args.detect)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Staged vs streaming pipeline: time to first reviewable item and end to end.
+
+LLMClassifier runs against signalry.stub_server with a fixed per-request
+latency; every run gets a fresh review queue.
+
+    python -m benchmarks.bench_streaming [--n 400] [--latency 0.1] [--batch 16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+
+from signalry.classify import LLMClassifier
+from signalry.pipeline import Pipeline
+from signalry.queue import ReviewQueue
+from signalry.stub_server import StubAnthropicServer
+
+from ._corpus import make_signals
+
+
+class _ListIngestor:
+    def __init__(self, signals):
+        self.signals = signals
+
+    def fetch(self, keywords, since=None):
+        return list(self.signals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.1, help="stub seconds per request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=16, help="run_stream micro-batch size")
+    args = parser.parse_args()
+
+    signals = make_signals(args.n)
+    tmp = tempfile.mkdtemp()
+
+    with StubAnthropicServer(latency=args.latency) as server:
+        print(f"signals: {args.n}  concurrency: {args.concurrency}  "
+              f"stub latency: {args.latency * 1000:.0f} ms")
+        print(f"{'mode':<8} {'queued':>7} {'first item s':>13} {'end to end s':>13}")
+        for mode in ("staged", "stream"):
+            with LLMClassifier(api_key="bench", base_url=server.base_url,
+                               concurrency=args.concurrency) as clf:
+                pipe = Pipeline(ingestor=_ListIngestor(signals), classifier=clf,
+                                queue=ReviewQueue(os.path.join(tmp, f"{mode}.db")))
+                if mode == "stream":
+                    result = pipe.run_stream(keywords=[], batch_size=args.batch)
+                else:
+                    result = pipe.run(keywords=[])
+            timing = result["timing"]
+            print(f"{mode:<8} {result['counts']['queued']:>7} "
+                  f"{timing['time_to_first_item_s'] or 0:>13.2f} {timing['end_to_end_s']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,24 @@ Signalry CLI — the main way to interact with the agent.
 Usage:
     python -m signalry run                    # Process signals with default keywords
     python -m signalry run --keywords "pump,token,shipping"
+    python -m signalry run --workers 4        # Parallel filtering for backfills
+    python -m signalry run --live --pack-size 10   # 10 posts per LLM request
+    python -m signalry run --live --cache     # Skip the LLM for already-classified text
+    python -m signalry run --live --cascade   # LLM only where heuristics are unsure
+    python -m signalry run --live --adaptive  # AIMD concurrency + fail-over to heuristics
+    python -m signalry run --live --stream    # Queue items as they are classified
     python -m signalry queue                  # View pending review items
     python -m signalry approve <signal_id>    # Approve a signal
     python -m signalry discard <signal_id>    # Discard a signal
     python -m signalry log <signal_id>        # Log outcome for approved signal
     python -m signalry stats                  # View queue statistics
     python -m signalry export                 # Export all items as JSON
+    python -m signalry run --bloom-file data/signalry.bloom   # Keep the pre-check on disk
+    python -m signalry rebuild-index          # Rebuild the known-source_id Bloom filter file
+    python -m signalry filter-stats           # Per-rule filter hit counts and timing
+    python -m signalry batch-submit           # Backfill: classify via a Message Batch job
+    python -m signalry batch-poll [--wait]    # Merge finished batch jobs into the queue
+    python -m signalry batch-list             # Batch jobs and their progress
 """
 
 from __future__ import annotations
@@ -20,7 +32,10 @@ import json
 import sys
 from datetime import datetime
 
+from .cache import DEFAULT_CACHE_PATH, CachedClassifier, ClassificationCache
+from .classify import get_classifier
 from .models import Outcome, ResponseType
+from .pains import PainIndex
 from .pipeline import Pipeline
 from .queue import ReviewQueue
 
@@ -32,8 +47,28 @@ def cmd_run(args):
     if args.since:
         since = datetime.fromisoformat(args.since)
 
-    pipe = Pipeline(live=args.live)
-    result = pipe.run(keywords=keywords, since=since)
+    live_only = [flag for flag, on in (("--pack-size", args.pack_size != 1),
+                                       ("--cascade", args.cascade),
+                                       ("--adaptive", args.adaptive)) if on]
+    if live_only and not args.live:
+        print(f"  ❌ {', '.join(live_only)} only apply with --live (offline runs make no LLM calls)")
+        sys.exit(1)
+
+    classifier = get_classifier(live=args.live, pack_size=args.pack_size, cascade=args.cascade,
+                                adaptive=args.adaptive)
+    try:
+        if args.cache:
+            classifier = CachedClassifier(classifier, ClassificationCache(args.cache_db))
+        pipe = Pipeline(classifier=classifier, live=args.live, workers=args.workers,
+                        persistent_momentum=args.momentum_window,
+                        momentum_sketch=args.momentum_sketch, escalation=args.escalation,
+                        burst=args.burst, precheck_path=args.bloom_file)
+        run = pipe.run_stream if args.stream else pipe.run
+        result = run(keywords=keywords, since=since)
+    finally:
+        close = getattr(classifier, "close", None)      # cache file, LLM client pool
+        if close is not None:
+            close()
 
     # Print summary
     c = result["counts"]
@@ -41,10 +76,45 @@ def cmd_run(args):
     print(f"  SIGNALRY — Pipeline Run")
     print(f"{'='*60}")
     print(f"  Ingested:    {c['ingested']}")
+    print(f"  Known:       {c['known_skipped']} already queued (skipped)")
     print(f"  Filtered:    {c['filtered']} (explicit intent only)")
-    print(f"  Classified:  {c['classified']}")
+    print(f"  Classified:  {c['classified']} ({c['near_duplicates']} near-duplicates reused a result)")
     print(f"  Queued:      {c['queued']} new")
     print(f"  Duplicates:  {c['duplicates_skipped']} skipped")
+    if c["reflagged"]:
+        print(f"  Re-flagged:  {c['reflagged']} earlier items joined a momentum cluster")
+    if "precheck" in result:
+        pc = result["precheck"]
+        print(f"  Pre-check:   {pc['items']} ids, {pc['memory_bytes'] / 1024:.1f} KiB, "
+              f"est. FP {pc['estimated_fp_rate']:.4%}, observed FP {pc['false_positives']}/{pc['checked']}")
+    lat = result.get("classifier", {}).get("latency", {})
+    if lat.get("requests"):
+        print(f"  LLM latency: p50 {lat['p50_ms']}ms  p90 {lat['p90_ms']}ms  "
+              f"p99 {lat['p99_ms']}ms  ({lat['requests']} requests)")
+    prompt_tokens = c["input_tokens"] + c["cache_read_tokens"] + c["cache_creation_tokens"]
+    if prompt_tokens:
+        print(f"  LLM tokens:  in {c['input_tokens']}  cache read {c['cache_read_tokens']} "
+              f"({c['cache_read_tokens'] / prompt_tokens:.0%})  cache write "
+              f"{c['cache_creation_tokens']}  out {c['output_tokens']}")
+    cascade = result.get("classifier", {}).get("cascade")
+    if cascade:
+        print(f"  Cascade:     {cascade['llm']} escalated to LLM ({cascade['escalation_rate']:.0%}), "
+              f"{cascade['llm_requests']} LLM requests, {cascade['llm_calls_saved']} saved")
+    adaptive = result.get("classifier", {}).get("adaptive")
+    if adaptive:
+        limits = [limit for _, limit in adaptive["history"]]
+        print(f"  Adaptive:    limit {adaptive['limit']} (range {min(limits)}-{max(limits)}), "
+              f"{adaptive['throttles']} throttled, {adaptive['timeouts']} timeouts, "
+              f"breaker {result['classifier']['breaker']['state']}, "
+              f"{result['classifier']['fallbacks']} fell back to heuristics")
+    cache = result.get("classifier", {}).get("cache")
+    if cache:
+        print(f"  Cache:       {cache['hits']} hits / {cache['misses']} misses "
+              f"({cache['hit_rate']:.0%}), {cache['evictions']} evicted")
+    timing = result["timing"]
+    if timing["time_to_first_item_s"] is not None:
+        print(f"  Timing:      first item {timing['time_to_first_item_s']:.2f}s, "
+              f"end to end {timing['end_to_end_s']:.2f}s ({timing['mode']})")
     print(f"{'='*60}")
 
     # Momentum
@@ -53,6 +123,17 @@ def cmd_run(args):
         for m in result["momentum"]:
             print(f"    • {m['pain']}: {m['signal_count']} signals from {m['unique_actors']} actors")
         print()
+    if result.get("escalation"):
+        print(f"  📈 ESCALATING:")
+        for e in result["escalation"]:
+            print(f"    • {e['pain']}: urgency {e['slow_urgency']:.1f} → {e['fast_urgency']:.1f}")
+        print()
+    if result.get("emerging"):
+        print(f"  🚀 EMERGING:")
+        for e in result["emerging"]:
+            print(f"    • {e['pain']}: {e['recent']} recent posts, "
+                  f"baseline {e['baseline_rate']:.2f}/h (z {e['z']:.1f}, level {e['level']})")
+        print()
 
     # Show items
     if result["items"] and not args.quiet:
@@ -65,7 +146,8 @@ def cmd_run(args):
             print(f"  @{sig['actor']}: {sig['text'][:100]}{'...' if len(sig['text']) > 100 else ''}")
             print(f"  Pain: {cls['primary_pain']}")
             print(f"  Action: {cls['recommended_action']}")
-            print(f"  Confidence: {cls['confidence']}  ID: {sig['id'][:8]}...")
+            tier = f"  Tier: {item['tier']}" if "tier" in item else ""
+            print(f"  Confidence: {cls['confidence']}  ID: {sig['id'][:8]}...{tier}")
             print()
 
     if args.json:
@@ -176,6 +258,27 @@ def cmd_stats(args):
     print(f"{'='*60}\n")
 
 
+def cmd_momentum(args):
+    """Momentum clusters over every queued signal (SQL aggregates)."""
+    queue = ReviewQueue()
+    pains = PainIndex(str(queue.db_path))
+    found = queue.momentum_clusters(window_hours=args.window_hours, pains=pains)
+
+    print(f"\n{'='*60}")
+    print(f"  SIGNALRY — Momentum (full history, {args.window_hours}h cluster window)")
+    print(f"{'='*60}")
+    clusters = sorted(found["pains"].items(), key=lambda kv: -kv[1])
+    for key, actors in clusters[:args.limit]:
+        print(f"  🔥 {pains.label(key)}: {actors} actors")
+    if len(clusters) > args.limit:
+        print(f"  … {len(clusters) - args.limit} more")
+    print(f"  Persistent actor/pain pairs: {len(found['persistent'])}")
+    if args.apply:
+        flagged = queue.apply_momentum(window_hours=args.window_hours, pains=pains)
+        print(f"  Flagged: {flagged} items")
+    print(f"{'='*60}\n")
+
+
 def cmd_export(args):
     """Export all items as JSON."""
     queue = ReviewQueue()
@@ -184,6 +287,118 @@ def cmd_export(args):
     print(json.dumps(data, indent=2, default=str))
 
 
+def cmd_rebuild_index(args):
+    """Rebuild the Bloom pre-check of known source_ids from the signals table."""
+    from .bloom import KnownIdIndex, sidecar_path
+
+    queue = ReviewQueue()
+    index = KnownIdIndex(queue, path=args.path or sidecar_path(queue))
+    index.rebuild()
+    st = index.stats()
+    print(f"  🔁 Rebuilt {index.path}: {st['items']} ids, "
+          f"{st['memory_bytes'] / 1024:.1f} KiB, est. FP {st['estimated_fp_rate']:.4%}")
+
+
+def _batch_runner(args):
+    from .batch_jobs import BatchJobRunner
+    from .bloom import KnownIdIndex
+    from .classify import LLMClassifier
+
+    queue = ReviewQueue()
+    classifier = LLMClassifier(base_url=args.base_url)
+    return BatchJobRunner(classifier, queue, known_ids=KnownIdIndex(queue))
+
+
+def cmd_batch_submit(args):
+    """Ingest + filter now; classify later through a Message Batch job."""
+    from .ingest import get_ingestor
+
+    keywords = [k.strip() for k in args.keywords.split(",")]
+    since = datetime.fromisoformat(args.since) if args.since else None
+    runner = _batch_runner(args)
+    pipe = Pipeline(ingestor=get_ingestor(live=args.live), classifier=runner.classifier,
+                    queue=runner.queue)
+    result = pipe.submit_batch(runner, keywords=keywords, since=since)
+    c = result["counts"]
+    print(f"  📦 Ingested {c['ingested']}, known {c['known_skipped']}, filtered {c['filtered']}")
+    for job_id in result["jobs"]:
+        print(f"  Submitted {job_id}")
+    if not result["jobs"]:
+        print("  Nothing new to submit")
+
+
+def cmd_batch_poll(args):
+    """Poll open batch jobs and merge finished ones into the queue."""
+    runner = _batch_runner(args)
+    if args.wait:
+        reports = runner.wait(interval=args.interval)
+    else:
+        reports = runner.resume()
+    if not reports:
+        print("  No open batch jobs")
+    for r in reports:
+        line = f"  {r['job_id']}: {r['status']}"
+        if r["status"] == "merged":
+            line += f" — {r['queued']} queued, {r['failed']} failed"
+            if r["failed"] and args.retry_failed:
+                new = runner.resubmit_failed(r["job_id"])
+                line += f" (resubmitted as {', '.join(new)})"
+        else:
+            line += f" — {r['succeeded']} done, {r['processing']} processing"
+        print(line)
+
+
+def cmd_batch_list(args):
+    """List batch jobs and their item states."""
+    from .batch_jobs import BatchJobStore
+    from .queue import DEFAULT_DB_PATH
+
+    jobs = BatchJobStore(DEFAULT_DB_PATH).list_jobs(limit=args.limit)
+    if not jobs:
+        print("  No batch jobs")
+    for j in jobs:
+        print(f"  {j['id']}  {j['status']:<9}  submitted {j['submitted_at'][:19]}  "
+              f"{j['requests']} requests / {j['signals']} signals  "
+              f"pending {j['pending'] or 0}  merged {j['merged'] or 0}  errored {j['errored'] or 0}")
+
+
+def cmd_filter_stats(args):
+    """Run ingest + filter only, with per-rule instrumentation."""
+    from .filter import FilterStats, filter_signals
+    from .ingest import get_ingestor
+
+    keywords = [k.strip() for k in args.keywords.split(",")]
+    since = datetime.fromisoformat(args.since) if args.since else None
+    signals = get_ingestor(live=args.live).fetch(keywords=keywords, since=since)
+
+    stats = FilterStats()
+    filter_signals(signals, stats=stats)
+
+    if args.json:
+        print(json.dumps(stats.to_dict(), indent=2))
+        return
+
+    print(f"\n{'='*60}")
+    print(f"  SIGNALRY — Filter Stats ({len(signals)} signals)")
+    print(f"{'='*60}")
+    print(f"  Passed:      {stats.passed}")
+    for gate in FilterStats.GATES:
+        print(f"  Rejected by {gate + ':':<9}{stats.rejected[gate]}")
+
+    for title, rows in (("NOISE", stats.noise), ("INTENT", stats.intent)):
+        print(f"\n  {title} PATTERNS{'':<34}evals   hits   µs/eval")
+        for r in sorted(rows, key=lambda r: -r.hits):
+            per = r.seconds / r.evaluations * 1e6 if r.evaluations else 0.0
+            print(f"  {r.pattern[:46]:<48}{r.evaluations:>5}  {r.hits:>5}  {per:>8.2f}")
+
+    never = stats.never_fired()
+    if never:
+        print(f"\n  ⚠️  Never fired ({len(never)}):")
+        for pattern in never:
+            print(f"    {pattern}")
+    print()
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="signalry",
@@ -199,6 +414,31 @@ def main():
     p_run.add_argument("--live", action="store_true", help="Use real X API + LLM (requires keys)")
     p_run.add_argument("--quiet", action="store_true", help="Only show summary, not individual items")
     p_run.add_argument("--json", action="store_true", help="Also print full JSON output")
+    p_run.add_argument("--workers", type=int, default=1,
+                       help="Processes for the filter stage (useful for large backfills)")
+    p_run.add_argument("--pack-size", type=int, default=1,
+                       help="Posts per LLM request with --live (fewer prompt tokens and round trips)")
+    p_run.add_argument("--cascade", action="store_true",
+                       help="With --live: keyword heuristics first, LLM only for unclear posts")
+    p_run.add_argument("--adaptive", action="store_true",
+                       help="With --live: adapt concurrency to 429s/latency, fail over when the API is down")
+    p_run.add_argument("--stream", action="store_true",
+                       help="Stream stages through bounded queues; items are reviewable mid-run")
+    p_run.add_argument("--momentum-window", action="store_true",
+                       help="Momentum over the last 48h across runs (not just this batch)")
+    p_run.add_argument("--momentum-sketch", action="store_true",
+                       help="Like --momentum-window, counted in fixed-size sketches (approximate)")
+    p_run.add_argument("--escalation", action="store_true",
+                       help="Also flag pains whose recent urgency is rising (state kept across runs)")
+    p_run.add_argument("--burst", action="store_true",
+                       help="Also flag pains spiking above their weekly baseline (emerging pains)")
+    p_run.add_argument("--cache", action="store_true",
+                       help="Reuse classifications of identical text (see signalry/cache.py)")
+    p_run.add_argument("--cache-db", default=DEFAULT_CACHE_PATH,
+                       help="Cache file; pass the queue DB path to share it")
+    p_run.add_argument("--bloom-file",
+                       help="Keep the already-queued pre-check in this file across runs "
+                            "(default: rebuilt in memory from the queue each run)")
     p_run.set_defaults(func=cmd_run)
 
     # queue
@@ -229,10 +469,51 @@ def main():
     p_stats = subs.add_parser("stats", help="Queue statistics")
     p_stats.set_defaults(func=cmd_stats)
 
+    # momentum
+    p_mom = subs.add_parser("momentum", help="Momentum clusters over the whole queue history")
+    p_mom.add_argument("--window-hours", type=int, default=48, help="Topic-cluster window")
+    p_mom.add_argument("--limit", type=int, default=20, help="Clusters to list")
+    p_mom.add_argument("--apply", action="store_true", help="Set momentum flags on queued items")
+    p_mom.set_defaults(func=cmd_momentum)
+
     # export
     p_export = subs.add_parser("export", help="Export all items as JSON")
     p_export.set_defaults(func=cmd_export)
 
+    # filter-stats
+    p_fstats = subs.add_parser("filter-stats", help="Per-rule filter hit counts and timing")
+    p_fstats.add_argument("--keywords", default="pump,token,shipping,building,rug,scam,need,looking for,bug,broken",
+                          help="Comma-separated keywords to match")
+    p_fstats.add_argument("--since", help="ISO timestamp to filter from")
+    p_fstats.add_argument("--live", action="store_true", help="Use real X API (requires key)")
+    p_fstats.add_argument("--json", action="store_true", help="Print raw JSON")
+    p_fstats.set_defaults(func=cmd_filter_stats)
+
+    # batch-submit / batch-poll / batch-list
+    p_bsubmit = subs.add_parser("batch-submit", help="Submit filtered signals as a batch classification job")
+    p_bsubmit.add_argument("--keywords", default="pump,token,shipping,building,rug,scam,need,looking for,bug,broken",
+                           help="Comma-separated keywords to match")
+    p_bsubmit.add_argument("--since", help="ISO timestamp to filter from")
+    p_bsubmit.add_argument("--live", action="store_true", help="Use real X API (requires key)")
+    p_bsubmit.add_argument("--base-url", help="Messages API base URL (e.g. the local stub server)")
+    p_bsubmit.set_defaults(func=cmd_batch_submit)
+
+    p_bpoll = subs.add_parser("batch-poll", help="Poll open batch jobs; merge finished ones")
+    p_bpoll.add_argument("--wait", action="store_true", help="Keep polling until every job is merged")
+    p_bpoll.add_argument("--interval", type=float, default=60.0, help="Seconds between polls with --wait")
+    p_bpoll.add_argument("--retry-failed", action="store_true", help="Resubmit items that errored")
+    p_bpoll.add_argument("--base-url", help="Messages API base URL (e.g. the local stub server)")
+    p_bpoll.set_defaults(func=cmd_batch_poll)
+
+    p_blist = subs.add_parser("batch-list", help="List batch classification jobs")
+    p_blist.add_argument("--limit", type=int, default=20)
+    p_blist.set_defaults(func=cmd_batch_list)
+
+    # rebuild-index
+    p_rebuild = subs.add_parser("rebuild-index", help="Rebuild the known source_id Bloom filter")
+    p_rebuild.add_argument("--path", help="Filter file (default: next to the queue DB, .bloom)")
+    p_rebuild.set_defaults(func=cmd_rebuild_index)
+
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
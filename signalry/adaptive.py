@@ -0,0 +1,291 @@
+"""
+Adaptive concurrency for LLM calls — AIMD limiter plus circuit breaker.
+
+A fixed `concurrency` is either below what the account allows (throughput
+left on the table) or above it (429s, then retries on top). The limiter
+finds the level from the API's own signals instead.
+
+Design:
+- AdaptiveLimiter: AIMD on the number of requests in flight.
+  Additive increase: +1 per `limit` successful requests whose latency
+  stays within `latency_tolerance` × the recent minimum (stable latency).
+  Multiplicative decrease: × `backoff` (halve) on a throttle
+  (429 rate_limit / 529 overloaded) or a timeout — once per round trip:
+  drops reported by requests that started before the last decrease do
+  not cut again, so a burst of 429s halves once, not N times.
+- Retry-After is honored: a throttle carrying it pauses every new
+  acquisition until it has passed.
+- history keeps (seconds since start, limit) for every change.
+- CircuitBreaker: `failure_threshold` consecutive failed calls open it;
+  while open callers fail over (LLMClassifier → MockClassifier). After
+  `reset_after` seconds one probe is let through (half-open); its
+  success closes the breaker, its failure reopens it.
+
+Both are thread-safe and loop-agnostic (waiters are woken on their own
+event loop), so one limiter spans every batch a classifier runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+DEFAULT_MAX_LIMIT = 64
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class AdaptiveLimiter:
+    """
+    Usage:
+        limiter = AdaptiveLimiter(initial=8, max_limit=64)
+        started = await limiter.acquire()
+        try:
+            ...                     # the API call
+            limiter.on_success(started, latency)
+        except <429 / 529>:
+            limiter.on_throttle(started, retry_after=...)
+        finally:
+            limiter.release()
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_window: int = 50,
+        history_size: int = 1000,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("need 1 <= min_limit <= initial <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be in (0, 1)")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._recent: Deque[float] = deque(maxlen=latency_window)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.history: Deque[Tuple[float, int]] = deque([(0.0, initial)], maxlen=history_size)
+        self.increases = 0
+        self.decreases = 0
+        self.throttles = 0
+        self.timeouts = 0
+        self.paused_seconds = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # ── Slots ───────────────────────────────────────────────────────────
+
+    async def acquire(self) -> float:
+        """Wait for a slot (and any Retry-After pause). Returns the start time."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                pause = self._paused_until - now
+                if pause <= 0 and self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return now
+                fut = None
+                if pause <= 0:
+                    loop = asyncio.get_running_loop()
+                    fut = loop.create_future()
+                    self._waiters.append((loop, fut))
+            if fut is None:
+                await asyncio.sleep(pause)
+                continue
+            try:
+                await fut
+            except asyncio.CancelledError:
+                with self._lock:
+                    try:
+                        self._waiters.remove((asyncio.get_running_loop(), fut))
+                    except ValueError:
+                        pass
+                    self._wake()        # it may have been handed a wake-up it won't use
+                raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake()
+
+    def _wake(self) -> None:
+        # Caller holds the lock. Wake as many waiters as there are free slots.
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            loop, fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            loop.call_soon_threadsafe(_resolve, fut)
+            free -= 1
+
+    # ── Feedback ────────────────────────────────────────────────────────
+
+    def _set_limit(self, value: float) -> None:
+        old = self.limit
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), value))
+        if self.limit != old:
+            self.history.append((round(time.monotonic() - self._start, 3), self.limit))
+
+    def on_success(self, started: float, latency: float) -> None:
+        with self._lock:
+            self._recent.append(latency)
+            if latency <= self.latency_tolerance * min(self._recent):
+                before = self.limit
+                self._set_limit(self._limit + 1.0 / self._limit)
+                if self.limit > before:
+                    self.increases += 1
+                    self._wake()
+
+    def _decrease(self, started: float) -> None:
+        if started < self._last_decrease:
+            return                  # already cut for this round trip
+        self._last_decrease = time.monotonic()
+        self._set_limit(self._limit * self.backoff)
+        self.decreases += 1
+
+    def on_throttle(self, started: float, retry_after: Optional[float] = None) -> None:
+        """A 429/529 — halve, and pause new requests for `retry_after` seconds."""
+        with self._lock:
+            self.throttles += 1
+            self._decrease(started)
+            if retry_after:
+                until = time.monotonic() + retry_after
+                if until > self._paused_until:
+                    self.paused_seconds += until - max(self._paused_until, time.monotonic())
+                    self._paused_until = until
+
+    def on_timeout(self, started: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self._decrease(started)
+
+    # ── Metrics ─────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self._in_flight,
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "throttles": self.throttles,
+                "timeouts": self.timeouts,
+                "paused_seconds": round(self.paused_seconds, 3),
+                "history": list(self.history),
+            }
+
+    def reset_stats(self) -> None:
+        """Clear counters and history; the current limit is kept."""
+        with self._lock:
+            self._start = time.monotonic()
+            self.history.clear()
+            self.history.append((0.0, self.limit))
+            self.increases = self.decreases = self.throttles = self.timeouts = 0
+            self.paused_seconds = 0.0
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half-open → closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opens = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+            self._state = self.HALF_OPEN
+            self._probing = False
+
+    def allow(self) -> bool:
+        """May a call go out now? In half-open state only one probe at a time."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def check(self) -> None:
+        if not self.allow():
+            raise CircuitOpenError("LLM circuit breaker open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != self.CLOSED:
+                self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self.opens += 1
+                self._state = self.OPEN
+
+    def abandon(self) -> None:
+        """A call ended without a verdict (cancelled): free the half-open probe."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "consecutive_failures": self._failures,
+        }
@@ -0,0 +1,274 @@
+"""
+Batch-job classification — nightly backfills through the Message Batches API.
+
+Backfills don't need answers in seconds; they need the lowest cost per
+signal. A Message Batch costs less per request than the Messages API and
+is not bound by our concurrency limits. It finishes within hours.
+
+Design:
+- BatchJobStore: two SQLite tables next to the review queue —
+  batch_jobs (one row per submitted batch) and batch_job_items (every
+  signal waiting on it, with the signal itself as JSON)
+- BatchJobRunner.submit(): one API request per near-duplicate group
+  representative (custom_id = signal.id); members wait on it too
+- BatchJobRunner.poll(): when a batch has ended, its results are merged
+  into the queue (signals / classifications / review_queue) with
+  momentum computed over the job
+- resume(): polls every job not yet merged — a restarted process picks
+  up where the last one stopped. Merging is idempotent (the queue
+  ignores rows it already has), so a crash mid-merge is safe to redo.
+
+Known gap: a crash between the API accepting a batch and the job row
+being written orphans that batch. Its signals are not queued, so the
+next run ingests and submits them again.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import ContextManager, Dict, Iterable, List, Optional, Set, Tuple
+
+from .db import shared
+from .models import Signal
+from .momentum import detect_momentum
+from .pains import PainIndex
+from .neardup import collapse_near_duplicates, for_member
+from .queue import ReviewQueue
+
+DEFAULT_MAX_REQUESTS = 10_000          # requests per submitted batch
+
+# Item states
+PENDING = "pending"
+MERGED = "merged"
+ERRORED = "errored"
+
+
+def _signal_to_json(signal: Signal) -> str:
+    return json.dumps(signal.to_dict())
+
+
+def _signal_from_json(data: str) -> Signal:
+    d = json.loads(data)
+    d["timestamp"] = datetime.fromisoformat(d["timestamp"])
+    return Signal(**d)
+
+
+class BatchJobStore:
+    """Submitted batch jobs and the signals waiting on them (SQLite)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self._db = shared(str(self.db_path))
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS batch_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT DEFAULT 'submitted',
+                    requests INTEGER,
+                    signals INTEGER,
+                    submitted_at TEXT,
+                    merged_at TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS batch_job_items (
+                    job_id TEXT REFERENCES batch_jobs(id),
+                    signal_id TEXT,
+                    representative_id TEXT,
+                    source_id TEXT,
+                    signal TEXT,
+                    state TEXT DEFAULT 'pending',
+                    PRIMARY KEY (job_id, signal_id)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_batch_items_source
+                    ON batch_job_items(source_id);
+            """)
+
+    def _conn(self) -> ContextManager[sqlite3.Connection]:
+        return self._db.write()
+
+    def record_job(self, job_id: str, items: List[Tuple[Signal, str]], requests: int) -> None:
+        """Persist a submitted job and its (signal, representative_id) items."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO batch_jobs (id, requests, signals, submitted_at) VALUES (?, ?, ?, ?)",
+                (job_id, requests, len(items), datetime.utcnow().isoformat()),
+            )
+            conn.executemany(
+                """INSERT INTO batch_job_items
+                   (job_id, signal_id, representative_id, source_id, signal)
+                   VALUES (?, ?, ?, ?, ?)""",
+                [(job_id, s.id, rep_id, s.source_id, _signal_to_json(s)) for s, rep_id in items],
+            )
+
+    def open_jobs(self) -> List[str]:
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT id FROM batch_jobs WHERE status = 'submitted' ORDER BY submitted_at"
+            ).fetchall()
+        return [r["id"] for r in rows]
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        with self._conn() as conn:
+            rows = conn.execute(
+                """SELECT j.*,
+                          SUM(i.state = 'pending') AS pending,
+                          SUM(i.state = 'merged') AS merged,
+                          SUM(i.state = 'errored') AS errored
+                   FROM batch_jobs j LEFT JOIN batch_job_items i ON i.job_id = j.id
+                   GROUP BY j.id ORDER BY j.submitted_at DESC LIMIT ?""",
+                (limit,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def items(self, job_id: str, state: Optional[str] = PENDING) -> List[Tuple[Signal, str]]:
+        """(signal, representative_id) for a job's items, optionally by state."""
+        query = "SELECT signal, representative_id FROM batch_job_items WHERE job_id = ?"
+        params: Tuple = (job_id,)
+        if state is not None:
+            query += " AND state = ?"
+            params += (state,)
+        with self._conn() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [(_signal_from_json(r["signal"]), r["representative_id"]) for r in rows]
+
+    def mark_items(self, job_id: str, states: Dict[str, str]) -> None:
+        with self._conn() as conn:
+            conn.executemany(
+                "UPDATE batch_job_items SET state = ? WHERE job_id = ? AND signal_id = ?",
+                [(state, job_id, signal_id) for signal_id, state in states.items()],
+            )
+
+    def finish_job(self, job_id: str) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE batch_jobs SET status = 'merged', merged_at = ? WHERE id = ?",
+                (datetime.utcnow().isoformat(), job_id),
+            )
+
+    def pending_source_ids(self, source_ids: Iterable[str]) -> Set[str]:
+        """source_ids already waiting in an unmerged job — don't submit them twice."""
+        ids = list(source_ids)
+        found: Set[str] = set()
+        with self._conn() as conn:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"""SELECT source_id FROM batch_job_items
+                        WHERE state = 'pending' AND source_id IN ({marks})""",
+                    chunk,
+                ).fetchall()
+                found.update(r["source_id"] for r in rows)
+        return found
+
+
+class BatchJobRunner:
+    """
+    Submit, poll and merge batch classification jobs.
+
+    Usage:
+        runner = BatchJobRunner(LLMClassifier(), ReviewQueue())
+        job_ids = runner.submit(filtered_signals)
+        ...                                    # later, maybe another process
+        for report in runner.resume():
+            print(report)
+    """
+
+    def __init__(
+        self,
+        classifier,
+        queue: Optional[ReviewQueue] = None,
+        store: Optional[BatchJobStore] = None,
+        known_ids=None,
+        max_requests: int = DEFAULT_MAX_REQUESTS,
+    ):
+        self.classifier = classifier           # needs the LLMClassifier batch methods
+        self.queue = queue or ReviewQueue()
+        self.store = store or BatchJobStore(str(self.queue.db_path))
+        self.known_ids = known_ids             # KnownIdIndex to update on merge
+        self.pains = PainIndex(str(self.queue.db_path))
+        self.max_requests = max_requests
+
+    def submit(self, signals: List[Signal], collapse_near_dupes: bool = True) -> List[str]:
+        """
+        Submit signals not already pending in another job. Near-duplicates
+        ride on their representative's request. Returns the new job ids.
+        """
+        pending = self.store.pending_source_ids(s.source_id for s in signals)
+        signals = [s for s in signals if s.source_id not in pending]
+        if collapse_near_dupes:
+            groups = [(g.representative, g.members) for g in collapse_near_duplicates(signals)]
+        else:
+            groups = [(s, [s]) for s in signals]
+
+        job_ids = []
+        for i in range(0, len(groups), self.max_requests):
+            chunk = groups[i:i + self.max_requests]
+            job_id = self.classifier.submit_batch_job([rep for rep, _ in chunk])
+            items = [(m, rep.id) for rep, members in chunk for m in members]
+            self.store.record_job(job_id, items, requests=len(chunk))
+            job_ids.append(job_id)
+        return job_ids
+
+    def poll(self, job_id: str) -> Dict:
+        """Check a job; if it has ended, merge its results into the queue."""
+        status = self.classifier.batch_job_status(job_id)
+        report = {"job_id": job_id, **status, "queued": 0, "failed": 0}
+        if status["status"] != "ended":
+            return report
+
+        items = self.store.items(job_id)
+        reps = {s.id: s for s, rep_id in items if s.id == rep_id}
+        results = dict(self.classifier.batch_job_results(job_id, reps))
+
+        signals, classifications, states = [], [], {}
+        for signal, rep_id in items:
+            cls = results.get(rep_id)
+            if cls is None:
+                states[signal.id] = ERRORED
+                continue
+            signals.append(signal)
+            classifications.append(for_member(cls, reps[rep_id], signal))
+            states[signal.id] = MERGED
+
+        classifications = detect_momentum(signals, classifications, pains=self.pains)
+        report["queued"] += sum(self.queue.add_many(zip(signals, classifications)))
+        if self.known_ids is not None:
+            self.known_ids.add(s.source_id for s in signals)
+            self.known_ids.save()
+
+        self.store.mark_items(job_id, states)
+        self.store.finish_job(job_id)
+        report["failed"] = sum(1 for st in states.values() if st == ERRORED)
+        report["status"] = "merged"
+        return report
+
+    def resume(self) -> List[Dict]:
+        """Poll every job that has not been merged yet (e.g. after a restart)."""
+        return [self.poll(job_id) for job_id in self.store.open_jobs()]
+
+    def wait(self, interval: float = 60.0, timeout: Optional[float] = None) -> List[Dict]:
+        """resume() until no job is left open (or `timeout` seconds pass)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        reports: List[Dict] = []
+        while True:
+            reports.extend(r for r in self.resume() if r["status"] == "merged")
+            if not self.store.open_jobs():
+                return reports
+            if deadline is not None and time.monotonic() >= deadline:
+                return reports
+            time.sleep(interval)
+
+    def resubmit_failed(self, job_id: str) -> List[str]:
+        """Submit a job's errored items again as a new job."""
+        failed = [s for s, _ in self.store.items(job_id, state=ERRORED)]
+        if not failed:
+            return []
+        job_ids = self.submit(failed, collapse_near_dupes=True)
+        self.store.mark_items(job_id, {s.id: "resubmitted" for s in failed})
+        return job_ids
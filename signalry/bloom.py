@@ -0,0 +1,220 @@
+"""
+Bloom filter pre-check — skip posts the queue already holds.
+
+Without this, a post we have already seen still goes through filtering
+and (paid) classification before ReviewQueue.add finds the duplicate via
+the UNIQUE source_id constraint.
+
+Design:
+- BloomFilter: fixed-size bit array, k hashes from one blake2b digest
+  (double hashing). Serialises to a small file.
+- KnownIdIndex: a BloomFilter of every signals.source_id, rebuilt from
+  the signals table. In memory by default (one indexed scan per start);
+  given a path (e.g. sidecar_path(queue): data/signalry.db →
+  data/signalry.bloom) it is loaded from and saved to that file instead.
+- count is the number of distinct keys added (a key whose bits were all
+  set already is not counted), so the fill estimate and the resize
+  trigger don't drift with re-adds.
+
+A Bloom filter can say "maybe seen" for a new post, never "not seen" for
+an old one. Every "maybe" is confirmed against SQLite, so a false
+positive costs one indexed lookup — never a dropped signal.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Signal
+
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.001
+
+_MAGIC = b"SGBF1"
+_HEADER = struct.Struct("<5sQIQQd")    # magic, bits, hashes, count, capacity, error_rate
+
+
+class BloomFilter:
+    """Space-efficient set membership with a tunable false-positive rate."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal sizing: m = -n·ln(p) / ln(2)², k = (m/n)·ln(2)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return ((h1 + i * h2) % m for i in range(self.num_hashes))
+
+    def add(self, key: str) -> bool:
+        """Set key's bits. False if they were all set already (not counted)."""
+        bits = self._bits
+        new = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_fp_rate(self) -> float:
+        """Expected false-positive rate at the current fill: (1 - e^(-k·n/m))^k."""
+        if self.count == 0:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    # ── Persistence ─────────────────────────────────────────────────────
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count,
+                              self.capacity, self.error_rate)
+        return header + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        magic, num_bits, num_hashes, count, capacity, error_rate = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a Signalry Bloom filter file")
+        bf = cls.__new__(cls)
+        bf.capacity = capacity
+        bf.error_rate = error_rate
+        bf.num_bits = num_bits
+        bf.num_hashes = num_hashes
+        bf.count = count
+        bf._bits = bytearray(data[_HEADER.size:])
+        if len(bf._bits) != (num_bits + 7) // 8:
+            raise ValueError("Truncated Bloom filter file")
+        return bf
+
+    def save(self, path: Path) -> None:
+        """Write atomically (temp file + rename) so a crash never leaves half a filter."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BloomFilter":
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+def sidecar_path(queue) -> Path:
+    """The conventional filter file next to a queue DB: signalry.db → signalry.bloom."""
+    return Path(queue.db_path).with_suffix(".bloom")
+
+
+class KnownIdIndex:
+    """
+    Bloom filter of source_ids already stored in a ReviewQueue.
+
+    Usage:
+        index = KnownIdIndex(queue)        # or KnownIdIndex(queue, sidecar_path(queue))
+        new, known = index.partition(raw_signals)
+        ...
+        index.add(s.source_id for s in queued)
+        index.save()                       # no-op in memory
+    """
+
+    def __init__(
+        self,
+        queue,
+        path: Optional[str] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+    ):
+        self.queue = queue
+        self.path = Path(path) if path else None
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.checked = 0
+        self.false_positives = 0
+        self.bloom = self._load_or_rebuild()
+
+    def _load_or_rebuild(self) -> BloomFilter:
+        if self.path is not None and self.path.exists():
+            try:
+                return BloomFilter.load(self.path)
+            except (ValueError, struct.error):
+                pass    # corrupt or old format — fall through to rebuild
+        return self.rebuild()
+
+    def rebuild(self) -> BloomFilter:
+        """Rebuild from the signals table (and save, given a path). Sized for 2x current rows."""
+        capacity = max(self.capacity, 2 * self.queue.count_signals())
+        bloom = BloomFilter(capacity=capacity, error_rate=self.error_rate)
+        for source_id in self.queue.iter_source_ids():
+            bloom.add(source_id)
+        self.bloom = bloom
+        self.save()
+        return bloom
+
+    def partition(self, signals: List[Signal]) -> Tuple[List[Signal], List[Signal]]:
+        """
+        Split signals into (new, known). Bloom hits are confirmed in SQL,
+        so `known` only ever contains source_ids that really are stored.
+        """
+        maybe = [s for s in signals if s.source_id in self.bloom]
+        self.checked += len(signals)
+        if not maybe:
+            return list(signals), []
+
+        confirmed = self.queue.existing_source_ids([s.source_id for s in maybe])
+        self.false_positives += sum(1 for s in maybe if s.source_id not in confirmed)
+
+        new = [s for s in signals if s.source_id not in confirmed]
+        known = [s for s in signals if s.source_id in confirmed]
+        return new, known
+
+    def add(self, source_ids: Iterable[str]) -> None:
+        for source_id in source_ids:
+            self.bloom.add(source_id)
+        # Past capacity the FP rate climbs quickly — resize from the DB.
+        if len(self.bloom) > self.bloom.capacity:
+            self.rebuild()
+
+    def save(self) -> None:
+        if self.path is not None:
+            self.bloom.save(self.path)
+
+    def stats(self) -> Dict:
+        observed = self.false_positives / self.checked if self.checked else 0.0
+        return {
+            "items": len(self.bloom),
+            "capacity": self.bloom.capacity,
+            "bits": self.bloom.num_bits,
+            "hashes": self.bloom.num_hashes,
+            "memory_bytes": self.bloom.memory_bytes,
+            "estimated_fp_rate": round(self.bloom.estimated_fp_rate(), 6),
+            "checked": self.checked,
+            "false_positives": self.false_positives,
+            "observed_fp_rate": round(observed, 6),
+        }
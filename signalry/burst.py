@@ -0,0 +1,256 @@
+"""
+Burst detection — emerging pains: a spike, not a steady trickle.
+
+"3+ actors in 48h" fires the same for a pain that gets one post every
+few hours all week and for one that went from nothing to ten posts this
+afternoon. We care most about the second.
+
+Design:
+- Per pain, arrival counts in fixed buckets (default 1h × 168 = one
+  week) in a ring buffer: array('I'), 4 bytes a bucket, slot = bucket
+  mod size; buckets that fall off the end are overwritten
+- Score at `now`: the last `recent_buckets` (3h) against the rest of
+  the ring as baseline:
+      z = (recent − r·μ) / √(r · max(σ², μ, MIN_RATE))
+  μ, σ² are the baseline mean and variance per bucket; the max() keeps
+  a quiet or brand-new pain from dividing by zero (Poisson floor)
+- level = recent rate / baseline rate, in doublings (Kleinberg-style
+  burst levels: 1 = twice the usual rate, 3 = eight times)
+- emerging(): pains with z ≥ `z_threshold` and ≥ `min_count` recent
+  arrivals, ranked by z
+- Two ways in: add() per signal for live runs (O(1), plus zeroing the
+  buckets skipped since the pain's last arrival); from_queue() for
+  backfills, where SQLite buckets and counts (GROUP BY pain, bucket)
+  and add_counts() writes each pain's ring once — Python sees one row
+  per (pain, bucket), not one per signal
+- Arrival order does not matter: anything inside the ring's span is
+  counted, older arrivals are dropped, either path gives the same rings
+
+State is derived from the queue (from_queue reads the ring's span on
+the timestamp index), so nothing new is persisted.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .models import Classification, Signal
+from .pains import PainIndex
+
+DEFAULT_BUCKET_MINUTES = 60
+DEFAULT_BUCKETS = 168           # ring span: one week of hours
+DEFAULT_RECENT_BUCKETS = 3      # "now" = the last 3 hours
+Z_THRESHOLD = 3.0
+MIN_RECENT = 3                  # arrivals in the recent buckets to count as emerging
+MIN_RATE = 0.25                 # variance floor, arrivals per bucket
+
+_EPOCH = datetime(1970, 1, 1)   # naive UTC, as every timestamp here
+
+
+class _Ring:
+    """Counts for one pain; `head` is the newest bucket number written."""
+
+    __slots__ = ("counts", "head")
+
+    def __init__(self, size: int, head: int):
+        self.counts = array("I", [0]) * size
+        self.head = head
+
+
+class BurstDetector:
+    """
+    Usage:
+        bursts = BurstDetector.from_queue(queue, pains)      # backfill
+        bursts.update(signals, classifications)              # live batch
+        for e in bursts.emerging(): ...
+    """
+
+    def __init__(
+        self,
+        bucket_minutes: int = DEFAULT_BUCKET_MINUTES,
+        buckets: int = DEFAULT_BUCKETS,
+        recent_buckets: int = DEFAULT_RECENT_BUCKETS,
+        z_threshold: float = Z_THRESHOLD,
+        min_count: int = MIN_RECENT,
+        pains: Optional[PainIndex] = None,
+    ):
+        if not 1 <= recent_buckets < buckets // 2:
+            raise ValueError("need 1 <= recent_buckets < buckets / 2")
+        self.bucket_seconds = bucket_minutes * 60
+        self._bucket_width = timedelta(minutes=bucket_minutes)
+        self.size = buckets
+        self.recent_buckets = recent_buckets
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.pains = pains or PainIndex()
+        self._rings: Dict[str, _Ring] = {}
+        self.observed = 0
+
+    def _bucket(self, ts: datetime) -> int:
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        return (ts - _EPOCH) // self._bucket_width
+
+    @property
+    def span(self) -> timedelta:
+        return timedelta(seconds=self.size * self.bucket_seconds)
+
+    @property
+    def memory_bytes(self) -> int:
+        return 4 * self.size * len(self._rings)
+
+    # ── Counting ────────────────────────────────────────────────────────
+
+    def _advance(self, ring: _Ring, bucket: int) -> None:
+        """Move the ring's head to `bucket`, zeroing the buckets in between."""
+        gap = bucket - ring.head
+        counts, size = ring.counts, self.size
+        if gap >= size:
+            counts[:] = array("I", [0]) * size
+        else:
+            for b in range(ring.head + 1, bucket + 1):
+                counts[b % size] = 0
+        ring.head = bucket
+
+    def add(self, pain: str, timestamp: datetime, count: int = 1) -> bool:
+        """Count arrivals on canonical `pain`. False if older than the ring holds."""
+        bucket = self._bucket(timestamp)
+        ring = self._rings.get(pain)
+        if ring is None:
+            ring = self._rings[pain] = _Ring(self.size, bucket)
+        elif bucket > ring.head:
+            self._advance(ring, bucket)
+        elif bucket <= ring.head - self.size:
+            return False
+        ring.counts[bucket % self.size] += count
+        self.observed += count
+        return True
+
+    def add_many(self, arrivals: Iterable[Tuple[str, datetime]]) -> int:
+        """add() each (pain, timestamp), in any order. Returns arrivals kept."""
+        add = self.add
+        return sum(add(pain, ts) for pain, ts in arrivals)
+
+    def add_counts(self, counts: Iterable[Tuple[str, int, int]]) -> int:
+        """Add pre-bucketed (pain, bucket number, count) rows. Returns arrivals kept."""
+        per_pain: Dict[str, List[Tuple[int, int]]] = {}
+        for pain, bucket, n in counts:
+            per_pain.setdefault(pain, []).append((bucket, n))
+        kept = 0
+        size = self.size
+        for pain, rows in per_pain.items():
+            newest = max(b for b, _ in rows)
+            ring = self._rings.get(pain)
+            if ring is None:
+                ring = self._rings[pain] = _Ring(size, newest)
+            elif newest > ring.head:
+                self._advance(ring, newest)
+            oldest = ring.head - size
+            ring_counts = ring.counts
+            for bucket, n in rows:
+                if bucket > oldest:
+                    ring_counts[bucket % size] += n
+                    kept += n
+        self.observed += kept
+        return kept
+
+    # ── Scoring ─────────────────────────────────────────────────────────
+
+    def _window(self, ring: _Ring, now_bucket: int) -> List[int]:
+        """Counts for buckets now_bucket, now_bucket − 1, … (newest first)."""
+        counts, size, head = ring.counts, self.size, ring.head
+        return [counts[b % size] if head - size < b <= head else 0
+                for b in range(now_bucket, now_bucket - size, -1)]
+
+    def score(self, pain: str, now: Optional[datetime] = None) -> Optional[Dict]:
+        ring = self._rings.get(pain)
+        if ring is None:
+            return None
+        window = self._window(ring, self._bucket(now or datetime.utcnow()))
+        r = self.recent_buckets
+        recent = sum(window[:r])
+        baseline = window[r:]
+        mean = sum(baseline) / len(baseline)
+        var = sum((c - mean) ** 2 for c in baseline) / len(baseline)
+        z = (recent - r * mean) / math.sqrt(r * max(var, mean, MIN_RATE))
+        rate_ratio = (recent / r) / max(mean, MIN_RATE / 2)
+        return {
+            "recent": recent,
+            "baseline_rate": round(mean, 4),
+            "z": round(z, 2),
+            "level": max(0, int(math.log2(rate_ratio))) if rate_ratio >= 1 else 0,
+        }
+
+    def is_emerging(self, pain: str, now: Optional[datetime] = None) -> bool:
+        score = self.score(pain, now)
+        return (score is not None and score["recent"] >= self.min_count
+                and score["z"] >= self.z_threshold)
+
+    def emerging(self, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Emerging pains, highest z first."""
+        found = []
+        for pain in self._rings:
+            score = self.score(pain, now)
+            if score and score["recent"] >= self.min_count and score["z"] >= self.z_threshold:
+                found.append({"pain": self.pains.label(pain), "pain_key": pain, **score})
+        found.sort(key=lambda e: (-e["z"], e["pain_key"]))
+        return found[:limit] if limit is not None else found
+
+    def update(
+        self,
+        signals: List[Signal],
+        classifications: List[Classification],
+        now: Optional[datetime] = None,
+    ) -> Set[str]:
+        """
+        Live path: count a batch, then set momentum_flag on its
+        classifications whose pain is emerging. Returns those pain keys.
+        """
+        sig_by_id = {s.id: s for s in signals}
+        keys = self.pains.keys(cls.primary_pain for cls in classifications)
+        for cls in classifications:
+            sig = sig_by_id.get(cls.signal_id)
+            if sig is not None:
+                self.add(keys[cls.primary_pain], sig.timestamp)
+        emerging = {pain for pain in set(keys.values()) if self.is_emerging(pain, now)}
+        for cls in classifications:
+            if keys[cls.primary_pain] in emerging:
+                cls.momentum_flag = True
+        return emerging
+
+    # ── Backfill from the review queue ──────────────────────────────────
+
+    @classmethod
+    def from_queue(cls, queue, pains: Optional[PainIndex] = None,
+                   now: Optional[datetime] = None, **kwargs) -> "BurstDetector":
+        """
+        Build from queued signals inside the ring's span. SQLite buckets
+        and counts them (timestamp index), so only one row per (raw
+        pain, bucket) reaches Python.
+        """
+        detector = cls(pains=pains, **kwargs)
+        since = (now or datetime.utcnow()) - detector.span
+        with queue.read() as conn:
+            rows = conn.execute(
+                """SELECT c.primary_pain, CAST(strftime('%s', s.timestamp) AS INTEGER) / ? AS b,
+                          COUNT(*)
+                   FROM signals s JOIN classifications c ON c.signal_id = s.id
+                   WHERE s.timestamp >= ?
+                   GROUP BY c.primary_pain, b""",
+                (detector.bucket_seconds, since.isoformat()),
+            ).fetchall()
+        keys = detector.pains.keys(pain for pain, _, _ in rows)
+        detector.add_counts((keys[pain], b, n) for pain, b, n in rows)
+        return detector
+
+    def stats(self) -> Dict:
+        return {
+            "pains": len(self._rings),
+            "observed": self.observed,
+            "memory_bytes": self.memory_bytes,
+            "bucket_minutes": self.bucket_seconds // 60,
+            "buckets": self.size,
+        }
@@ -0,0 +1,360 @@
+"""
+Classification cache — identical text is classified once.
+
+Quote-retweets, cross-posts from Slack/Intercom and re-runs over
+overlapping --since windows send the same text through the classifier
+again. CachedClassifier wraps any ClassifierBase and answers repeats
+from a cache instead.
+
+Design:
+- Key: sha256 of the classifier version + normalized text (Unicode NFKC,
+  whitespace collapsed). A prompt or model change gets a fresh keyspace.
+- Two tiers: an in-memory LRU (OrderedDict) over a SQLite table. The
+  table can live in its own file or share the queue database; either
+  way it goes through that file's db.shared() manager (disk lookups on
+  a pooled reader, writes on the one writer).
+- TTL: entries older than `ttl` seconds are misses and get dropped.
+- Size: the memory tier holds `memory_size` entries; the table is trimmed
+  to `max_rows` by least-recent use.
+- On a hit the classification is rebuilt for the new signal: its own
+  signal_id, and the author handle in recommended_action swapped for the
+  new author — whole handles only (neardup.swap_actor), so a short
+  handle never rewrites part of a longer word.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .classify import ClassifierBase, LLMClassifier
+from .db import shared
+from .models import Classification, IntentStage, Signal, Urgency
+from .neardup import swap_actor
+
+DEFAULT_CACHE_PATH = "data/classify_cache.db"
+DEFAULT_TTL = 7 * 24 * 3600            # one week
+DEFAULT_MEMORY_SIZE = 10_000
+DEFAULT_MAX_ROWS = 500_000
+
+_ACTOR = "\x00actor\x00"               # placeholder for the author in cached actions
+
+
+def normalize_text(text: str) -> str:
+    """Canonical text for cache keys: NFKC, whitespace collapsed, trimmed."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def cache_key(text: str, version: str) -> str:
+    payload = f"{version}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _to_entry(cls: Classification, actor: str) -> Dict:
+    data = cls.to_dict()
+    del data["signal_id"]
+    data["momentum_flag"] = False       # momentum is per run, never cached
+    if actor:
+        data["recommended_action"] = swap_actor(data["recommended_action"], actor, _ACTOR)
+    return data
+
+
+def _from_entry(data: Dict, signal: Signal) -> Classification:
+    return Classification(
+        signal_id=signal.id,
+        intent_stage=IntentStage(data["intent_stage"]),
+        primary_pain=data["primary_pain"],
+        urgency=Urgency(data["urgency"]),
+        confidence=float(data["confidence"]),
+        momentum_flag=False,
+        recommended_action=data["recommended_action"].replace(_ACTOR, signal.actor),
+    )
+
+
+class ClassificationCache:
+    """
+    Two-tier (memory LRU → SQLite) store of classifications by cache key.
+
+    Thread-safe: the memory tier and counters are guarded by a lock, so
+    the async batch path and worker threads can share it.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = DEFAULT_TTL,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        max_rows: int = DEFAULT_MAX_ROWS,
+    ):
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._touched: Dict[str, float] = {}     # disk hits → last_used, flushed with writes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._db = shared(str(self.db_path))
+        self._closed = False
+        with self._db.write() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS classification_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_last_used
+                    ON classification_cache(last_used);
+            """)
+
+    def _fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl is None or now - created_at < self.ttl
+
+    def _remember(self, key: str, data: Dict, created_at: float) -> None:
+        self._memory[key] = (data, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached entry for `key`, or None (missing or expired)."""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                data, created_at = cached
+                if self._fresh(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return data
+                del self._memory[key]
+
+            with self._db.read() as conn:
+                row = conn.execute(
+                    "SELECT payload, created_at FROM classification_cache WHERE key = ?", (key,),
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            payload, created_at = row
+            if not self._fresh(created_at, now):
+                with self._db.write() as conn:
+                    conn.execute("DELETE FROM classification_cache WHERE key = ?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= 500:
+                with self._db.write() as conn:
+                    self._flush_touched(conn)
+            data = json.loads(payload)
+            self._remember(key, data, created_at)
+            self.disk_hits += 1
+            return data
+
+    def put_many(self, entries: List[Tuple[str, Dict]]) -> None:
+        """Store entries in both tiers, then trim the table to max_rows."""
+        if not entries:
+            return
+        now = time.time()
+        with self._lock, self._db.write() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO classification_cache (key, payload, created_at, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(data), now, now) for key, data in entries],
+            )
+            for key, data in entries:
+                self._remember(key, data, now)
+            self._flush_touched(conn)
+            self._writes += len(entries)
+            if self._writes >= max(1, self.max_rows // 100):     # trim ~every 1% of capacity
+                self._trim(conn)
+                self._writes = 0
+
+    def put(self, key: str, data: Dict) -> None:
+        self.put_many([(key, data)])
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        # Deferred so a read never takes the shared writer.
+        if self._touched:
+            conn.executemany(
+                "UPDATE classification_cache SET last_used = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        (rows,) = conn.execute("SELECT COUNT(*) FROM classification_cache").fetchone()
+        excess = rows - self.max_rows
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM classification_cache WHERE key IN ("
+                "SELECT key FROM classification_cache ORDER BY last_used LIMIT ?)", (excess,),
+            )
+            self.evictions += excess
+
+    def purge_expired(self) -> int:
+        """Delete every expired row. Returns count removed."""
+        if self.ttl is None:
+            return 0
+        with self._lock, self._db.write() as conn:
+            cur = conn.execute(
+                "DELETE FROM classification_cache WHERE created_at < ?", (time.time() - self.ttl,),
+            )
+            self._memory.clear()
+            return cur.rowcount
+
+    def __len__(self) -> int:
+        with self._db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM classification_cache").fetchone()[0]
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def reset_stats(self) -> None:
+        self.memory_hits = self.disk_hits = self.misses = self.expired = self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            with self._db.write() as conn:
+                self._flush_touched(conn)
+            self._db.close()                 # releases this holder; the queue may keep the file
+            self._closed = True
+
+    def __enter__(self) -> "ClassificationCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CachedClassifier(ClassifierBase):
+    """
+    Wraps a classifier with a ClassificationCache.
+
+    Usage:
+        clf = CachedClassifier(get_classifier(live=True), ClassificationCache())
+        clf.classify_batch(signals)    # only unseen texts reach the LLM
+
+    Within one batch, signals with the same text are classified once.
+    Results the inner classifier reports as fallback (tier_of, LLM
+    outage) are returned but not cached.
+    """
+
+    def __init__(self, inner: ClassifierBase, cache: Optional[ClassificationCache] = None):
+        self.inner = inner
+        self.cache = cache if cache is not None else ClassificationCache()
+        self._hit_ids: Set[str] = set()     # this run's signals answered from cache
+        self._fallback_ids: Set[str] = set()    # copies of a fallback result in a batch
+
+    @property
+    def version(self) -> str:
+        return self.inner.version
+
+    def _key(self, signal: Signal) -> str:
+        return cache_key(signal.text, self.inner.version)
+
+    def _fell_back(self, signal: Signal) -> bool:
+        return self.inner.tier_of(signal.id) == LLMClassifier.FALLBACK
+
+    def classify(self, signal: Signal) -> Classification:
+        key = self._key(signal)
+        data = self.cache.get(key)
+        if data is not None:
+            self._hit_ids.add(signal.id)
+            return _from_entry(data, signal)
+        cls = self.inner.classify(signal)
+        if not self._fell_back(signal):
+            self.cache.put(key, _to_entry(cls, signal.actor))
+        return cls
+
+    async def aclassify(self, signal: Signal) -> Classification:
+        key = self._key(signal)
+        data = self.cache.get(key)
+        if data is not None:
+            self._hit_ids.add(signal.id)
+            return _from_entry(data, signal)
+        cls = await self.inner.aclassify(signal)
+        if not self._fell_back(signal):
+            self.cache.put(key, _to_entry(cls, signal.actor))
+        return cls
+
+    def classify_batch(self, signals: List[Signal]) -> List[Classification]:
+        results: List[Optional[Classification]] = [None] * len(signals)
+        pending: Dict[str, List[int]] = {}     # key → positions waiting on it
+        for i, signal in enumerate(signals):
+            key = self._key(signal)
+            if key in pending:
+                pending[key].append(i)
+                continue
+            data = self.cache.get(key)
+            if data is not None:
+                results[i] = _from_entry(data, signal)
+                self._hit_ids.add(signal.id)
+            else:
+                pending[key] = [i]
+
+        if pending:
+            firsts = [signals[positions[0]] for positions in pending.values()]
+            fresh = self.inner.classify_batch(firsts)
+            entries = []
+            for (key, positions), rep, cls in zip(pending.items(), firsts, fresh):
+                data = _to_entry(cls, rep.actor)
+                fell_back = self._fell_back(rep)
+                if not fell_back:
+                    entries.append((key, data))
+                results[positions[0]] = cls
+                for i in positions[1:]:
+                    results[i] = _from_entry(data, signals[i])
+                    (self._fallback_ids if fell_back else self._hit_ids).add(signals[i].id)
+            self.cache.put_many(entries)
+        return results
+
+    def tier_of(self, signal_id: str) -> Optional[str]:
+        if signal_id in self._hit_ids:
+            return "cache"
+        if signal_id in self._fallback_ids:
+            return LLMClassifier.FALLBACK
+        return self.inner.tier_of(signal_id)
+
+    def stats(self) -> Dict:
+        return {**self.inner.stats(), "cache": self.cache.stats()}
+
+    def reset_stats(self) -> None:
+        self.inner.reset_stats()
+        self.cache.reset_stats()
+        self._hit_ids.clear()
+        self._fallback_ids.clear()
+
+    def close(self) -> None:
+        self.cache.close()
+        close = getattr(self.inner, "close", None)
+        if close is not None:
+            close()
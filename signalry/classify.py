@@ -5,9 +5,10 @@ Takes filtered signals, sends them to an LLM, returns structured
 Classification objects.
 
 Design:
-- ClassifierBase: abstract interface
+- ClassifierBase: abstract interface (sync + asyncio batch path)
 - MockClassifier: deterministic, for testing (no API calls)
 - LLMClassifier: real classifier using Anthropic Claude API
+- CascadeClassifier: heuristics first, LLM only for unclear posts
 
 The mock classifier uses keyword heuristics. It's not smart,
 but it lets you run the full pipeline end-to-end without API keys.
@@ -15,14 +16,32 @@ but it lets you run the full pipeline end-to-end without API keys.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import math
 import os
 import re
+import textwrap
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
-
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .adaptive import DEFAULT_MAX_LIMIT, AdaptiveLimiter, CircuitBreaker, CircuitOpenError
+from .client_pool import (
+    DEFAULT_KEEPALIVE_EXPIRY, DEFAULT_MAX_CONNECTIONS, DEFAULT_MAX_RETRIES, AnthropicClientPool,
+    _sdk,
+)
+from .concurrency import LatencyRecorder, TokenBucket, gather_bounded
+from .keywords import KeywordAutomaton
 from .models import Signal, Classification, IntentStage, Urgency
 
+# Async client shared by every request of a batch awaited on a caller's own
+# event loop (task-local). Batches run through classify_batch use the pool.
+_batch_client: ContextVar = ContextVar("signalry_batch_client", default=None)
+
 
 class ClassifierBase(ABC):
     """Interface for signal classifiers."""
@@ -36,57 +55,118 @@ class ClassifierBase(ABC):
         """Classify multiple signals. Default: sequential."""
         return [self.classify(s) for s in signals]
 
+    async def aclassify(self, signal: Signal) -> Classification:
+        """Async classify. Default: run classify() in a worker thread."""
+        return await asyncio.to_thread(self.classify, signal)
+
+    async def classify_batch_async(
+        self,
+        signals: List[Signal],
+        concurrency: int = 8,
+        rate_per_sec: Optional[float] = None,
+        timeout: Optional[float] = None,
+        latencies: Optional[LatencyRecorder] = None,
+        return_exceptions: bool = False,
+    ) -> List[Classification]:
+        """
+        Classify concurrently: at most `concurrency` in flight, optional
+        token-bucket rate limit, per-request timeout. Results keep input order.
+        With `return_exceptions`, a failed signal's exception takes its slot.
+        """
+        limiter = TokenBucket(rate_per_sec) if rate_per_sec else None
+        return await gather_bounded(
+            signals, self.aclassify,
+            concurrency=concurrency, limiter=limiter, timeout=timeout, latencies=latencies,
+            return_exceptions=return_exceptions,
+        )
+
+    @property
+    def version(self) -> str:
+        """Identifies what produced a result — cached results are keyed on it."""
+        return type(self).__name__
+
+    def stats(self) -> Dict:
+        """Per-run metrics for Pipeline output. Empty unless a subclass tracks any."""
+        return {}
+
+    def reset_stats(self) -> None:
+        """Called by Pipeline at the start of each run."""
+
+    def tier_of(self, signal_id: str) -> Optional[str]:
+        """Which tier produced this run's result for signal_id, if tracked."""
+        return None
+
+
+# ── Keyword rules (MockClassifier) ──────────────────────────────────────────
+
+# Checked in order; a later stage overrides an earlier one.
+STAGE_KEYWORDS: List[Tuple[IntentStage, Tuple[str, ...]]] = [
+    (IntentStage.EVALUATING, ("need", "looking for", "searching", "recommend")),
+    (IntentStage.REQUESTING, ("please add", "feature request", "wish", "when will")),
+    (IntentStage.CHURNING, ("leaving", "left", "dropped", "cancelled", "switching back")),
+    (IntentStage.ADVOCATING, ("love", "switched to", "started using", "best tool")),
+]
+
+# First match wins.
+PAIN_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("reliability/bugs", ("bug", "broken", "error", "crash")),
+    ("performance", ("slow", "performance", "lag")),
+    ("usability", ("confusing", "ux", "hard to use", "unintuitive")),
+    ("pricing", ("price", "expensive", "cost", "pricing")),
+    ("missing feature", ("missing", "no support for", "doesn't have")),
+    ("trust/security", ("scam", "rug", "honeypot", "drain")),
+    ("token utility", ("token", "utility", "tokenomics")),
+]
+
+# First match wins.
+URGENCY_KEYWORDS: List[Tuple[Urgency, Tuple[str, ...]]] = [
+    (Urgency.CRITICAL, ("urgent", "asap", "critical", "down", "broken now")),
+    (Urgency.HIGH, ("today", "right now", "immediately")),
+    (Urgency.LOW, ("eventually", "someday", "nice to have")),
+]
+
+# Confidence: one step per distinct marker present.
+CONFIDENCE_KEYWORDS: Tuple[str, ...] = (
+    "need", "want", "looking", "please", "wish", "bug",
+    "broken", "switch", "leaving", "love", "recommend",
+)
+
+_MOCK_KEYWORDS = KeywordAutomaton(
+    [w for _, words in STAGE_KEYWORDS + PAIN_KEYWORDS + URGENCY_KEYWORDS for w in words]
+    + list(CONFIDENCE_KEYWORDS)
+)
+_STAGE_MASKS = [(stage, _MOCK_KEYWORDS.mask_of(words)) for stage, words in reversed(STAGE_KEYWORDS)]
+_PAIN_MASKS = [(pain, _MOCK_KEYWORDS.mask_of(words)) for pain, words in PAIN_KEYWORDS]
+_URGENCY_MASKS = [(u, _MOCK_KEYWORDS.mask_of(words)) for u, words in URGENCY_KEYWORDS]
+_CONFIDENCE_MASK = _MOCK_KEYWORDS.mask_of(CONFIDENCE_KEYWORDS)
+
 
 class MockClassifier(ClassifierBase):
     """
     Deterministic classifier using keyword heuristics.
     No API calls. For testing and offline development.
+
+    All rule keywords are found in one pass (keywords.KeywordAutomaton);
+    the rules above then decide on bit masks. Subclasses may swap
+    _keywords for another backend over the same keyword list.
     """
 
+    _keywords = _MOCK_KEYWORDS
+
     def classify(self, signal: Signal) -> Classification:
-        text = signal.text.lower()
+        hits = self._keywords.mask(signal.text.lower())
 
         # ── Intent stage ────────────────────────────────────────────
-        intent = IntentStage.EXPLORING
-        if any(w in text for w in ["need", "looking for", "searching", "recommend"]):
-            intent = IntentStage.EVALUATING
-        if any(w in text for w in ["please add", "feature request", "wish", "when will"]):
-            intent = IntentStage.REQUESTING
-        if any(w in text for w in ["leaving", "left", "dropped", "cancelled", "switching back"]):
-            intent = IntentStage.CHURNING
-        if any(w in text for w in ["love", "switched to", "started using", "best tool"]):
-            intent = IntentStage.ADVOCATING
+        intent = next((stage for stage, m in _STAGE_MASKS if hits & m), IntentStage.EXPLORING)
 
         # ── Primary pain ────────────────────────────────────────────
-        pain = "general feedback"
-        if any(w in text for w in ["bug", "broken", "error", "crash"]):
-            pain = "reliability/bugs"
-        elif any(w in text for w in ["slow", "performance", "lag"]):
-            pain = "performance"
-        elif any(w in text for w in ["confusing", "ux", "hard to use", "unintuitive"]):
-            pain = "usability"
-        elif any(w in text for w in ["price", "expensive", "cost", "pricing"]):
-            pain = "pricing"
-        elif any(w in text for w in ["missing", "no support for", "doesn't have"]):
-            pain = "missing feature"
-        elif any(w in text for w in ["scam", "rug", "honeypot", "drain"]):
-            pain = "trust/security"
-        elif any(w in text for w in ["token", "utility", "tokenomics"]):
-            pain = "token utility"
+        pain = next((pain for pain, m in _PAIN_MASKS if hits & m), "general feedback")
 
         # ── Urgency ─────────────────────────────────────────────────
-        urgency = Urgency.MEDIUM
-        if any(w in text for w in ["urgent", "asap", "critical", "down", "broken now"]):
-            urgency = Urgency.CRITICAL
-        elif any(w in text for w in ["today", "right now", "immediately"]):
-            urgency = Urgency.HIGH
-        elif any(w in text for w in ["eventually", "someday", "nice to have"]):
-            urgency = Urgency.LOW
+        urgency = next((u for u, m in _URGENCY_MASKS if hits & m), Urgency.MEDIUM)
 
         # ── Confidence (heuristic: more intent markers = higher) ───
-        intent_words = ["need", "want", "looking", "please", "wish", "bug",
-                        "broken", "switch", "leaving", "love", "recommend"]
-        matches = sum(1 for w in intent_words if w in text)
+        matches = bin(hits & _CONFIDENCE_MASK).count("1")
         confidence = min(0.3 + (matches * 0.15), 0.85)
 
         # ── Recommended action ──────────────────────────────────────
@@ -111,29 +191,71 @@ class MockClassifier(ClassifierBase):
         )
 
 
-class LLMClassifier(ClassifierBase):
-    """
-    Real LLM classifier using Anthropic Claude API.
+# ── Token accounting ────────────────────────────────────────────────────────
 
-    Requires: ANTHROPIC_API_KEY environment variable.
+TOKEN_FIELDS = ("input", "cache_read", "cache_creation", "output")
 
-    Sends each signal to Claude with a structured prompt,
-    parses the JSON response into a Classification.
-    """
 
-    SYSTEM_PROMPT = """You are a signal intelligence agent. You analyze social media posts
-and classify them according to a strict schema.
+def usage_tokens(usage) -> Dict[str, int]:
+    """Messages API `usage` → {input, cache_read, cache_creation, output}."""
+    if usage is None:
+        return dict.fromkeys(TOKEN_FIELDS, 0)
+    return {
+        "input": getattr(usage, "input_tokens", 0) or 0,
+        "cache_read": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "cache_creation": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "output": getattr(usage, "output_tokens", 0) or 0,
+    }
 
-You MUST respond with valid JSON matching this exact structure:
-{
-  "intent_stage": "exploring|evaluating|requesting|churning|advocating",
+
+def cache_hit_ratio(tokens: Dict[str, int]) -> float:
+    """Share of prompt tokens served from the prompt cache."""
+    prompt = tokens["input"] + tokens["cache_read"] + tokens["cache_creation"]
+    return round(tokens["cache_read"] / prompt, 4) if prompt else 0.0
+
+
+# ── API failure kinds (adaptive mode) ───────────────────────────────────────
+
+THROTTLED = "throttled"        # 429 rate_limit_error, 529 overloaded_error
+TIMED_OUT = "timed_out"
+UNAVAILABLE = "unavailable"    # other 5xx, connection errors
+
+
+def api_failure(exc: BaseException) -> Optional[str]:
+    """Kind of API failure, or None for errors that are ours (4xx, bad JSON)."""
+    if isinstance(exc, asyncio.TimeoutError) or type(exc).__name__ == "APITimeoutError":
+        return TIMED_OUT
+    status = getattr(exc, "status_code", None)
+    if status in (429, 529):
+        return THROTTLED
+    if status is not None:
+        return UNAVAILABLE if status >= 500 else None
+    if type(exc).__name__ == "APIConnectionError":
+        return UNAVAILABLE
+    return None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a throttled response's Retry-After header, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers.get(name)) * scale
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+# ── LLM prompts ─────────────────────────────────────────────────────────────
+
+_SCHEMA_FIELDS = """  "intent_stage": "exploring|evaluating|requesting|churning|advocating",
   "primary_pain": "brief description of the core pain or need",
   "urgency": "critical|high|medium|low",
   "confidence": 0.0-1.0,
-  "recommended_action": "one specific, actionable suggestion"
-}
+  "recommended_action": "one specific, actionable suggestion\""""
 
-Rules:
+_RULES = """Rules:
 - intent_stage: where is this person in their journey? exploring (browsing), evaluating (comparing), requesting (asking for something), churning (leaving/frustrated), advocating (promoting)
 - primary_pain: what is the underlying need or frustration? Be specific, not generic.
 - urgency: how time-sensitive? critical = hours, high = today, medium = this week, low = backlog
@@ -144,23 +266,194 @@ Context: This is for a feedback intelligence system. The posts come from X/Twitt
 Focus on EXPLICIT intent — what the person is actually asking/doing, not vibes or sentiment.
 Do NOT infer intent that isn't clearly stated."""
 
-    def __init__(self):
-        self.api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+# Worked examples. Besides steering the labels, they make the system
+# block long enough to cache: the API ignores cache_control on prefixes
+# under CACHE_MIN_TOKENS, and the instructions alone are ~300 tokens
+_EXAMPLES = """Examples (one post each; the classification is what you would return for it):
+
+Post by @dana_ops: "Third time this week the nightly export to S3 silently stopped. We have a board deck due Friday and no data. If this isn't fixed by tomorrow we're moving to the other vendor."
+{"intent_stage": "churning", "primary_pain": "nightly S3 export silently stops, blocking reporting", "urgency": "critical", "confidence": 0.92, "recommended_action": "Page the export on-call, confirm the failure cause with @dana_ops today and offer a manual export before Friday"}
+
+Post by @mkt_lena: "Does anyone know a tool that can pull feature requests out of support tickets and group them? Comparing a few options for next quarter."
+{"intent_stage": "evaluating", "primary_pain": "needs automatic grouping of feature requests from support tickets", "urgency": "low", "confidence": 0.85, "recommended_action": "Send @mkt_lena a short comparison showing ticket clustering, with a link to a trial"}
+
+Post by @raj_builds: "Please add an API endpoint to bulk-update tags. Doing it one call at a time for 40k records is painful."
+{"intent_stage": "requesting", "primary_pain": "no bulk tag update endpoint for large record sets", "urgency": "medium", "confidence": 0.9, "recommended_action": "Log a bulk-tag endpoint request with the 40k-record use case and reply with the batch script workaround"}
+
+Post by @sofia_pm: "Honestly the new dashboard filters saved my team an hour a day. Everyone doing weekly reviews should try it."
+{"intent_stage": "advocating", "primary_pain": "weekly review prep was slow before dashboard filters", "urgency": "low", "confidence": 0.88, "recommended_action": "Thank @sofia_pm and ask whether the team would share a short case study"}
+
+Post by @tomwright: "Browsing feedback tools tonight. Not sure what we need yet, just seeing what's out there."
+{"intent_stage": "exploring", "primary_pain": "unclear need; early look at feedback tooling", "urgency": "low", "confidence": 0.6, "recommended_action": "No direct outreach; add to the nurture list for the getting-started guide"}
+
+Post by @ines_dev: "Login keeps looping back to the sign-in page on Safari since this morning's release. Whole support team is locked out right now."
+{"intent_stage": "churning", "primary_pain": "login redirect loop on Safari after release locks out users", "urgency": "critical", "confidence": 0.9, "recommended_action": "Escalate to the release owner now and post a status update with the Chrome workaround"}
+
+Post by @kofi_a: "Is there a way to get Slack alerts when a customer mentions pricing? Would pay extra for that."
+{"intent_stage": "requesting", "primary_pain": "wants Slack alerts on customer pricing mentions", "urgency": "medium", "confidence": 0.87, "recommended_action": "Reply with the keyword-alert setup and record the willingness to pay for pricing alerts"}
+
+Post by @yuki_t: "Trialing two analytics products side by side. Yours is faster but the CSV export drops unicode names, which matters for our Japan team."
+{"intent_stage": "evaluating", "primary_pain": "CSV export drops unicode characters in names", "urgency": "high", "confidence": 0.86, "recommended_action": "File the unicode CSV bug with the trial account details and tell @yuki_t when the fix ships"}
+
+Post by @generic_takes: "Feedback tools are all the same lol"
+{"intent_stage": "exploring", "primary_pain": "no specific pain stated", "urgency": "low", "confidence": 0.3, "recommended_action": "No action; too vague to act on"}
+
+Post by @lee_cto: "Renewal is next month. Sync with Salesforce has been failing on and off since March and nobody has answered our ticket. Need a straight answer this week."
+{"intent_stage": "churning", "primary_pain": "intermittent Salesforce sync failures with unanswered support ticket", "urgency": "high", "confidence": 0.91, "recommended_action": "Have the account owner call @lee_cto this week with the ticket status and a fix date before renewal"}"""
+
+
+class LLMClassifier(ClassifierBase):
+    """
+    Real LLM classifier using Anthropic Claude API.
+
+    Requires: ANTHROPIC_API_KEY environment variable.
+
+    Sends each signal to Claude with a structured prompt,
+    parses the JSON response into a Classification.
+
+    classify_batch runs requests concurrently (asyncio): `concurrency`
+    caps in-flight requests, `rate_per_sec` adds a token-bucket limit and
+    `timeout` bounds each request. `base_url` points the client at another
+    Messages endpoint (e.g. signalry.stub_server for offline tests).
+
+    Clients are long-lived (see client_pool.AnthropicClientPool): one sync
+    client shared across threads, one async client reused across batches,
+    with `max_connections` / `keepalive_expiry` sizing the connection pool.
+    Call close() (or use the classifier as a context manager) when done.
+
+    `pack_size` > 1 packs that many posts into one request (one system
+    prompt and one round trip for the lot); the reply is a JSON array
+    keyed by signal id. Items missing from the reply or malformed are
+    re-classified one request each, concurrently once the packs are
+    back, each under its own timeout.
+
+    `prompt_cache` marks the static system block cacheable (cache_control:
+    ephemeral), so repeat requests read it from the prompt cache instead
+    of paying full input price. The API only caches prefixes above a
+    model minimum (CACHE_MIN_TOKENS, 1024 on Sonnet) and silently skips
+    smaller ones, so the block carries worked examples after the rules
+    and clears it — check stats()["tokens"]["cache_hit_ratio"] to see it
+    working.
+    Token usage (input, cache read, cache write, output) is totalled per
+    run, with request latency split by cache hit vs miss.
+
+    `adaptive` replaces the fixed `concurrency` with an AIMD limiter
+    (adaptive.AdaptiveLimiter) that starts there and moves between 1 and
+    `max_concurrency`: it grows while latency is stable, halves on
+    429/529 or timeouts and honors Retry-After. Throttled and timed-out
+    requests are retried up to THROTTLE_RETRIES times (the SDK's own
+    retries are off so the limiter sees every throttle). A circuit
+    breaker counts calls that still fail; while it is open, and for any
+    call that fails for good, posts are classified by `fallback`
+    (default MockClassifier) and tier_of() reports them as "fallback".
+    """
+
+    THROTTLE_RETRIES = 3
+    RETRY_BACKOFF = 0.5            # seconds, doubled per retry without Retry-After
+    FALLBACK = "fallback"
+
+    MODEL = "claude-sonnet-4-20250514"
+    MAX_TOKENS = 300
+    CACHE_MIN_TOKENS = 1024        # shortest prefix the API caches for MODEL
+
+    SYSTEM_PROMPT = f"""You are a signal intelligence agent. You analyze social media posts
+and classify them according to a strict schema.
+
+You MUST respond with valid JSON matching this exact structure:
+{{
+{_SCHEMA_FIELDS}
+}}
+
+{_RULES}
+
+{_EXAMPLES}"""
+
+    # Packed requests (pack_size > 1) carry several posts and expect an
+    # array back, so they get their own system prompt rather than one
+    # that demands a single object
+    PACKED_SYSTEM_PROMPT = f"""You are a signal intelligence agent. You analyze social media posts
+and classify them according to a strict schema.
+
+Each message holds several posts, each starting with a "Post ID:" line.
+Classify every post independently.
+
+You MUST respond with a valid JSON array holding one object per post,
+each matching this exact structure:
+[
+  {{
+    "id": "the post's Post ID, copied exactly",
+{textwrap.indent(_SCHEMA_FIELDS, "  ")}
+  }}
+]
+
+{_RULES}
+
+{_EXAMPLES}
+In a packed reply each classification becomes one array element, with its "id" added."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        concurrency: int = 8,
+        rate_per_sec: Optional[float] = None,
+        timeout: float = 60.0,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        pack_size: int = 1,
+        prompt_cache: bool = True,
+        adaptive: bool = False,
+        max_concurrency: int = DEFAULT_MAX_LIMIT,
+        fallback: Optional[ClassifierBase] = None,
+    ):
+        if pack_size < 1:
+            raise ValueError("pack_size must be >= 1")
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY", "")
         if not self.api_key:
             raise EnvironmentError(
                 "ANTHROPIC_API_KEY not set. "
                 "Get one at https://console.anthropic.com/"
             )
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate_per_sec = rate_per_sec
+        self.timeout = timeout
+        self.pack_size = pack_size
+        self.prompt_cache = prompt_cache
+        self.latencies = LatencyRecorder()
+        self.cache_hit_latencies = LatencyRecorder()
+        self.cache_miss_latencies = LatencyRecorder()
+        self.tokens = dict.fromkeys(TOKEN_FIELDS, 0)
+        self.requests = 0
+        self.pack_retries = 0
+        self._stats_lock = threading.Lock()
+        self.limiter: Optional[AdaptiveLimiter] = None
+        self.breaker: Optional[CircuitBreaker] = None
+        self.fallback: Optional[ClassifierBase] = None
+        self.fallback_ids: set = set()
+        if adaptive:
+            self.limiter = AdaptiveLimiter(initial=concurrency,
+                                           max_limit=max(max_concurrency, concurrency))
+            self.breaker = CircuitBreaker()
+            self.fallback = fallback if fallback is not None else MockClassifier()
+        in_flight = self.limiter.max_limit if adaptive else concurrency
+        self.max_retries = 0 if adaptive else DEFAULT_MAX_RETRIES
+        self.pool = AnthropicClientPool(
+            self.api_key, base_url=base_url, timeout=timeout,
+            max_connections=max(max_connections, in_flight),     # never below in-flight cap
+            max_keepalive=max(max_connections, in_flight),
+            keepalive_expiry=keepalive_expiry,
+            max_retries=self.max_retries,
+        )
 
-    def classify(self, signal: Signal) -> Classification:
-        try:
-            import anthropic
-        except ImportError:
-            raise ImportError("pip install anthropic — required for LLM classification")
-
-        client = anthropic.Anthropic(api_key=self.api_key)
+    @property
+    def version(self) -> str:
+        text = self.SYSTEM_PROMPT + (self.PACKED_SYSTEM_PROMPT if self.pack_size > 1 else "")
+        prompt = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        return f"{self.MODEL}/{prompt}"
 
-        user_prompt = f"""Classify this X/Twitter post:
+    def _user_prompt(self, signal: Signal) -> str:
+        return f"""Classify this X/Twitter post:
 
 Author: {signal.actor}
 Text: {signal.text}
@@ -169,21 +462,55 @@ Timestamp: {signal.timestamp.isoformat()}
 
 Respond with JSON only. No markdown, no explanation."""
 
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=300,
-            system=self.SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}],
-        )
+    def _system(self, packed: bool = False):
+        prompt = self.PACKED_SYSTEM_PROMPT if packed else self.SYSTEM_PROMPT
+        if not self.prompt_cache:
+            return prompt
+        return [{"type": "text", "text": prompt,
+                 "cache_control": {"type": "ephemeral"}}]
+
+    def _request(self, signal: Signal) -> Dict:
+        return {
+            "model": self.MODEL,
+            "max_tokens": self.MAX_TOKENS,
+            "system": self._system(),
+            "messages": [{"role": "user", "content": self._user_prompt(signal)}],
+        }
+
+    @staticmethod
+    def _post_block(signal: Signal) -> str:
+        return f"""Post ID: {signal.id}
+Author: {signal.actor}
+Text: {signal.text}
+Metrics: {json.dumps(signal.metrics)}
+Timestamp: {signal.timestamp.isoformat()}"""
 
-        # Parse response
+    def _packed_prompt(self, signals: List[Signal]) -> str:
+        posts = "\n\n".join(self._post_block(s) for s in signals)
+        return f"""Classify each of these {len(signals)} X/Twitter posts independently:
+
+{posts}
+
+Respond with the JSON array only. No markdown, no explanation."""
+
+    def _packed_request(self, signals: List[Signal]) -> Dict:
+        return {
+            "model": self.MODEL,
+            "max_tokens": self.MAX_TOKENS * len(signals),
+            "system": self._system(packed=True),
+            "messages": [{"role": "user", "content": self._packed_prompt(signals)}],
+        }
+
+    @staticmethod
+    def _response_json(response):
         text = response.content[0].text.strip()
         # Strip markdown fences if present
         text = re.sub(r"```json\s*", "", text)
         text = re.sub(r"```\s*$", "", text)
+        return json.loads(text)
 
-        data = json.loads(text)
-
+    @staticmethod
+    def _to_classification(signal: Signal, data: Dict) -> Classification:
         return Classification(
             signal_id=signal.id,
             intent_stage=IntentStage(data["intent_stage"]),
@@ -194,9 +521,418 @@ Respond with JSON only. No markdown, no explanation."""
             recommended_action=data["recommended_action"],
         )
 
+    def _unpack(self, signals: List[Signal], response) -> Tuple[List[Classification], List[Signal]]:
+        """Match a packed reply to its signals → (classified, signals to retry alone)."""
+        try:
+            items = self._response_json(response)
+        except ValueError:
+            return [], list(signals)
+        by_id: Dict[str, Dict] = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and "id" in item:
+                by_id.setdefault(str(item["id"]), item)
+        done: List[Classification] = []
+        retry: List[Signal] = []
+        for signal in signals:
+            try:
+                done.append(self._to_classification(signal, by_id[signal.id]))
+            except (KeyError, TypeError, ValueError):
+                retry.append(signal)
+        return done, retry
+
+    def _record(self, response, seconds: Optional[float] = None) -> None:
+        usage = usage_tokens(getattr(response, "usage", None))
+        with self._stats_lock:
+            self.requests += 1
+            for k, v in usage.items():
+                self.tokens[k] += v
+            if seconds is not None:
+                hit = usage["cache_read"] > 0
+                (self.cache_hit_latencies if hit else self.cache_miss_latencies).record(seconds)
+
+    def classify(self, signal: Signal) -> Classification:
+        if self.limiter is not None:        # share the limiter and breaker with batches
+            return self.pool.run(self.aclassify(signal))
+        start = time.perf_counter()
+        response = self.pool.sync_client().messages.create(**self._request(signal))
+        self._record(response, time.perf_counter() - start)
+        return self._to_classification(signal, self._response_json(response))
+
+    def _async_client(self):
+        return _sdk().AsyncAnthropic(api_key=self.api_key, base_url=self.base_url,
+                                          timeout=self.timeout, max_retries=self.max_retries)
+
+    async def _send(self, request: Dict):
+        client = _batch_client.get()
+        if client is None and self.pool.owns_running_loop():
+            client = self.pool.async_client()
+        start = time.perf_counter()
+        if client is None:
+            async with self._async_client() as client:
+                response = await client.messages.create(**request)
+        else:
+            response = await client.messages.create(**request)
+        self._record(response, time.perf_counter() - start)
+        return response
+
+    async def _acreate(self, request: Dict):
+        if self.limiter is None:
+            return await self._send(request)
+        verdict_due = False         # a call let through by the breaker owes it a verdict
+        try:
+            for attempt in range(self.THROTTLE_RETRIES + 1):
+                started = await self.limiter.acquire()
+                try:
+                    if attempt == 0:                # checked after queueing for a slot, so
+                        self.breaker.check()        # calls queued behind an outage stop here
+                        verdict_due = True
+                    elif self.breaker.state == CircuitBreaker.OPEN:
+                        verdict_due = False         # opened by other calls meanwhile
+                        raise CircuitOpenError("LLM circuit breaker open")
+                    response = await self._send(request)
+                except CircuitOpenError:
+                    raise
+                except Exception as exc:
+                    kind = api_failure(exc)
+                    if kind is None:                # the API answered (4xx) — not an outage
+                        self.breaker.record_success()
+                        verdict_due = False
+                        raise
+                    wait = None
+                    if kind == THROTTLED:
+                        wait = retry_after(exc)
+                        self.limiter.on_throttle(started, retry_after=wait)
+                    elif kind == TIMED_OUT:
+                        self.limiter.on_timeout(started)
+                    if kind == UNAVAILABLE or attempt == self.THROTTLE_RETRIES:
+                        self.breaker.record_failure()
+                        verdict_due = False
+                        raise
+                else:
+                    self.limiter.on_success(started, time.monotonic() - started)
+                    self.breaker.record_success()
+                    verdict_due = False
+                    return response
+                finally:
+                    self.limiter.release()
+                if kind == THROTTLED and wait is None:     # no Retry-After: back off ourselves
+                    await asyncio.sleep(self.RETRY_BACKOFF * 2 ** attempt)
+        finally:
+            if verdict_due:                                 # cancelled mid-call
+                self.breaker.abandon()
+
+    def _fails_over(self, exc: BaseException) -> bool:
+        return self.fallback is not None and (
+            isinstance(exc, CircuitOpenError) or api_failure(exc) is not None)
+
+    def _fail_over(self, signals: List[Signal]) -> List[Classification]:
+        with self._stats_lock:
+            self.fallback_ids.update(s.id for s in signals)
+        return [self.fallback.classify(s) for s in signals]
+
+    def tier_of(self, signal_id: str) -> Optional[str]:
+        return self.FALLBACK if signal_id in self.fallback_ids else None
+
+    async def aclassify(self, signal: Signal) -> Classification:
+        try:
+            response = await self._acreate(self._request(signal))
+        except Exception as exc:
+            if not self._fails_over(exc):
+                raise
+            return self._fail_over([signal])[0]
+        return self._to_classification(signal, self._response_json(response))
+
+    async def _send_pack(self, signals: List[Signal]) -> Tuple[List[Classification], List[Signal]]:
+        """One request for several signals → (classified, signals to retry alone)."""
+        if len(signals) == 1:
+            return [await self.aclassify(signals[0])], []
+        try:
+            response = await self._acreate(self._packed_request(signals))
+        except Exception as exc:
+            if not self._fails_over(exc):
+                raise
+            return self._fail_over(signals), []
+        done, retry = self._unpack(signals, response)
+        if retry:
+            with self._stats_lock:
+                self.pack_retries += len(retry)
+        return done, retry
+
+    async def aclassify_pack(self, signals: List[Signal]) -> List[Classification]:
+        """One request for several signals; failed items retried individually, concurrently."""
+        done, retry = await self._send_pack(signals)
+        done.extend(await asyncio.gather(*(self.aclassify(s) for s in retry)))
+        by_id = {c.signal_id: c for c in done}
+        return [by_id[s.id] for s in signals]
+
+    async def _classify_packed(
+        self,
+        signals: List[Signal],
+        concurrency: int = 8,
+        rate_per_sec: Optional[float] = None,
+        timeout: Optional[float] = None,
+        latencies: Optional[LatencyRecorder] = None,
+        return_exceptions: bool = False,
+    ) -> List[Classification]:
+        # Packs first, then every item they dropped as its own request: the
+        # retries share the concurrency cap and rate limit, and each gets
+        # its own timeout rather than eating into its pack's
+        packs = [signals[i:i + self.pack_size] for i in range(0, len(signals), self.pack_size)]
+        limiter = TokenBucket(rate_per_sec) if rate_per_sec else None
+        bounded = dict(concurrency=concurrency, limiter=limiter, timeout=timeout,
+                       latencies=latencies, return_exceptions=return_exceptions)
+        by_id: Dict[str, object] = {}
+        retry: List[Signal] = []
+        for pack, sent in zip(packs, await gather_bounded(packs, self._send_pack, **bounded)):
+            if isinstance(sent, Exception):
+                by_id.update((s.id, sent) for s in pack)        # the whole pack failed
+                continue
+            done, pack_retry = sent
+            by_id.update((c.signal_id, c) for c in done)
+            retry.extend(pack_retry)
+        if retry:
+            by_id.update((s.id, result) for s, result in zip(
+                retry, await gather_bounded(retry, self.aclassify, **bounded)))
+        return [by_id[s.id] for s in signals]
+
+    async def _classify_all(self, signals: List[Signal], **kwargs) -> List[Classification]:
+        if self.pack_size > 1:
+            return await self._classify_packed(signals, **kwargs)
+        return await super().classify_batch_async(signals, **kwargs)
+
+    async def classify_batch_async(self, signals: List[Signal], **kwargs) -> List[Classification]:
+        """
+        On the pool's loop the shared async client is used. Awaited from any
+        other loop, one AsyncAnthropic client serves the whole batch.
+        """
+        if self.pool.owns_running_loop():
+            return await self._classify_all(signals, **kwargs)
+        async with self._async_client() as client:
+            token = _batch_client.set(client)
+            try:
+                return await self._classify_all(signals, **kwargs)
+            finally:
+                _batch_client.reset(token)
+
+    def classify_batch(self, signals: List[Signal]) -> List[Classification]:
+        """
+        Concurrent batch: bounded, rate-limited, results in input order.
+        A signal whose request fails for good goes to `fallback` on its
+        own; the rest of the batch keeps its LLM results. Without a
+        fallback (adaptive off), the first failure is raised once the
+        batch has finished.
+        """
+        if not signals:
+            return []
+        adaptive = self.limiter is not None
+        results = self.pool.run(self.classify_batch_async(
+            signals,
+            concurrency=self.limiter.max_limit if adaptive else self.concurrency,
+            rate_per_sec=self.rate_per_sec,
+            timeout=None if adaptive else self.timeout,     # adaptive: per request, in the client
+            latencies=self.latencies,
+            return_exceptions=True,
+        ))
+        failed = [i for i, r in enumerate(results) if isinstance(r, Exception)]
+        if failed:
+            if self.fallback is None:
+                raise results[failed[0]]
+            for i, cls in zip(failed, self._fail_over([signals[i] for i in failed])):
+                results[i] = cls
+        return results
+
+    # ── Message Batches (offline bulk mode, see batch_jobs.py) ─────────
+
+    def submit_batch_job(self, signals: List[Signal]) -> str:
+        """Submit one Message Batch (custom_id = signal.id). Returns the batch id."""
+        batch = self.pool.sync_client().messages.batches.create(
+            requests=[{"custom_id": s.id, "params": self._request(s)} for s in signals],
+        )
+        return batch.id
+
+    def batch_job_status(self, job_id: str) -> Dict:
+        batch = self.pool.sync_client().messages.batches.retrieve(job_id)
+        counts = batch.request_counts
+        return {
+            "status": batch.processing_status,
+            "succeeded": counts.succeeded,
+            "errored": counts.errored + counts.expired + counts.canceled,
+            "processing": counts.processing,
+        }
+
+    def batch_job_results(
+        self, job_id: str, signals: Dict[str, Signal],
+    ) -> Iterator[Tuple[str, Optional[Classification]]]:
+        """
+        (signal_id, Classification) per result of an ended batch; None for
+        requests that errored, expired or returned unparseable JSON.
+        """
+        for entry in self.pool.sync_client().messages.batches.results(job_id):
+            signal = signals.get(entry.custom_id)
+            if signal is None:
+                continue
+            if entry.result.type != "succeeded":
+                yield entry.custom_id, None
+                continue
+            self._record(entry.result.message)
+            try:
+                data = self._response_json(entry.result.message)
+                yield entry.custom_id, self._to_classification(signal, data)
+            except (KeyError, TypeError, ValueError):
+                yield entry.custom_id, None
+
+    def stats(self) -> Dict:
+        stats = {
+            "latency": self.latencies.summary(),
+            "requests": self.requests,
+            "pack_size": self.pack_size,
+            "pack_retries": self.pack_retries,
+            "tokens": {**self.tokens, "cache_hit_ratio": cache_hit_ratio(self.tokens)},
+            "latency_cache_hit": self.cache_hit_latencies.summary(),
+            "latency_cache_miss": self.cache_miss_latencies.summary(),
+        }
+        if self.limiter is not None:
+            stats["adaptive"] = self.limiter.stats()
+            stats["breaker"] = self.breaker.stats()
+            stats["fallbacks"] = len(self.fallback_ids)
+        return stats
+
+    def reset_stats(self) -> None:
+        self.latencies.reset()
+        with self._stats_lock:
+            self.cache_hit_latencies.reset()
+            self.cache_miss_latencies.reset()
+            self.tokens = dict.fromkeys(TOKEN_FIELDS, 0)
+            self.requests = 0
+            self.pack_retries = 0
+            self.fallback_ids.clear()
+        if self.limiter is not None:
+            self.limiter.reset_stats()
+
+    def close(self) -> None:
+        """Close pooled connections. The classifier reconnects if used again."""
+        self.pool.close()
+
+    def __enter__(self) -> "LLMClassifier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CascadeClassifier(ClassifierBase):
+    """
+    Two-tier classifier: keyword heuristics first, LLM on escalation.
+
+    A post goes to the LLM when the heuristic result is
+    - in `escalate_stages` (default: exploring, the heuristic's fallback
+      when no stage keyword matched), or
+    - below `threshold` confidence, unless its stage is in `trust_stages`.
+
+    MockClassifier's confidence counts generic intent words, so explicit
+    churn or feature-request phrasing ("cancelled my subscription",
+    "please add") can score low while the stage itself is unambiguous —
+    hence `trust_stages` (default: churning, requesting).
+
+    tier_of(signal_id) says which tier answered; stats() reports the
+    escalation rate and the LLM calls saved this run: the requests the
+    LLM alone would have made (one per `pack_size` posts per batch) less
+    the requests it did make, retries included.
+    """
+
+    HEURISTIC = "heuristic"
+    LLM = "llm"
+
+    def __init__(
+        self,
+        llm: Optional[ClassifierBase] = None,
+        heuristic: Optional[ClassifierBase] = None,
+        threshold: float = 0.6,
+        escalate_stages=(IntentStage.EXPLORING,),
+        trust_stages=(IntentStage.CHURNING, IntentStage.REQUESTING),
+    ):
+        self.llm = llm if llm is not None else LLMClassifier()
+        self.heuristic = heuristic if heuristic is not None else MockClassifier()
+        self.threshold = threshold
+        self.escalate_stages = frozenset(IntentStage(s) for s in escalate_stages)
+        self.trust_stages = frozenset(IntentStage(s) for s in trust_stages)
+        self.tiers: Dict[str, str] = {}
+        self.baseline_requests = 0          # LLM requests without the cascade
+        self.escalated_requests = 0         # estimate, for an llm that doesn't count its own
+
+    @property
+    def version(self) -> str:
+        escalate = ",".join(sorted(s.value for s in self.escalate_stages))
+        trust = ",".join(sorted(s.value for s in self.trust_stages))
+        return (f"cascade({self.heuristic.version}>{self.llm.version}@{self.threshold}"
+                f";escalate={escalate};trust={trust})")
+
+    def should_escalate(self, cls: Classification) -> bool:
+        if cls.intent_stage in self.escalate_stages:
+            return True
+        return cls.confidence < self.threshold and cls.intent_stage not in self.trust_stages
 
-def get_classifier(live: bool = False) -> ClassifierBase:
-    """Factory: MockClassifier for dev, LLMClassifier for production."""
+    def classify(self, signal: Signal) -> Classification:
+        return self.classify_batch([signal])[0]
+
+    def classify_batch(self, signals: List[Signal]) -> List[Classification]:
+        results = self.heuristic.classify_batch(signals)
+        escalate = [i for i, cls in enumerate(results) if self.should_escalate(cls)]
+        pack = max(1, getattr(self.llm, "pack_size", 1))
+        self.baseline_requests += math.ceil(len(signals) / pack)
+        self.escalated_requests += math.ceil(len(escalate) / pack)
+        if escalate:
+            for i, cls in zip(escalate, self.llm.classify_batch([signals[i] for i in escalate])):
+                results[i] = cls
+        escalated = set(escalate)
+        for i, signal in enumerate(signals):
+            self.tiers[signal.id] = self.LLM if i in escalated else self.HEURISTIC
+        return results
+
+    def tier_of(self, signal_id: str) -> Optional[str]:
+        tier = self.tiers.get(signal_id)
+        if tier == self.LLM:
+            return self.llm.tier_of(signal_id) or tier      # e.g. "fallback" in an outage
+        return tier
+
+    def stats(self) -> Dict:
+        llm = sum(1 for t in self.tiers.values() if t == self.LLM)
+        total = len(self.tiers)
+        inner = self.llm.stats()
+        requests = inner.get("requests", self.escalated_requests)
+        return {
+            **inner,
+            "cascade": {
+                "signals": total,
+                "heuristic": total - llm,
+                "llm": llm,
+                "escalation_rate": round(llm / total, 4) if total else 0.0,
+                "llm_requests": requests,
+                "llm_calls_saved": max(0, self.baseline_requests - requests),
+            },
+        }
+
+    def reset_stats(self) -> None:
+        self.tiers.clear()
+        self.baseline_requests = self.escalated_requests = 0
+        self.llm.reset_stats()
+        self.heuristic.reset_stats()
+
+    def close(self) -> None:
+        close = getattr(self.llm, "close", None)
+        if close is not None:
+            close()
+
+
+def get_classifier(
+    live: bool = False, pack_size: int = 1, cascade: bool = False, adaptive: bool = False,
+) -> ClassifierBase:
+    """
+    Factory: MockClassifier for dev, LLMClassifier for production.
+    `cascade` (live only) puts the keyword heuristics in front of the LLM.
+    `adaptive` (live only) turns on the AIMD limiter and circuit breaker.
+    """
     if live:
-        return LLMClassifier()
+        llm = LLMClassifier(pack_size=pack_size, adaptive=adaptive)
+        return CascadeClassifier(llm) if cascade else llm
     return MockClassifier()
@@ -0,0 +1,180 @@
+"""
+Long-lived Anthropic clients for LLMClassifier — one connection pool per classifier.
+
+Building an `anthropic.Anthropic` per request repeats the client setup
+and throws away its TCP/TLS connections, so every call pays a fresh
+handshake. AnthropicClientPool builds each client once and keeps its
+connections alive between calls.
+
+Design:
+- sync_client(): one `Anthropic` client, created lazily under a lock.
+  Its httpx client is thread-safe, so any number of threads share it.
+- A private event loop on a daemon thread owns one `AsyncAnthropic`.
+  run(coro) executes a coroutine there, so successive classify_batch
+  calls reuse the same async connections (asyncio.run would bind a new
+  client to a new loop every batch).
+- Pool size and keep-alive are set through httpx Limits on both clients.
+- max_retries=0 turns off the SDK's own 429/5xx retries for callers that
+  retry themselves (LLMClassifier's adaptive mode).
+
+The SDK is imported lazily — nothing here is needed in mock mode.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0        # seconds an idle connection stays open
+DEFAULT_MAX_RETRIES = 2                # the SDK's own default
+
+
+def _sdk():
+    try:
+        import anthropic
+    except ImportError:
+        raise ImportError("pip install anthropic — required for LLM classification")
+    return anthropic
+
+
+class AnthropicClientPool:
+    """
+    Shared sync and async Anthropic clients with a bounded keep-alive pool.
+
+    Usage:
+        pool = AnthropicClientPool(api_key, max_connections=16)
+        pool.sync_client().messages.create(...)
+        pool.run(some_coroutine_using(pool.async_client()))
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 60.0,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        if max_connections < 1:
+            raise ValueError("max_connections must be >= 1")
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = min(max_keepalive, max_connections)
+        self.keepalive_expiry = keepalive_expiry
+        self.max_retries = max_retries
+        self.clients_created = 0
+        self._lock = threading.Lock()
+        self._sync = None
+        self._async = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _limits(self, anthropic):
+        # The SDK's own default is an httpx(2) Limits — build ours from the same class.
+        limits_cls = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+        return limits_cls(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    # ── Sync ────────────────────────────────────────────────────────────
+
+    def sync_client(self):
+        """The shared `anthropic.Anthropic` client (thread-safe)."""
+        client = self._sync
+        if client is None:
+            with self._lock:
+                if self._sync is None:
+                    anthropic = _sdk()
+                    http = anthropic.DefaultHttpxClient(limits=self._limits(anthropic),
+                                                        timeout=self.timeout)
+                    self._sync = anthropic.Anthropic(api_key=self.api_key, base_url=self.base_url,
+                                                     timeout=self.timeout, max_retries=self.max_retries,
+                                                     http_client=http)
+                    self.clients_created += 1
+                client = self._sync
+        return client
+
+    # ── Async ───────────────────────────────────────────────────────────
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever,
+                                          name="signalry-llm-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def owns_running_loop(self) -> bool:
+        """True when called from a coroutine running on the pool's loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def async_client(self):
+        """The shared `AsyncAnthropic` client. Only valid on the pool's loop."""
+        if not self.owns_running_loop():
+            raise RuntimeError("async_client() must be used inside AnthropicClientPool.run()")
+        if self._async is None:     # only ever touched from the loop thread
+            anthropic = _sdk()
+            http = anthropic.DefaultAsyncHttpxClient(limits=self._limits(anthropic),
+                                                     timeout=self.timeout)
+            self._async = anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url,
+                                                   timeout=self.timeout, max_retries=self.max_retries,
+                                                   http_client=http)
+            self.clients_created += 1
+        return self._async
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the pool's loop and block for its result. Thread-safe."""
+        if self.owns_running_loop():
+            coro.close()
+            raise RuntimeError("run() called from the pool's own loop — await instead")
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    # ── Lifecycle ───────────────────────────────────────────────────────
+
+    def close(self) -> None:
+        """Close both clients and stop the loop thread. The pool can be reused after."""
+        with self._lock:
+            sync, self._sync = self._sync, None
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if sync is not None:
+            sync.close()
+        if loop is not None:
+            if self._async is not None:
+                asyncio.run_coroutine_threadsafe(self._async.close(), loop).result()
+                self._async = None
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def __enter__(self) -> "AnthropicClientPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> Dict:
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "keepalive_expiry": self.keepalive_expiry,
+            "clients_created": self.clients_created,
+        }
@@ -0,0 +1,132 @@
+"""
+Concurrency helpers for classification — bounded fan-out over asyncio.
+
+Design:
+- TokenBucket: rate limiter (requests/second with a burst allowance)
+- LatencyRecorder: per-request latencies → p50/p90/p99 summary
+- gather_bounded(): run one coroutine per item with a concurrency cap,
+  an optional rate limit and a per-item timeout; results in input order.
+  With return_exceptions, a failed or timed-out item yields its
+  exception in place and the others run on
+
+No third-party dependencies — plain asyncio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """
+    Async token bucket: at most `rate` acquisitions per second on average,
+    with up to `burst` allowed back to back.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(math.ceil(rate))))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:      # FIFO: waiters are served in arrival order
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LatencyRecorder:
+    """Collects request latencies (seconds) and summarises them in ms."""
+
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    @staticmethod
+    def _percentile(ordered: List[float], pct: float) -> float:
+        # Nearest-rank percentile
+        rank = max(1, int(math.ceil(pct / 100 * len(ordered))))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict:
+        if not self.samples:
+            return {"requests": 0}
+        ordered = sorted(self.samples)
+        ms = lambda s: round(s * 1000, 1)
+        return {
+            "requests": len(ordered),
+            "p50_ms": ms(self._percentile(ordered, 50)),
+            "p90_ms": ms(self._percentile(ordered, 90)),
+            "p99_ms": ms(self._percentile(ordered, 99)),
+            "max_ms": ms(ordered[-1]),
+        }
+
+
+async def gather_bounded(
+    items: Sequence[T],
+    fn: Callable[[T], Awaitable[R]],
+    concurrency: int = 8,
+    limiter: Optional[TokenBucket] = None,
+    timeout: Optional[float] = None,
+    latencies: Optional[LatencyRecorder] = None,
+    return_exceptions: bool = False,
+) -> List[Union[R, Exception]]:
+    """
+    Await fn(item) for every item, at most `concurrency` at a time.
+    Returns results in input order. The first failure (including a
+    per-item timeout) cancels the rest and is re-raised — unless
+    `return_exceptions`, when each item's Exception takes its place in
+    the results and does not disturb the others.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(item: T) -> R:
+        async with sem:
+            if limiter is not None:
+                await limiter.acquire()
+            start = time.perf_counter()
+            try:
+                if timeout is not None:
+                    return await asyncio.wait_for(fn(item), timeout)
+                return await fn(item)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return exc
+            finally:
+                if latencies is not None:
+                    latencies.record(time.perf_counter() - start)
+
+    tasks = [asyncio.ensure_future(one(item)) for item in items]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,207 @@
+"""
+Cross-source correlation — the same pain on several channels.
+
+A pain raised in Slack, then in Intercom tickets, then on a Hubspot
+call is worth more than the same count on one channel. /chat shows a
+cluster's sources after the fact; this index answers "which pains are
+on ≥2 sources in the last N hours" without rescanning the queue.
+
+Design:
+- Inverted index (canonical pain, source) → signal ids in time order:
+  two parallel lists (epoch seconds, ids) per posting, appended on the
+  fast path, bisect-inserted for late arrivals. Counts per window are
+  two bisects, not a scan
+- Per pain, source → last seen: "is this pain on ≥2 sources since T"
+  reads a handful of timestamps (one per channel), O(1) in the volume
+- Only pains seen on ≥2 sources ever are candidates for
+  multi_source(), so the listing never touches single-channel pains
+  (min_sources=1 falls back to scanning every pain)
+- Kept current by ReviewQueue.on_add: attach(queue) loads the queue's
+  history once (time-ordered SELECT) and then indexes each item as it
+  is queued. Signal ids already indexed are skipped
+- In memory: rebuilt from the queue at startup, nothing new persisted
+
+Usage:
+    index = CrossSourceIndex(pains).attach(queue)
+    index.multi_source(hours=48)        # [{"pain", "sources": {...}}, ...]
+    index.sources("export broken", hours=24)
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models import Classification, Signal
+from .pains import PainIndex
+
+DEFAULT_WINDOW_HOURS = 48
+MIN_SOURCES = 2
+
+
+def _epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class _Posting:
+    """Signal ids for one (pain, source), oldest first."""
+
+    __slots__ = ("times", "ids")
+
+    def __init__(self):
+        self.times: List[float] = []
+        self.ids: List[str] = []
+
+    def add(self, t: float, signal_id: str) -> None:
+        if not self.times or t >= self.times[-1]:
+            self.times.append(t)
+            self.ids.append(signal_id)
+        else:
+            i = bisect_left(self.times, t)
+            self.times.insert(i, t)
+            self.ids.insert(i, signal_id)
+
+    def since(self, t: float) -> int:
+        """Index of the first entry at or after t."""
+        return bisect_left(self.times, t)
+
+
+class CrossSourceIndex:
+    """In-memory (pain, source) → time-ordered signal ids, fed by the review queue."""
+
+    def __init__(self, pains: Optional[PainIndex] = None):
+        self.pains = pains or PainIndex()
+        self._postings: Dict[Tuple[str, str], _Posting] = {}
+        self._last_seen: Dict[str, Dict[str, float]] = {}      # pain → source → epoch
+        self._multi: Set[str] = set()                          # pains on ≥2 sources ever
+        self._indexed: Set[str] = set()                        # signal ids
+        self._lock = threading.Lock()
+
+    # ── Indexing ────────────────────────────────────────────────────────
+
+    def _add(self, pain: str, source: str, t: float, signal_id: str) -> None:
+        posting = self._postings.get((pain, source))
+        if posting is None:
+            posting = self._postings[(pain, source)] = _Posting()
+        posting.add(t, signal_id)
+        seen = self._last_seen.setdefault(pain, {})
+        if t > seen.get(source, float("-inf")):
+            seen[source] = t
+        if len(seen) >= 2:
+            self._multi.add(pain)
+
+    def add(self, signal: Signal, classification: Classification) -> bool:
+        """Index one queued item. False if its signal id is already indexed."""
+        key = self.pains.key(classification.primary_pain)
+        with self._lock:
+            if signal.id in self._indexed:
+                return False
+            self._indexed.add(signal.id)
+            self._add(key, signal.source, _epoch(signal.timestamp), signal.id)
+        return True
+
+    def attach(self, queue) -> "CrossSourceIndex":
+        """Index everything already queued, then every item queue.add() stores."""
+        with queue.read() as conn:
+            rows = conn.execute(
+                """SELECT s.id, s.source, s.timestamp, c.primary_pain
+                   FROM signals s JOIN classifications c ON c.signal_id = s.id
+                   ORDER BY s.timestamp"""
+            ).fetchall()
+        keys = self.pains.keys(row[3] for row in rows)
+        with self._lock:
+            for signal_id, source, ts, pain in rows:
+                if signal_id not in self._indexed:
+                    self._indexed.add(signal_id)
+                    self._add(keys[pain], source, _epoch(datetime.fromisoformat(ts)), signal_id)
+        queue.on_add(self.add)
+        return self
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._last_seen.clear()
+            self._multi.clear()
+            self._indexed.clear()
+
+    # ── Lookups ─────────────────────────────────────────────────────────
+
+    def _cutoff(self, hours: Optional[float], now: Optional[datetime]) -> float:
+        if hours is None:
+            return float("-inf")
+        return _epoch((now or datetime.utcnow()) - timedelta(hours=hours))
+
+    def sources(self, pain: str, hours: Optional[float] = None,
+                now: Optional[datetime] = None) -> Dict[str, int]:
+        """Signals per source for `pain` (raw or canonical) in the last `hours`."""
+        key = self.pains.key(pain)
+        cutoff = self._cutoff(hours, now)
+        with self._lock:
+            seen = self._last_seen.get(key, {})
+            out = {}
+            for source, last in seen.items():
+                if last >= cutoff:
+                    posting = self._postings[(key, source)]
+                    out[source] = len(posting.times) - posting.since(cutoff)
+            return out
+
+    def signal_ids(self, pain: str, source: Optional[str] = None,
+                   hours: Optional[float] = None, now: Optional[datetime] = None) -> List[str]:
+        """Signal ids for `pain`, oldest first; one source or all of them."""
+        key = self.pains.key(pain)
+        cutoff = self._cutoff(hours, now)
+        with self._lock:
+            channels = [source] if source is not None else list(self._last_seen.get(key, {}))
+            found: List[Tuple[float, str]] = []
+            for channel in channels:
+                posting = self._postings.get((key, channel))
+                if posting is not None:
+                    i = posting.since(cutoff)
+                    found.extend(zip(posting.times[i:], posting.ids[i:]))
+        return [signal_id for _, signal_id in sorted(found)]
+
+    def multi_source(self, hours: Optional[float] = DEFAULT_WINDOW_HOURS,
+                     min_sources: int = MIN_SOURCES,
+                     now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Pains on at least `min_sources` sources in the last `hours`, widest
+        spread first. min_sources=1 lists single-channel pains too (a scan
+        of every pain rather than the ≥2-source candidates).
+        """
+        if min_sources < 1:
+            raise ValueError("min_sources must be >= 1")
+        cutoff = self._cutoff(hours, now)
+        found = []
+        with self._lock:
+            candidates = self._multi if min_sources >= MIN_SOURCES else self._last_seen
+            for key in candidates:
+                live = [s for s, last in self._last_seen[key].items() if last >= cutoff]
+                if len(live) < min_sources:
+                    continue
+                counts = {}
+                for source in live:
+                    posting = self._postings[(key, source)]
+                    counts[source] = len(posting.times) - posting.since(cutoff)
+                found.append({
+                    "pain": self.pains.label(key),
+                    "pain_key": key,
+                    "sources": dict(sorted(counts.items())),
+                    "signal_count": sum(counts.values()),
+                    "last_seen": datetime.utcfromtimestamp(
+                        max(self._last_seen[key][s] for s in live)).isoformat(),
+                })
+        found.sort(key=lambda c: (-len(c["sources"]), -c["signal_count"], c["pain_key"]))
+        return found
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "signals": len(self._indexed),
+                "pains": len(self._last_seen),
+                "postings": len(self._postings),
+                "multi_source_pains": len(self._multi),
+            }
@@ -0,0 +1,233 @@
+"""
+SQLite connections — one long-lived writer, a pool of readers, tuned PRAGMAs.
+
+ReviewQueue used to sqlite3.connect() on every call: add(), stats() and
+each list call paid for opening the file and re-reading the schema, and
+under the default rollback journal the API's readers waited on its
+writer (and vice versa).
+
+Design:
+- One writer connection for the life of the manager, behind an RLock:
+  write() yields it and commits on exit (rolls back on error), so
+  writes from uvicorn's worker threads or pipeline stages take turns
+  in-process instead of on SQLite's file lock
+- Up to `readers` read connections, handed out by read() from a pool
+  and returned after the block — one thread per connection at a time,
+  so sharing them across threads (check_same_thread=False) is safe.
+  Opened lazily; read() blocks when all are in use. Not query_only:
+  SQL-side momentum stages its aggregates in TEMP tables, which are
+  per connection and never touch the file
+- PRAGMAs from a profile, applied to every connection:
+    wal       journal_mode=WAL (readers never block the writer or each
+              other), synchronous=NORMAL (fsync at checkpoints, not
+              every commit — durable across app crashes, may lose the
+              last commits on power loss), 256 MiB mmap, 64 MiB page
+              cache, temp tables in memory, 5s busy timeout
+    durable   as wal, synchronous=FULL
+    legacy    SQLite defaults (rollback journal) — what per-call
+              connections used; for comparison
+  A dict of PRAGMA → value works too
+- ":memory:" has no shared file, so reads go through the writer
+- shared(db_path): one manager per database file per process, so the
+  review queue and the stores beside it in the same file (pain index,
+  momentum window and sketches, escalation state, batch jobs,
+  classification cache) take turns on one writer lock and one set of
+  PRAGMAs instead of racing SQLite's file lock from their own
+  connections. Reference-counted: close() closes the connections when
+  the last holder closes; holders that never close keep it for the
+  life of the process. The first opener's PRAGMAs apply
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Union
+
+DEFAULT_READERS = 4
+
+PRAGMA_PROFILES: Dict[str, Dict[str, object]] = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,           # negative = KiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "legacy": {},
+}
+DEFAULT_PROFILE = "wal"
+
+
+class ConnectionManager:
+    """
+    Usage:
+        db = ConnectionManager("data/signalry.db")       # profile "wal"
+        with db.write() as conn:
+            conn.execute("INSERT ...")                  # committed on exit
+        with db.read() as conn:
+            conn.execute("SELECT ...").fetchall()
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: Union[str, Dict[str, object]] = DEFAULT_PROFILE,
+        readers: int = DEFAULT_READERS,
+        row_factory=sqlite3.Row,
+    ):
+        if readers < 1:
+            raise ValueError("readers must be >= 1")
+        if isinstance(pragmas, str):
+            if pragmas not in PRAGMA_PROFILES:
+                raise ValueError(f"unknown PRAGMA profile {pragmas!r}; "
+                                 f"choose from {sorted(PRAGMA_PROFILES)}")
+            pragmas = PRAGMA_PROFILES[pragmas]
+        self.db_path = str(db_path)
+        self.pragmas = dict(pragmas)
+        self.max_readers = readers
+        self.row_factory = row_factory
+        self.in_memory = self.db_path == ":memory:"
+        if not self.in_memory:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._opened: List[sqlite3.Connection] = []
+        self._open_lock = threading.Lock()
+        self.writes = 0
+        self.reads = 0
+        self.closed = False
+        self._refs = 1
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = self.row_factory
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    @property
+    def journal_mode(self) -> str:
+        with self._write_lock:
+            return self._writer.execute("PRAGMA journal_mode").fetchone()[0]
+
+    # ── Access ──────────────────────────────────────────────────────────
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """The writer connection, exclusively; commit on success, roll back on error."""
+        with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.rollback()
+                raise
+            self._writer.commit()
+            self.writes += 1
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """A pooled read connection (the writer for :memory:)."""
+        if self.in_memory:
+            with self.write() as conn:
+                yield conn
+            return
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._open_lock:
+                self.reads += 1
+            self._readers.put(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            if len(self._opened) < self.max_readers:
+                conn = self._connect()
+                self._opened.append(conn)
+                return conn
+        return self._readers.get()
+
+    def close(self) -> None:
+        """
+        Release this holder's reference; the last one closes every
+        connection, and the manager is unusable afterwards.
+        """
+        with _SHARED_LOCK:
+            self._refs -= 1
+            if self._refs > 0 or self.closed:
+                return
+            self.closed = True
+        with self._write_lock:
+            self._writer.close()
+        with self._open_lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "journal_mode": self.journal_mode,
+            "readers_open": len(self._opened),
+            "readers_max": self.max_readers,
+            "writes": self.writes,
+            "reads": self.reads,
+        }
+
+
+_SHARED: "weakref.WeakValueDictionary[str, ConnectionManager]" = weakref.WeakValueDictionary()
+_SHARED_LOCK = threading.Lock()
+
+
+def shared(
+    db_path: str,
+    pragmas: Union[str, Dict[str, object]] = DEFAULT_PROFILE,
+    readers: int = DEFAULT_READERS,
+) -> ConnectionManager:
+    """
+    The process-wide ConnectionManager for `db_path`, opened on first
+    use. Each call adds a reference for close() to release.
+    """
+    if str(db_path) == ":memory:":
+        return ConnectionManager(":memory:", pragmas=pragmas, readers=readers)
+    path = Path(db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    key = str(path.resolve())
+    with _SHARED_LOCK:
+        manager = _SHARED.get(key)
+        if manager is not None and not manager.closed:
+            manager._refs += 1
+            return manager
+    manager = ConnectionManager(str(path), pragmas=pragmas, readers=readers)
+    with _SHARED_LOCK:
+        current = _SHARED.get(key)
+        if current is not None and not current.closed:     # another thread won the race
+            current._refs += 1
+            extra, manager = manager, current
+        else:
+            _SHARED[key] = manager
+            extra = None
+    if extra is not None:
+        extra.close()
+    return manager
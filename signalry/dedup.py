@@ -0,0 +1,148 @@
+"""
+Dedup stores — remember which source_ids the filter has already seen.
+
+filter_signals used to build a fresh set per call, so dedup never held
+across runs or chunks. A DedupStore is passed in instead:
+
+- MemoryDedup: plain set, unbounded (the old per-call behaviour)
+- LRUDedup: in-memory, capped at max_size most recently seen ids
+- SQLiteDedup: persisted on disk, survives restarts, nothing held in RAM
+
+All stores answer one question: "was this key seen before?" and record it.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Set
+
+DEFAULT_DEDUP_PATH = "data/dedup.db"
+
+
+class DedupStore(ABC):
+    """Interface for source_id dedup stores."""
+
+    @abstractmethod
+    def check_and_add(self, key: str) -> bool:
+        """Record `key`. Returns True if it had already been seen."""
+        ...
+
+    def close(self) -> None:
+        """Flush any pending state. No-op for in-memory stores."""
+
+    def __enter__(self) -> "DedupStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MemoryDedup(DedupStore):
+    """Unbounded in-memory set. Equivalent to the old per-call seen_ids."""
+
+    def __init__(self) -> None:
+        self._seen: Set[str] = set()
+
+    def check_and_add(self, key: str) -> bool:
+        if key in self._seen:
+            return True
+        self._seen.add(key)
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class LRUDedup(DedupStore):
+    """
+    In-memory store capped at `max_size` keys.
+
+    Once full, the least recently seen key is forgotten. A re-seen key
+    counts as recent, so a post that keeps resurfacing stays deduped.
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+    def check_and_add(self, key: str) -> bool:
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class SQLiteDedup(DedupStore):
+    """
+    Persisted store backed by a single SQLite table.
+
+    Keys are written with INSERT OR IGNORE; a zero rowcount means the key
+    was already there. Writes are committed every `commit_every` new keys
+    and on close().
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DEDUP_PATH, commit_every: int = 500) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_every = commit_every
+        self._pending = 0
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_source_ids (
+                source_id TEXT PRIMARY KEY,
+                seen_at TEXT
+            )
+        """)
+        self._conn.commit()
+
+    def check_and_add(self, key: str) -> bool:
+        cur = self._conn.execute(
+            "INSERT OR IGNORE INTO seen_source_ids (source_id, seen_at) VALUES (?, ?)",
+            (key, datetime.utcnow().isoformat()),
+        )
+        if cur.rowcount == 0:
+            return True
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM seen_source_ids WHERE source_id = ?", (key,),
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM seen_source_ids").fetchone()[0]
+
+    def prune(self, before: datetime) -> int:
+        """Forget keys first seen before `before`. Returns count removed."""
+        cur = self._conn.execute(
+            "DELETE FROM seen_source_ids WHERE seen_at < ?", (before.isoformat(),),
+        )
+        self._conn.commit()
+        return cur.rowcount
+
+    def close(self) -> None:
+        self._conn.commit()
+        self._conn.close()
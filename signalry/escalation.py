@@ -0,0 +1,222 @@
+"""
+Urgency escalation — is a pain getting more urgent, not just louder?
+
+detect_momentum()'s third rule: average urgency for a pain is rising.
+Counting rules see "12 people on export" whether they are mildly
+annoyed or all critical since this morning; this one sees the shift.
+
+Design:
+- Urgency as a number: low 0, medium 1, high 2, critical 3
+- Per pain, two exponentially decayed sums of (urgency, 1) — a fast
+  scale (half-life 6h) and a slow one (48h). mean = Σurgency / Σweight
+  on each scale; slope = fast mean − slow mean, in urgency levels
+- A pain escalates when slope ≥ `threshold` (0.75: three quarters of a
+  level above its own baseline) with at least `min_volume` decayed
+  signals on the fast scale, so one critical post is not a trend
+- Decay is lazy: state holds the sums as of its last timestamp and is
+  scaled on the next update — O(1) per classification, no history
+  rescans. A late (older) signal is decayed instead of the state, so
+  the sums do not depend on arrival order
+- One row per pain in `escalation_state` (queue DB); runs pick up where
+  the last one stopped
+
+Usage:
+    detector = EscalationDetector(queue.db_path)
+    escalating = detector.update(signals, classifications)   # sets momentum_flag
+    detector.save()
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import ContextManager, Dict, List, Optional, Set
+
+from .db import shared
+from .models import Classification, Signal, Urgency
+from .pains import PainIndex
+
+FAST_HALF_LIFE_HOURS = 6.0
+SLOW_HALF_LIFE_HOURS = 48.0
+ESCALATION_THRESHOLD = 0.75     # fast mean urgency − slow mean urgency, in levels
+MIN_FAST_VOLUME = 2.0           # decayed signals on the fast scale
+
+URGENCY_SCORE: Dict[Urgency, float] = {
+    Urgency.LOW: 0.0,
+    Urgency.MEDIUM: 1.0,
+    Urgency.HIGH: 2.0,
+    Urgency.CRITICAL: 3.0,
+}
+
+
+def _epoch(ts: datetime) -> float:
+    """Seconds since the epoch (naive timestamps are UTC, as everywhere here)."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+class _Score:
+    """Decayed sums for one pain, as of time t."""
+
+    __slots__ = ("t", "fast_u", "fast_v", "slow_u", "slow_v")
+
+    def __init__(self, t: float, fast_u: float = 0.0, fast_v: float = 0.0,
+                 slow_u: float = 0.0, slow_v: float = 0.0):
+        self.t = t
+        self.fast_u = fast_u
+        self.fast_v = fast_v
+        self.slow_u = slow_u
+        self.slow_v = slow_v
+
+
+class EscalationDetector:
+    """Streaming urgency-escalation detector with persisted per-pain state."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        fast_half_life_hours: float = FAST_HALF_LIFE_HOURS,
+        slow_half_life_hours: float = SLOW_HALF_LIFE_HOURS,
+        threshold: float = ESCALATION_THRESHOLD,
+        min_volume: float = MIN_FAST_VOLUME,
+        pains: Optional[PainIndex] = None,
+    ):
+        if not 0 < fast_half_life_hours < slow_half_life_hours:
+            raise ValueError("need 0 < fast_half_life_hours < slow_half_life_hours")
+        self.db_path = Path(db_path) if db_path else None
+        self.fast_half_life = fast_half_life_hours * 3600
+        self.slow_half_life = slow_half_life_hours * 3600
+        self.threshold = threshold
+        self.min_volume = min_volume
+        self.pains = pains or PainIndex(str(self.db_path) if self.db_path else None)
+        self._scores: Dict[str, _Score] = {}
+        self._dirty: Set[str] = set()
+        self.observed = 0
+
+        self._db = shared(str(self.db_path)) if self.db_path is not None else None
+        if self._db is not None:
+            with self._conn() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS escalation_state (
+                        pain TEXT PRIMARY KEY,
+                        t REAL,
+                        fast_u REAL,
+                        fast_v REAL,
+                        slow_u REAL,
+                        slow_v REAL
+                    )
+                """)
+                for pain, *values in conn.execute(
+                        "SELECT pain, t, fast_u, fast_v, slow_u, slow_v FROM escalation_state"):
+                    self._scores[pain] = _Score(*values)
+
+    def _conn(self) -> ContextManager[sqlite3.Connection]:
+        return self._db.write()
+
+    # ── Scoring ─────────────────────────────────────────────────────────
+
+    def observe(self, pain: str, urgency: Urgency, timestamp: datetime) -> None:
+        """Add one classified signal on canonical `pain`. O(1)."""
+        t = _epoch(timestamp)
+        u = URGENCY_SCORE[Urgency(urgency)]
+        s = self._scores.get(pain)
+        if s is None:
+            s = self._scores[pain] = _Score(t)
+        dt = t - s.t
+        if dt >= 0:                             # move the state forward to t
+            fast = 0.5 ** (dt / self.fast_half_life)
+            slow = 0.5 ** (dt / self.slow_half_life)
+            s.fast_u *= fast
+            s.fast_v *= fast
+            s.slow_u *= slow
+            s.slow_v *= slow
+            s.t = t
+            w_fast = w_slow = 1.0
+        else:                                   # late arrival: decay the new point
+            w_fast = 0.5 ** (-dt / self.fast_half_life)
+            w_slow = 0.5 ** (-dt / self.slow_half_life)
+        s.fast_u += w_fast * u
+        s.fast_v += w_fast
+        s.slow_u += w_slow * u
+        s.slow_v += w_slow
+        self._dirty.add(pain)
+        self.observed += 1
+
+    def score(self, pain: str, now: Optional[datetime] = None) -> Optional[Dict]:
+        """Fast/slow mean urgency, slope and fast volume for `pain` as of `now`."""
+        s = self._scores.get(pain)
+        if s is None or not s.fast_v or not s.slow_v:
+            return None
+        dt = max(0.0, _epoch(now or datetime.utcnow()) - s.t)
+        fast_mean = s.fast_u / s.fast_v          # decay scales Σu and Σw alike
+        slow_mean = s.slow_u / s.slow_v
+        return {
+            "fast_urgency": round(fast_mean, 3),
+            "slow_urgency": round(slow_mean, 3),
+            "slope": round(fast_mean - slow_mean, 3),
+            "fast_volume": round(s.fast_v * 0.5 ** (dt / self.fast_half_life), 3),
+        }
+
+    def is_escalating(self, pain: str, now: Optional[datetime] = None) -> bool:
+        score = self.score(pain, now)
+        return (score is not None and score["fast_volume"] >= self.min_volume
+                and score["slope"] >= self.threshold)
+
+    def escalating(self, now: Optional[datetime] = None) -> List[Dict]:
+        """Every escalating pain, steepest first."""
+        found = []
+        for pain in self._scores:
+            if self.is_escalating(pain, now):
+                found.append({"pain": self.pains.label(pain), "pain_key": pain,
+                              **self.score(pain, now)})
+        return sorted(found, key=lambda e: -e["slope"])
+
+    def update(
+        self,
+        signals: List[Signal],
+        classifications: List[Classification],
+        now: Optional[datetime] = None,
+    ) -> Set[str]:
+        """
+        Observe a batch, then set momentum_flag on its classifications
+        whose pain is escalating. Returns the escalating pain keys.
+        """
+        sig_by_id = {s.id: s for s in signals}
+        keys = self.pains.keys(cls.primary_pain for cls in classifications)
+        for cls in classifications:
+            sig = sig_by_id.get(cls.signal_id)
+            if sig is not None:
+                self.observe(keys[cls.primary_pain], cls.urgency, sig.timestamp)
+
+        escalating = {pain for pain in set(keys.values()) if self.is_escalating(pain, now)}
+        for cls in classifications:
+            if keys[cls.primary_pain] in escalating:
+                cls.momentum_flag = True
+        return escalating
+
+    # ── Persistence ─────────────────────────────────────────────────────
+
+    def save(self) -> None:
+        """Write the pains that changed since the last save."""
+        if self.db_path is None or not self._dirty:
+            return
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO escalation_state "
+                "(pain, t, fast_u, fast_v, slow_u, slow_v) VALUES (?, ?, ?, ?, ?, ?)",
+                [(p, s.t, s.fast_u, s.fast_v, s.slow_u, s.slow_v)
+                 for p, s in ((p, self._scores[p]) for p in self._dirty)],
+            )
+        self._dirty.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "pains": len(self._scores),
+            "observed": self.observed,
+            "escalating": len(self.escalating()),
+            "fast_half_life_hours": self.fast_half_life / 3600,
+            "slow_half_life_hours": self.slow_half_life / 3600,
+            "threshold": self.threshold,
+        }
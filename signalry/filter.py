@@ -13,9 +13,15 @@ miss a real signal. The LLM classifier is the second filter.
 
 from __future__ import annotations
 
+import os
 import re
-from typing import List, Set
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
+from .dedup import DedupStore, MemoryDedup
+from .matcher import PatternMatcher
 from .models import Signal
 
 
@@ -74,6 +80,13 @@ MIN_TEXT_LENGTH = 15        # Skip very short posts
 MIN_WORD_COUNT = 3          # Need at least a few words
 
 
+# ── Compiled matcher (hot path) ────────────────────────────────────────────
+# Both families merged into one alternation: a post is scanned once instead
+# of once per pattern. Built at import — edit the lists above, not at runtime.
+
+_MATCHER = PatternMatcher({"noise": NOISE_PATTERNS, "intent": INTENT_PATTERNS})
+
+
 def has_explicit_intent(text: str) -> bool:
     """Check if text contains at least one explicit intent pattern."""
     return any(p.search(text) for p in INTENT_PATTERNS)
@@ -84,6 +97,11 @@ def is_noise(text: str) -> bool:
     return any(p.search(text) for p in NOISE_PATTERNS)
 
 
+def matched_families(text: str) -> FrozenSet[str]:
+    """Single-pass check: which rule families ("noise", "intent") match text."""
+    return _MATCHER.scan(text)
+
+
 def meets_minimum_quality(text: str) -> bool:
     """Basic quality gate: length and word count."""
     clean = text.strip()
@@ -94,7 +112,149 @@ def meets_minimum_quality(text: str) -> bool:
     return True
 
 
-def filter_signals(signals: List[Signal]) -> List[Signal]:
+def passes_gates(text: str) -> bool:
+    """Quality, noise and intent gates for a single post (no dedup)."""
+    # Quality gate
+    if not meets_minimum_quality(text):
+        return False
+
+    hits = _MATCHER.scan(text)
+
+    # Noise gate
+    if "noise" in hits:
+        return False
+
+    # Intent gate
+    return "intent" in hits
+
+
+# ── Instrumentation (optional) ─────────────────────────────────────────────
+
+@dataclass
+class PatternStats:
+    """Counters for one filter pattern."""
+    pattern: str
+    evaluations: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+
+class FilterStats:
+    """
+    Per-rule hit counters and timing for the filter, plus rejections per gate.
+
+    Pass one to filter_signals(..., stats=FilterStats()) to collect it.
+    The instrumented path evaluates every pattern of a family (no
+    short-circuit) so hit counts show what each rule actually catches;
+    keep/drop decisions are unchanged. Without `stats` the filter takes
+    the compiled single-pass path and pays nothing for this.
+    """
+
+    GATES = ("dupe", "quality", "noise", "intent")
+
+    def __init__(self) -> None:
+        self.noise = [PatternStats(p.pattern) for p in NOISE_PATTERNS]
+        self.intent = [PatternStats(p.pattern) for p in INTENT_PATTERNS]
+        self.rejected: Dict[str, int] = {g: 0 for g in self.GATES}
+        self.passed = 0
+
+    @staticmethod
+    def _run(patterns: List[re.Pattern], counters: List[PatternStats], text: str) -> bool:
+        hit = False
+        for p, c in zip(patterns, counters):
+            start = time.perf_counter()
+            matched = p.search(text) is not None
+            c.seconds += time.perf_counter() - start
+            c.evaluations += 1
+            if matched:
+                c.hits += 1
+                hit = True
+        return hit
+
+    def gate(self, text: str) -> bool:
+        """Instrumented passes_gates — same decision, with counters."""
+        if not meets_minimum_quality(text):
+            self.rejected["quality"] += 1
+            return False
+        if self._run(NOISE_PATTERNS, self.noise, text):
+            self.rejected["noise"] += 1
+            return False
+        if not self._run(INTENT_PATTERNS, self.intent, text):
+            self.rejected["intent"] += 1
+            return False
+        self.passed += 1
+        return True
+
+    def merge(self, other: "FilterStats") -> "FilterStats":
+        """Add another FilterStats (e.g. from a worker process) into this one."""
+        for mine, theirs in zip(self.noise + self.intent, other.noise + other.intent):
+            mine.evaluations += theirs.evaluations
+            mine.hits += theirs.hits
+            mine.seconds += theirs.seconds
+        for gate, n in other.rejected.items():
+            self.rejected[gate] += n
+        self.passed += other.passed
+        return self
+
+    def never_fired(self) -> List[str]:
+        """Patterns evaluated at least once that never matched."""
+        return [c.pattern for c in self.noise + self.intent if c.evaluations and not c.hits]
+
+    def to_dict(self) -> Dict:
+        return {
+            "passed": self.passed,
+            "rejected": dict(self.rejected),
+            "noise_patterns": [asdict(c) for c in self.noise],
+            "intent_patterns": [asdict(c) for c in self.intent],
+            "never_fired": self.never_fired(),
+        }
+
+
+def filter_signals_iter(
+    signals: Iterable[Signal],
+    dedup: Optional[DedupStore] = None,
+    stats: Optional[FilterStats] = None,
+) -> Iterator[Signal]:
+    """
+    Streaming variant of filter_signals — yields accepted signals lazily.
+
+    `dedup` remembers source_ids across calls (LRUDedup for a bounded
+    in-memory window, SQLiteDedup to hold across runs). Defaults to a
+    fresh MemoryDedup, i.e. dedup within this call only.
+    """
+    seen = dedup if dedup is not None else MemoryDedup()
+
+    if stats is not None:
+        yield from _filter_instrumented(signals, seen, stats)
+        return
+
+    for signal in signals:
+        # Dedup by source_id
+        if seen.check_and_add(signal.source_id):
+            continue
+
+        if passes_gates(signal.text):
+            yield signal
+
+
+def _filter_instrumented(
+    signals: Iterable[Signal],
+    seen: DedupStore,
+    stats: FilterStats,
+) -> Iterator[Signal]:
+    for signal in signals:
+        if seen.check_and_add(signal.source_id):
+            stats.rejected["dupe"] += 1
+            continue
+        if stats.gate(signal.text):
+            yield signal
+
+
+def filter_signals(
+    signals: List[Signal],
+    dedup: Optional[DedupStore] = None,
+    stats: Optional[FilterStats] = None,
+) -> List[Signal]:
     """
     Apply all filters. Returns only signals with explicit intent.
 
@@ -105,28 +265,62 @@ def filter_signals(signals: List[Signal]) -> List[Signal]:
     4. Keep only posts with explicit intent
 
     Returns list of signals that should proceed to LLM classification.
+    Pass `stats` to collect per-rule counters (see FilterStats).
     """
-    seen_ids: Set[str] = set()
-    passed: List[Signal] = []
+    return list(filter_signals_iter(signals, dedup, stats))
 
-    for signal in signals:
-        # Dedup by source_id
-        if signal.source_id in seen_ids:
-            continue
-        seen_ids.add(signal.source_id)
 
-        # Quality gate
-        if not meets_minimum_quality(signal.text):
-            continue
+# ── Parallel mode (backfills) ──────────────────────────────────────────────
 
-        # Noise gate
-        if is_noise(signal.text):
-            continue
+DEFAULT_CHUNK_SIZE = 2000
 
-        # Intent gate
-        if not has_explicit_intent(signal.text):
-            continue
 
-        passed.append(signal)
+def _gate_mask(texts: List[str]) -> List[bool]:
+    """Worker: gate results for one chunk. Module-level so it pickles."""
+    return [passes_gates(t) for t in texts]
+
 
-    return passed
+def _gate_mask_instrumented(texts: List[str]) -> Tuple[List[bool], FilterStats]:
+    stats = FilterStats()
+    return [stats.gate(t) for t in texts], stats
+
+
+def filter_signals_parallel(
+    signals: List[Signal],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dedup: Optional[DedupStore] = None,
+    stats: Optional[FilterStats] = None,
+) -> List[Signal]:
+    """
+    filter_signals for large backfills: the quality, noise and intent gates
+    run in a ProcessPoolExecutor over chunks of texts.
+
+    Dedup runs first, serially, in input order (first occurrence wins) —
+    gates don't affect dedup, so this matches the serial path. Chunk
+    results are reassembled in order, so output is identical to
+    filter_signals(signals).
+    """
+    workers = workers or os.cpu_count() or 1
+    seen = dedup if dedup is not None else MemoryDedup()
+    unique = [s for s in signals if not seen.check_and_add(s.source_id)]
+    if stats is not None:
+        stats.rejected["dupe"] += len(signals) - len(unique)
+
+    texts = [s.text for s in unique]
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    worker = _gate_mask if stats is None else _gate_mask_instrumented
+
+    if workers <= 1 or len(chunks) <= 1:
+        parts = [worker(texts)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(worker, chunks))
+
+    if stats is not None:
+        for _, part_stats in parts:
+            stats.merge(part_stats)
+        parts = [mask for mask, _ in parts]
+    mask = [ok for part in parts for ok in part]
+
+    return [s for s, ok in zip(unique, mask) if ok]
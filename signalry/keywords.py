@@ -0,0 +1,96 @@
+"""
+Keyword automaton — every hit of a fixed keyword set in one pass.
+
+MockClassifier used to run ~60 separate `w in text` scans per post (some
+words twice). It is also the fallback when the LLM is down, so it has to
+keep up with the full stream.
+
+Design:
+- KeywordAutomaton(words): each distinct keyword gets one bit; mask(text)
+  returns the OR of the bits of every keyword that occurs in text
+  (substring semantics, same as `w in text`)
+- Callers turn rule word-lists into masks once (mask_of) and decide with
+  bit tests, so a keyword shared by several rules is looked for once
+- Backend "aho-corasick": a prebuilt Aho–Corasick automaton (the
+  pyahocorasick C extension, `pip install signalry[fast]`) — one pass
+  over the text, all overlapping hits
+- Backend "scan": without the extension, each distinct keyword is
+  scanned for once with str's C substring search. A pure-Python
+  automaton walks the text a character at a time and loses to that, so
+  it is not offered.
+"""
+
+from __future__ import annotations
+
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+AHO_CORASICK = "aho-corasick"
+SCAN = "scan"
+
+
+def _has_pyahocorasick() -> bool:
+    try:
+        import ahocorasick  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class KeywordAutomaton:
+    """
+    Usage:
+        kw = KeywordAutomaton(["bug", "broken", "broken now"])
+        broken = kw.mask_of(["bug", "broken"])
+        if kw.mask(text.lower()) & broken: ...
+    """
+
+    def __init__(self, keywords: Iterable[str], backend: Optional[str] = None):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(keywords))   # dedupe, keep order
+        if not all(self.keywords):
+            raise ValueError("keywords must be non-empty strings")
+        self._bits = {w: 1 << i for i, w in enumerate(self.keywords)}
+
+        if backend is None:
+            backend = AHO_CORASICK if _has_pyahocorasick() else SCAN
+        if backend == AHO_CORASICK:
+            try:
+                import ahocorasick
+            except ImportError:
+                raise ImportError("pip install pyahocorasick — required for the aho-corasick backend")
+            automaton = ahocorasick.Automaton()
+            for word, bit in self._bits.items():
+                automaton.add_word(word, bit)
+            automaton.make_automaton()
+            self._automaton = automaton
+            self.mask = self._mask_automaton
+        elif backend == SCAN:
+            self._pairs = tuple(self._bits.items())
+            self.mask = self._mask_scan
+        else:
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.backend = backend
+
+    def mask_of(self, words: Iterable[str]) -> int:
+        """Bit mask for a rule's word list (every word must be a keyword)."""
+        mask = 0
+        for w in words:
+            mask |= self._bits[w]
+        return mask
+
+    def _mask_automaton(self, text: str) -> int:
+        mask = 0
+        for _, bit in self._automaton.iter(text):
+            mask |= bit
+        return mask
+
+    def _mask_scan(self, text: str) -> int:
+        mask = 0
+        for word, bit in self._pairs:
+            if word in text:
+                mask |= bit
+        return mask
+
+    def hits(self, text: str) -> FrozenSet[str]:
+        """Keywords that occur in text."""
+        mask = self.mask(text)
+        return frozenset(w for w, bit in self._bits.items() if mask & bit)
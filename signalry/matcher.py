@@ -0,0 +1,119 @@
+"""
+Compiled pattern matcher — scan a text once for several rule families.
+
+filter.py keeps its rules as readable lists of small regexes. Running
+them one by one means a post with no intent is scanned once per
+pattern (18 intent + 6 noise). PatternMatcher merges every family into
+a single alternation so the common case is one pass over the text.
+
+Design:
+- Each family becomes one named group: (?P<noise>...)|(?P<intent>...)
+- `\\b(...)\\b` patterns share a single word-boundary check
+- Results are exact: a family is reported if and only if
+  `any(p.search(text) for p in family)` would be True
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, List, Sequence
+
+# Inline flags that can be scoped to a sub-pattern with (?flags:...)
+_SCOPED_FLAGS = ((re.A, "a"), (re.I, "i"), (re.M, "m"), (re.S, "s"), (re.X, "x"))
+
+_WORD_WRAPPED = re.compile(r"^\\b\((?!\?)(.*)\)\\b$", re.S)
+
+
+def _scoped(source: str, flags: int) -> str:
+    """Wrap a pattern so its compile flags survive being merged."""
+    letters = "".join(ch for flag, ch in _SCOPED_FLAGS if flags & flag)
+    return f"(?{letters}:{source})" if letters else f"(?:{source})"
+
+
+def _merge(patterns: Sequence[re.Pattern]) -> str:
+    """Merge a family of patterns into one alternation (no captures added)."""
+    bounded: List[str] = []
+    other: List[str] = []
+    for p in patterns:
+        m = _WORD_WRAPPED.match(p.pattern)
+        if m and _balanced(m.group(1)):
+            bounded.append(_scoped(m.group(1), p.flags))
+        else:
+            other.append(_scoped(p.pattern, p.flags))
+    alts = list(other)
+    if bounded:
+        alts.append(r"\b(?:" + "|".join(bounded) + r")\b")
+    return "|".join(alts) or "(?!)"   # empty family never matches
+
+
+def _balanced(source: str) -> bool:
+    """True if `source` is a complete group body (so `\\b(source)\\b` is one group)."""
+    depth = 0
+    escaped = False
+    in_class = False
+    for ch in source:
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0
+
+
+class PatternMatcher:
+    """
+    Single-pass matcher over named families of compiled patterns.
+
+    Usage:
+        m = PatternMatcher({"noise": NOISE_PATTERNS, "intent": INTENT_PATTERNS})
+        m.scan("I need a better tool")   # → frozenset({"intent"})
+
+    Families are tried in the order given. The patterns are read once at
+    construction; later changes to the source lists are not picked up.
+    """
+
+    def __init__(self, families: Dict[str, Sequence[re.Pattern]]):
+        self.names: List[str] = list(families)
+        self._family_re: Dict[str, re.Pattern] = {}
+        groups: List[str] = []
+        for name in self.names:
+            if not name.isidentifier():
+                raise ValueError(f"Family name must be an identifier: {name!r}")
+            merged = _merge(families[name])
+            self._family_re[name] = re.compile(merged)
+            groups.append(f"(?P<{name}>{merged})")
+        self._combined = re.compile("|".join(groups))
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Return the names of every family with at least one match in `text`."""
+        m = self._combined.search(text)
+        if m is None:
+            return frozenset()
+
+        first = m.lastgroup
+        start = m.start()
+        hits = {first}
+        seen_first = False
+        for name in self.names:
+            if name == first:
+                seen_first = True
+                continue
+            # Families ordered before the winner already failed at `start`;
+            # families after it were never tried there.
+            pos = start if seen_first else start + 1
+            if self._family_re[name].search(text, pos) is not None:
+                hits.add(name)
+        return frozenset(hits)
+
+    def matches(self, family: str, text: str) -> bool:
+        """Check a single family (one pass over its merged alternation)."""
+        return self._family_re[family].search(text) is not None
@@ -11,15 +11,38 @@ Design:
 
 This is NOT ML. It's counting + time windowing.
 If 3+ signals mention the same pain within a window, that's momentum.
+
+detect_momentum() sees one batch. MomentumWindow keeps the window across
+runs (hour buckets in the queue DB), so 2 actors this run plus 2 last
+run still make a cluster — and items queued earlier get flagged too.
+
+Pains are grouped on their canonical key when a pains.PainIndex is
+given, so the LLM's rephrasings of one pain count toward the same
+cluster; without one, on primary_pain.lower().strip().
+
+MomentumSketches is the bounded-memory backend: HyperLogLog per (pain,
+hour) instead of actor sets, count-min instead of the (actor, pain)
+counter. Pass it to detect_momentum(sketches=...).
 """
 
 from __future__ import annotations
 
+import heapq
+import math
+import sqlite3
 from collections import Counter, defaultdict
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import ContextManager, Dict, Iterable, List, Optional, Set, Tuple
 
+from .burst import BurstDetector
+from .db import shared
+from .escalation import EscalationDetector
 from .models import Signal, Classification
+from .pains import PainIndex
+from .sketches import (
+    DEFAULT_CMS_DEPTH, DEFAULT_CMS_WIDTH, DEFAULT_PRECISION, CountMinSketch, HyperLogLog,
+)
 
 
 # ── Configuration ───────────────────────────────────────────────────────────
@@ -27,6 +50,15 @@ from .models import Signal, Classification
 DEFAULT_WINDOW_HOURS = 48       # Look back 48h for clustering
 MIN_CLUSTER_SIZE = 3            # 3+ signals = momentum
 ACTOR_REPEAT_THRESHOLD = 2     # Same actor, same pain 2+ times = signal
+CMS_BUCKET_HOURS = 24           # MomentumSketches: one count-min per day
+CMS_PAIRS_PER_WIDTH = 2         # ... sized for width / 2 (actor, pain) pairs a day
+
+
+def _pain_keys(pains: Optional[PainIndex], raws: List[str]) -> Dict[str, str]:
+    """raw primary_pain → grouping key: canonical with an index, else lower().strip()."""
+    if pains is None:
+        return {raw: raw.lower().strip() for raw in raws}
+    return pains.keys(raws)
 
 
 def detect_momentum(
@@ -34,6 +66,11 @@ def detect_momentum(
     classifications: List[Classification],
     window_hours: int = DEFAULT_WINDOW_HOURS,
     min_cluster: int = MIN_CLUSTER_SIZE,
+    pains: Optional[PainIndex] = None,
+    sketches: Optional["MomentumSketches"] = None,
+    escalation: Optional[EscalationDetector] = None,
+    burst: Optional[BurstDetector] = None,
+    counted: Optional[Set[str]] = None,
 ) -> List[Classification]:
     """
     Detect momentum patterns and update classification.momentum_flag.
@@ -42,7 +79,21 @@ def detect_momentum(
     1. TOPIC CLUSTERING: 3+ different actors mention the same primary_pain
        within the time window.
     2. ACTOR PERSISTENCE: Same actor raises the same pain 2+ times.
-    3. URGENCY ESCALATION: Average urgency for a pain topic is increasing.
+    3. URGENCY ESCALATION (with `escalation`): a pain's decayed average
+       urgency over the last hours is well above its longer baseline
+       (escalation.EscalationDetector; its state carries across calls).
+    4. BURST (with `burst`): a pain's arrivals over the last few hours
+       spike far above its own weekly baseline (burst.BurstDetector).
+
+    Pains are compared by canonical key with `pains`, else by
+    primary_pain.lower().strip().
+
+    With `sketches`, the batch is added to them and both rules are
+    decided on their (approximate) counts — which also cover whatever
+    the sketches already held — instead of on exact sets. Sketches
+    cannot tell a signal they have seen from a new one, so pass
+    `counted` (signal ids) to add only those — e.g. the ones the queue
+    will insert — and flag the rest from the counts alone.
 
     Returns the same classifications list with momentum_flag updated.
     """
@@ -51,9 +102,19 @@ def detect_momentum(
 
     # Build lookup
     sig_by_id: Dict[str, Signal] = {s.id: s for s in signals}
+    pain_keys = _pain_keys(pains, [cls.primary_pain for cls in classifications])
     now = datetime.utcnow()
     window_start = now - timedelta(hours=window_hours)
 
+    if escalation is not None:
+        escalation.update(signals, classifications)
+    if burst is not None:
+        burst.update(signals, classifications)
+
+    if sketches is not None:
+        return _detect_with_sketches(sketches, sig_by_id, classifications, pain_keys,
+                                     window_start, min_cluster, counted)
+
     # ── 1. Topic clustering ─────────────────────────────────────────────
     # Group by primary_pain within window
     pain_actors: Dict[str, set] = defaultdict(set)       # pain → {actors}
@@ -66,7 +127,7 @@ def detect_momentum(
         if sig.timestamp < window_start:
             continue
 
-        pain_key = cls.primary_pain.lower().strip()
+        pain_key = pain_keys[cls.primary_pain]
         pain_actors[pain_key].add(sig.actor)
         pain_signals[pain_key].append(cls.signal_id)
 
@@ -82,19 +143,19 @@ def detect_momentum(
         sig = sig_by_id.get(cls.signal_id)
         if not sig:
             continue
-        key = (sig.actor, cls.primary_pain.lower().strip())
+        key = (sig.actor, pain_keys[cls.primary_pain])
         actor_pain_count[key] += 1
 
     persistent_signals: set = {
         cls.signal_id for cls in classifications
         if (sig_by_id.get(cls.signal_id) and
             actor_pain_count[(sig_by_id[cls.signal_id].actor,
-                              cls.primary_pain.lower().strip())] >= ACTOR_REPEAT_THRESHOLD)
+                              pain_keys[cls.primary_pain])] >= ACTOR_REPEAT_THRESHOLD)
     }
 
     # ── 3. Apply momentum flags ────────────────────────────────────────
     for cls in classifications:
-        pain_key = cls.primary_pain.lower().strip()
+        pain_key = pain_keys[cls.primary_pain]
 
         if pain_key in momentum_pains:
             cls.momentum_flag = True
@@ -104,33 +165,538 @@ def detect_momentum(
     return classifications
 
 
+def _detect_with_sketches(
+    sketches: "MomentumSketches",
+    sig_by_id: Dict[str, Signal],
+    classifications: List[Classification],
+    pain_keys: Dict[str, str],
+    window_start: datetime,
+    min_cluster: int,
+    counted: Optional[Set[str]] = None,
+) -> List[Classification]:
+    for cls in classifications:
+        sig = sig_by_id.get(cls.signal_id)
+        if sig and (counted is None or sig.id in counted):
+            sketches.add(sig.actor, pain_keys[cls.primary_pain], sig.timestamp)
+
+    clustered: Dict[str, bool] = {}
+    for cls in classifications:
+        pain = pain_keys[cls.primary_pain]
+        if pain not in clustered:
+            clustered[pain] = sketches.distinct_actors(pain, since=window_start) >= min_cluster
+        sig = sig_by_id.get(cls.signal_id)
+        if clustered[pain] or (
+                sig and sketches.repeat_count(sig.actor, pain) >= ACTOR_REPEAT_THRESHOLD):
+            cls.momentum_flag = True
+    return classifications
+
+
 def get_momentum_summary(
     classifications: List[Classification],
     signals: List[Signal],
+    pains: Optional[PainIndex] = None,
 ) -> List[Dict]:
     """
     Return a summary of detected momentum clusters.
     Useful for the review queue and reporting.
+
+    One cluster per pain key (canonical with `pains`, else
+    lower().strip()); "pain" is its label (first spelling).
     """
+    flagged = [cls for cls in classifications if cls.momentum_flag]
+    pain_keys = _pain_keys(pains, [cls.primary_pain for cls in flagged])
     sig_by_id = {s.id: s for s in signals}
     pain_groups: Dict[str, List] = defaultdict(list)
+    labels: Dict[str, str] = {}
 
-    for cls in classifications:
-        if cls.momentum_flag:
-            sig = sig_by_id.get(cls.signal_id)
-            pain_groups[cls.primary_pain].append({
-                "actor": sig.actor if sig else "unknown",
-                "text_preview": (sig.text[:80] + "...") if sig and len(sig.text) > 80 else (sig.text if sig else ""),
-                "urgency": cls.urgency.value,
-                "signal_id": cls.signal_id,
-            })
+    for cls in flagged:
+        sig = sig_by_id.get(cls.signal_id)
+        key = pain_keys[cls.primary_pain]
+        labels.setdefault(key, cls.primary_pain.strip())
+        pain_groups[key].append({
+            "actor": sig.actor if sig else "unknown",
+            "text_preview": (sig.text[:80] + "...") if sig and len(sig.text) > 80 else (sig.text if sig else ""),
+            "urgency": cls.urgency.value,
+            "signal_id": cls.signal_id,
+        })
 
     return [
         {
-            "pain": pain,
+            "pain": pains.label(key) if pains is not None else labels[key],
+            "pain_key": key,
             "signal_count": len(items),
             "unique_actors": len(set(i["actor"] for i in items)),
             "signals": items,
         }
-        for pain, items in pain_groups.items()
+        for key, items in pain_groups.items()
     ]
+
+
+# ── Persistent sliding window ───────────────────────────────────────────────
+
+def _hour_bucket(ts: datetime) -> int:
+    """Hours since the epoch (naive timestamps are UTC, as everywhere here)."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() // 3600)
+
+
+class MomentumWindow:
+    """
+    Stateful momentum over the last `window_hours`, persisted across runs.
+
+    Same rules as detect_momentum(), counted over every signal in the
+    window instead of one batch:
+    - topic clustering: `min_cluster`+ distinct actors on a pain
+    - actor persistence: one actor on the same pain `actor_threshold`+ times
+
+    Design:
+    - One row per observed signal in `momentum_window` (signal_id, hour
+      bucket, pain, actor, flagged), in the review-queue DB
+    - In memory: pain → Counter(actor → signals in window). observe() is
+      O(1); slide() pops expired hour buckets off a heap and subtracts
+      their signals, so each signal is added and expired once (O(1)
+      amortized)
+    - Window edges are whole hours: a signal stays in while its hour
+      bucket does (up to an hour longer than detect_momentum's cut-off)
+    - Opened for the first time on a queue DB that already has items,
+      the window is seeded from them
+    - Pains are canonical keys from `pains` (default: the PainIndex
+      persisted in the same DB); stored keys are re-resolved on load
+
+    Usage:
+        window = MomentumWindow(queue.db_path)
+        reflag = window.update(signals, classifications)   # sets momentum_flag
+        queue.set_momentum_flags(reflag)                    # items from earlier runs
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        window_hours: int = DEFAULT_WINDOW_HOURS,
+        min_cluster: int = MIN_CLUSTER_SIZE,
+        actor_threshold: int = ACTOR_REPEAT_THRESHOLD,
+        now: Optional[datetime] = None,
+        pains: Optional[PainIndex] = None,
+    ):
+        self.db_path = Path(db_path)
+        self._db = shared(str(self.db_path))
+        self.pains = pains or PainIndex(str(self.db_path))
+        self.window_hours = window_hours
+        self.min_cluster = min_cluster
+        self.actor_threshold = actor_threshold
+
+        self._pain_actors: Dict[str, Counter] = defaultdict(Counter)
+        self._pain_members: Dict[str, Dict[str, str]] = defaultdict(dict)  # pain → {id: actor}
+        self._members: Dict[str, Tuple[int, str, str]] = {}    # id → (bucket, pain, actor)
+        self._buckets: Dict[int, List[str]] = defaultdict(list)
+        self._heap: List[int] = []
+        self._flagged: Set[str] = set()
+        self._new_rows: List[Tuple] = []
+
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS momentum_window (
+                    signal_id TEXT PRIMARY KEY,
+                    bucket INTEGER,
+                    pain TEXT,
+                    actor TEXT,
+                    flagged INTEGER DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_momentum_window_bucket
+                    ON momentum_window(bucket);
+            """)
+            start = self._window_start(now)
+            if conn.execute("SELECT 1 FROM momentum_window LIMIT 1").fetchone() is None:
+                self._seed_from_queue(conn, now)
+            rows = conn.execute(
+                "SELECT signal_id, bucket, pain, actor, flagged FROM momentum_window "
+                "WHERE bucket >= ? ORDER BY bucket",
+                (start,),
+            ).fetchall()
+        self._expired_through = start - 1          # buckets up to here are gone
+        keys = self.pains.keys(row[2] for row in rows)
+        for signal_id, bucket, pain, actor, flagged in rows:
+            self._add(signal_id, bucket, keys[pain], actor)
+            if flagged:
+                self._flagged.add(signal_id)
+
+    def _conn(self) -> ContextManager[sqlite3.Connection]:
+        return self._db.write()
+
+    def _seed_from_queue(self, conn: sqlite3.Connection, now: Optional[datetime]) -> None:
+        """First use on an existing queue DB: start from what is already queued."""
+        has_queue = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+            "AND name IN ('signals', 'classifications')").fetchone()[0] == 2
+        if not has_queue:
+            return
+        since = (now or datetime.utcnow()) - timedelta(hours=self.window_hours + 1)
+        rows = conn.execute(
+            """SELECT s.id, s.actor, s.timestamp, c.primary_pain, c.momentum_flag
+               FROM signals s JOIN classifications c ON c.signal_id = s.id
+               WHERE s.timestamp >= ?""",
+            (since.isoformat(),),
+        ).fetchall()
+        keys = self.pains.keys(row[3] for row in rows)
+        conn.executemany(
+            "INSERT OR IGNORE INTO momentum_window (signal_id, bucket, pain, actor, flagged) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(sid, _hour_bucket(datetime.fromisoformat(ts)), keys[pain], actor, flag)
+             for sid, actor, ts, pain, flag in rows],
+        )
+
+    def _window_start(self, now: Optional[datetime]) -> int:
+        now = now or datetime.utcnow()
+        return _hour_bucket(now - timedelta(hours=self.window_hours))
+
+    # ── Window maintenance ──────────────────────────────────────────────
+
+    def _add(self, signal_id: str, bucket: int, pain: str, actor: str) -> None:
+        self._members[signal_id] = (bucket, pain, actor)
+        self._pain_actors[pain][actor] += 1
+        self._pain_members[pain][signal_id] = actor
+        if not self._buckets[bucket]:
+            heapq.heappush(self._heap, bucket)
+        self._buckets[bucket].append(signal_id)
+
+    def observe(self, signal: Signal, cls: Classification) -> bool:
+        """Count one classified signal. False if outside the window or already seen."""
+        bucket = _hour_bucket(signal.timestamp)
+        if signal.id in self._members or bucket <= self._expired_through:
+            return False
+        pain = self.pains.key(cls.primary_pain)
+        self._add(signal.id, bucket, pain, signal.actor)
+        self._new_rows.append((signal.id, bucket, pain, signal.actor))
+        return True
+
+    def slide(self, now: Optional[datetime] = None) -> int:
+        """Expire hour buckets that fell out of the window. Returns signals removed."""
+        start = self._window_start(now)
+        removed = 0
+        while self._heap and self._heap[0] < start:
+            bucket = heapq.heappop(self._heap)
+            for signal_id in self._buckets.pop(bucket, []):
+                _, pain, actor = self._members.pop(signal_id)
+                actors = self._pain_actors[pain]
+                actors[actor] -= 1
+                if not actors[actor]:
+                    del actors[actor]
+                if not actors:
+                    del self._pain_actors[pain]
+                del self._pain_members[pain][signal_id]
+                if not self._pain_members[pain]:
+                    del self._pain_members[pain]
+                self._flagged.discard(signal_id)
+                removed += 1
+        self._expired_through = max(self._expired_through, start - 1)
+        return removed
+
+    # ── Momentum ────────────────────────────────────────────────────────
+
+    def is_cluster(self, pain: str) -> bool:
+        return len(self._pain_actors.get(pain, ())) >= self.min_cluster
+
+    def is_persistent(self, actor: str, pain: str) -> bool:
+        return self._pain_actors.get(pain, {}).get(actor, 0) >= self.actor_threshold
+
+    def momentum_pains(self) -> Set[str]:
+        return {pain for pain in self._pain_actors if self.is_cluster(pain)}
+
+    def update(
+        self,
+        signals: List[Signal],
+        classifications: List[Classification],
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Slide the window, add this batch and set momentum_flag on it
+        (like detect_momentum). Returns ids of signals from earlier runs
+        that are now part of a momentum cluster and not yet flagged —
+        pass them to ReviewQueue.set_momentum_flags(). State is saved.
+        """
+        self.slide(now)
+        sig_by_id = {s.id: s for s in signals}
+        touched: Set[str] = set()
+        for cls in classifications:
+            sig = sig_by_id.get(cls.signal_id)
+            if sig is not None and self.observe(sig, cls):
+                touched.add(self.pains.key(cls.primary_pain))
+
+        batch_ids = set()
+        for cls in classifications:
+            sig = sig_by_id.get(cls.signal_id)
+            pain = self.pains.key(cls.primary_pain)
+            if self.is_cluster(pain) or (sig is not None and self.is_persistent(sig.actor, pain)):
+                cls.momentum_flag = True
+            if cls.momentum_flag:
+                batch_ids.add(cls.signal_id)
+
+        reflag: List[str] = []
+        for pain in touched:
+            cluster = self.is_cluster(pain)
+            for signal_id, actor in self._pain_members[pain].items():
+                if signal_id in self._flagged or signal_id in batch_ids:
+                    continue
+                if cluster or self.is_persistent(actor, pain):
+                    reflag.append(signal_id)
+
+        newly_flagged = (batch_ids & self._members.keys()) | set(reflag)
+        self._flagged |= newly_flagged
+        self.save(flagged=newly_flagged)
+        return reflag
+
+    # ── Persistence ─────────────────────────────────────────────────────
+
+    def save(self, flagged: Iterable[str] = ()) -> None:
+        """Write new rows and flags; drop rows that left the window."""
+        with self._conn() as conn:
+            if self._new_rows:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO momentum_window (signal_id, bucket, pain, actor) "
+                    "VALUES (?, ?, ?, ?)",
+                    self._new_rows,
+                )
+                self._new_rows = []
+            conn.executemany(
+                "UPDATE momentum_window SET flagged = 1 WHERE signal_id = ?",
+                [(sid,) for sid in flagged],
+            )
+            conn.execute("DELETE FROM momentum_window WHERE bucket <= ?",
+                         (self._expired_through,))
+
+    def stats(self) -> Dict:
+        return {
+            "window_hours": self.window_hours,
+            "signals": len(self._members),
+            "pains": len(self._pain_actors),
+            "momentum_pains": len(self.momentum_pains()),
+            "flagged": len(self._flagged),
+        }
+
+
+# ── Sketch backend ──────────────────────────────────────────────────────────
+
+class MomentumSketches:
+    """
+    Momentum counts in bounded memory, for histories too big for sets.
+
+    - distinct actors: one HyperLogLog per (pain, hour bucket); a window
+      query merges the buckets it spans. Error ~1.04/√2^precision
+      (1.6% at the default 12); a sketch costs at most 2^precision bytes
+      and a few bytes while its pain has few actors
+    - actor persistence: one CountMinSketch of "actor␟pain" per UTC day
+      (CMS_BUCKET_HOURS); repeat_count sums the days still held. Never
+      undercounts; may overcount by ε·N per day (see sketches.py), so a
+      one-off pair can read as a repeat. prune() drops whole days with
+      the hour buckets, so N — and the error — stays a few days' worth
+      instead of growing with all history. Keep `cms_width` ≥ 2× the
+      distinct (actor, pain) pairs expected per day:
+      benchmarks.bench_sketches measures < 1% false repeats there. The
+      default 65536 covers ~30k pairs a day (CMS_PAIRS_PER_WIDTH);
+      stats()["cms_warning"] says when a day has taken more signals
+      than that
+    - merge(other) folds in another instance (a worker process's, a
+      shard's); tables momentum_hll / momentum_cms_day persist it in
+      the queue DB. One writer per DB: workers hand their sketches to it
+    - prune(before) drops hour buckets — and count-min days entirely
+      before them — nobody will query again
+
+    Window edges are whole hours, as in MomentumWindow.
+
+    Usage:
+        sketches = MomentumSketches(queue.db_path)
+        detect_momentum(signals, classifications, sketches=sketches)
+        sketches.prune(datetime.utcnow() - timedelta(hours=49))
+        sketches.save()
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        precision: int = DEFAULT_PRECISION,
+        cms_width: int = DEFAULT_CMS_WIDTH,
+        cms_depth: int = DEFAULT_CMS_DEPTH,
+    ):
+        self.db_path = Path(db_path) if db_path else None
+        self.precision = precision
+        self.cms_width = cms_width
+        self.cms_depth = cms_depth
+        self._hll: Dict[str, Dict[int, HyperLogLog]] = defaultdict(dict)
+        self._cms: Dict[int, CountMinSketch] = {}          # day bucket → actor␟pain counts
+        self._dirty: Set[Tuple[str, int]] = set()
+        self._cms_dirty: Set[int] = set()
+        self._pruned_through: Optional[int] = None
+        self._legacy_cms = False
+
+        self._db = shared(str(self.db_path)) if self.db_path is not None else None
+        if self._db is not None:
+            with self._conn() as conn:
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS momentum_hll (
+                        pain TEXT,
+                        bucket INTEGER,
+                        sketch BLOB,
+                        PRIMARY KEY (pain, bucket)
+                    );
+                    CREATE TABLE IF NOT EXISTS momentum_cms (
+                        name TEXT PRIMARY KEY,
+                        sketch BLOB
+                    );
+                    CREATE TABLE IF NOT EXISTS momentum_cms_day (
+                        day INTEGER PRIMARY KEY,
+                        sketch BLOB
+                    );
+                """)
+                for pain, bucket, blob in conn.execute(
+                        "SELECT pain, bucket, sketch FROM momentum_hll"):
+                    hll = HyperLogLog.from_bytes(blob)
+                    if hll.precision != precision:
+                        raise ValueError(f"stored sketches use precision {hll.precision}")
+                    self._hll[pain][bucket] = hll
+                stored = [(day, CountMinSketch.from_bytes(blob)) for day, blob in conn.execute(
+                    "SELECT day, sketch FROM momentum_cms_day")]
+                legacy = conn.execute(
+                    "SELECT sketch FROM momentum_cms WHERE name = 'actor_pain'").fetchone()
+            if legacy is not None:
+                # Whole-history count-min from before the daily split: file it
+                # under the newest hour held, so prune() ages it out
+                newest = max((b for buckets in self._hll.values() for b in buckets),
+                             default=_hour_bucket(datetime.utcnow()))
+                day = newest // CMS_BUCKET_HOURS
+                stored.append((day, CountMinSketch.from_bytes(legacy[0])))
+                self._cms_dirty.add(day)
+                self._legacy_cms = True
+            for day, cms in stored:
+                if (cms.width, cms.depth) != (cms_width, cms_depth):
+                    raise ValueError(f"stored count-min is {cms.width}x{cms.depth}")
+                if day in self._cms:
+                    self._cms[day].merge(cms)
+                else:
+                    self._cms[day] = cms
+
+    def _conn(self) -> ContextManager[sqlite3.Connection]:
+        return self._db.write()
+
+    # ── Counting ────────────────────────────────────────────────────────
+
+    def add(self, actor: str, pain: str, timestamp: datetime) -> None:
+        """Count one signal. Add each signal once: the count-min counts every call."""
+        bucket = _hour_bucket(timestamp)
+        hll = self._hll[pain].get(bucket)
+        if hll is None:
+            hll = self._hll[pain][bucket] = HyperLogLog(self.precision)
+        hll.add(actor)
+        self._dirty.add((pain, bucket))
+        day = bucket // CMS_BUCKET_HOURS
+        cms = self._cms.get(day)
+        if cms is None:
+            cms = self._cms[day] = CountMinSketch(self.cms_width, self.cms_depth)
+        cms.add(f"{actor}\x1f{pain}")
+        self._cms_dirty.add(day)
+
+    def distinct_actors(self, pain: str, since: Optional[datetime] = None) -> int:
+        """Estimated distinct actors on `pain` from the hour of `since` on (all if None)."""
+        buckets = self._hll.get(pain)
+        if not buckets:
+            return 0
+        start = _hour_bucket(since) if since is not None else None
+        merged = HyperLogLog(self.precision)
+        for bucket, hll in buckets.items():
+            if start is None or bucket >= start:
+                merged.merge(hll)
+        return len(merged)
+
+    def repeat_count(self, actor: str, pain: str) -> int:
+        """Signals by `actor` on `pain` over the days still held (an upper estimate)."""
+        key = f"{actor}\x1f{pain}"
+        return sum(cms.estimate(key) for cms in self._cms.values())
+
+    def merge(self, other: "MomentumSketches") -> "MomentumSketches":
+        """Fold in another instance's counts (e.g. from a worker process)."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        for pain, buckets in other._hll.items():
+            for bucket, hll in buckets.items():
+                mine = self._hll[pain].get(bucket)
+                if mine is None:
+                    self._hll[pain][bucket] = hll.copy()
+                else:
+                    mine.merge(hll)
+                self._dirty.add((pain, bucket))
+        for day, cms in other._cms.items():
+            mine = self._cms.get(day)
+            if mine is None:
+                mine = self._cms[day] = CountMinSketch(self.cms_width, self.cms_depth)
+            mine.merge(cms)
+            self._cms_dirty.add(day)
+        return self
+
+    def prune(self, before: datetime) -> int:
+        """Drop hour buckets older than `before`'s, and count-min days wholly before it. Returns sketches removed."""
+        cutoff = _hour_bucket(before)
+        removed = 0
+        for day in [d for d in self._cms if (d + 1) * CMS_BUCKET_HOURS <= cutoff]:
+            del self._cms[day]
+            self._cms_dirty.discard(day)
+            removed += 1
+        for pain in list(self._hll):
+            buckets = self._hll[pain]
+            for bucket in [b for b in buckets if b < cutoff]:
+                del buckets[bucket]
+                self._dirty.discard((pain, bucket))
+                removed += 1
+            if not buckets:
+                del self._hll[pain]
+        self._pruned_through = max(self._pruned_through or cutoff - 1, cutoff - 1)
+        return removed
+
+    # ── Persistence ─────────────────────────────────────────────────────
+
+    def save(self) -> None:
+        """Write changed sketches and the count-min; apply prune() to the DB."""
+        if self.db_path is None:
+            return
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO momentum_hll (pain, bucket, sketch) VALUES (?, ?, ?)",
+                [(pain, bucket, self._hll[pain][bucket].to_bytes())
+                 for pain, bucket in self._dirty],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO momentum_cms_day (day, sketch) VALUES (?, ?)",
+                [(day, self._cms[day].to_bytes()) for day in self._cms_dirty],
+            )
+            if self._pruned_through is not None:
+                conn.execute("DELETE FROM momentum_hll WHERE bucket <= ?", (self._pruned_through,))
+                conn.execute("DELETE FROM momentum_cms_day WHERE (day + 1) * ? <= ?",
+                             (CMS_BUCKET_HOURS, self._pruned_through + 1))
+            if self._legacy_cms:
+                conn.execute("DELETE FROM momentum_cms WHERE name = 'actor_pain'")
+        self._dirty.clear()
+        self._cms_dirty.clear()
+        self._legacy_cms = False
+
+    @property
+    def memory_bytes(self) -> int:
+        return (sum(h.memory_bytes for b in self._hll.values() for h in b.values())
+                + sum(c.memory_bytes for c in self._cms.values()))
+
+    def stats(self) -> Dict:
+        capacity = self.cms_width // CMS_PAIRS_PER_WIDTH
+        busiest = max((c.total for c in self._cms.values()), default=0)
+        out = {
+            "pains": len(self._hll),
+            "hll_sketches": sum(len(b) for b in self._hll.values()),
+            "cms_days": len(self._cms),
+            "cms_total": sum(c.total for c in self._cms.values()),
+            "cms_capacity_per_day": capacity,
+            "memory_bytes": self.memory_bytes,
+            "hll_relative_error": round(1.04 / math.sqrt(1 << self.precision), 4),
+            "cms_error_bound": round(sum(c.error_bound() for c in self._cms.values()), 2),
+            "cms_delta": round(math.exp(-self.cms_depth), 4),
+        }
+        if busiest > capacity:
+            out["cms_warning"] = (f"{busiest:,} signals in one day over a count-min sized for "
+                                  f"~{capacity:,} pairs; raise cms_width")
+        return out
@@ -0,0 +1,297 @@
+"""
+Near-duplicate collapse — one classification per copypasta wave.
+
+Spam and bot waves post the same complaint with small edits. Each copy
+has its own source_id, passes filter_signals, and costs an LLM call.
+
+Design:
+- normalize(): lowercase, drop URLs/@mentions/punctuation, digits → 0
+- simhash(): 64-bit SimHash over character 3-grams of the normalized text
+- NearDuplicateIndex: LSH with banded lookups. The 64 bits are cut into
+  `bands` slices; two hashes within `max_distance` bits are guaranteed
+  to share at least one slice whenever bands > max_distance (pigeonhole).
+- A SimHash match alone is not enough: 6 bits also separate "looking
+  for an alternative to Notion" from "... to Jira". A candidate must
+  share ≥ MIN_TOKEN_OVERLAP of its words (Jaccard over normalize()
+  tokens), and posts under SHORT_POST_TOKENS words must be within
+  SHORT_MAX_DISTANCE bits — one swapped name moves a short post's hash
+  as far as cosmetic edits move a long one's
+- collapse_near_duplicates(): groups signals in arrival order; the first
+  post of a group is its representative
+- NearDuplicateCollapser: the same grouping one signal at a time, for
+  the streaming pipeline
+
+The representative is classified once and its result is fanned out to
+every member (with the member's own signal_id), so momentum still sees
+each member's actor.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from .models import Classification, Signal
+
+SIMHASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 6       # ≤ 6 of 64 bits differ = near-duplicate
+DEFAULT_BANDS = 8              # 8 × 8-bit bands → exact recall up to distance 7
+SHORT_POST_TOKENS = 12         # fewer distinct words than this = a short post
+SHORT_MAX_DISTANCE = 3         # ... whose near-duplicates are within 3 bits
+MIN_TOKEN_OVERLAP = 0.8        # Jaccard of the two posts' word sets
+SHINGLE_SIZE = 3
+
+_URL = re.compile(r"https?://\S+")
+_MENTION = re.compile(r"@\w+")
+_NON_WORD = re.compile(r"[^\w\s]+")
+_DIGITS = re.compile(r"\d+")
+
+
+def normalize(text: str) -> str:
+    """Canonical form for near-duplicate comparison."""
+    text = text.lower()
+    text = _URL.sub(" ", text)
+    text = _MENTION.sub(" ", text)
+    text = _NON_WORD.sub(" ", text)
+    text = _DIGITS.sub("0", text)
+    return " ".join(text.split())
+
+
+# Each shingle's 64-bit hash, spread into 64 one-byte lanes (bit i → lane i)
+# so a plain sum() over shingles counts every bit position at once.
+_LANE_CACHE: Dict[str, int] = {}
+_LANE_CACHE_MAX = 500_000
+_TO_LANES = bytes.maketrans(b"01", b"\x00\x01")
+_LANE_CHUNK = 255               # one-byte lanes overflow past 255 shingles
+
+
+def _lanes(shingle: str) -> int:
+    h = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+    bits = format(int.from_bytes(h, "big"), "064b").encode("ascii")
+    return int.from_bytes(bits.translate(_TO_LANES), "big")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the character 3-grams of normalize(text)."""
+    return _simhash(normalize(text))
+
+
+def _simhash(norm: str) -> int:
+    if len(norm) < SHINGLE_SIZE:
+        shingles = [norm]
+    else:
+        shingles = [norm[i:i + SHINGLE_SIZE] for i in range(len(norm) - SHINGLE_SIZE + 1)]
+
+    if len(_LANE_CACHE) > _LANE_CACHE_MAX:
+        _LANE_CACHE.clear()
+    cache = _LANE_CACHE
+    spread = []
+    for sh in shingles:
+        lanes = cache.get(sh)
+        if lanes is None:
+            lanes = cache[sh] = _lanes(sh)
+        spread.append(lanes)
+
+    counts = [0] * SIMHASH_BITS
+    for i in range(0, len(spread), _LANE_CHUNK):
+        total = sum(spread[i:i + _LANE_CHUNK]).to_bytes(SIMHASH_BITS, "big")
+        counts = [a + b for a, b in zip(counts, total)]
+
+    # Set each bit that most shingles have set (most significant first).
+    half = len(shingles) / 2
+    value = 0
+    for count in counts:
+        value = (value << 1) | (count > half)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+@dataclass
+class DuplicateGroup:
+    """A representative signal plus every near-identical member (itself included)."""
+    representative: Signal
+    members: List[Signal] = field(default_factory=list)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.members)
+
+    @property
+    def distinct_actors(self) -> int:
+        return len({m.actor for m in self.members})
+
+    def to_dict(self) -> dict:
+        return {
+            "representative": self.representative.id,
+            "member_count": self.member_count,
+            "distinct_actors": self.distinct_actors,
+            "members": [m.id for m in self.members],
+        }
+
+
+class NearDuplicateIndex:
+    """
+    Banded LSH index over SimHash values.
+
+    Usage:
+        index = NearDuplicateIndex()
+        rep = index.find(h)        # key of a stored near-duplicate, or None
+        index.add(key, h)
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, bands: int = DEFAULT_BANDS):
+        if SIMHASH_BITS % bands:
+            raise ValueError(f"bands must divide {SIMHASH_BITS}")
+        self.max_distance = max_distance
+        self.bands = bands
+        self._band_bits = SIMHASH_BITS // bands
+        self._mask = (1 << self._band_bits) - 1
+        self._buckets: List[Dict[int, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._hashes: Dict[str, int] = {}
+        self._seq: Dict[str, int] = {}      # insertion order, for tie-breaks
+
+    def _slices(self, h: int):
+        for b in range(self.bands):
+            yield b, (h >> (b * self._band_bits)) & self._mask
+
+    def find(self, h: int) -> Optional[str]:
+        """Closest stored key within max_distance (earliest added on ties)."""
+        return next(iter(self.candidates(h)), None)
+
+    def candidates(self, h: int, max_distance: Optional[int] = None) -> List[str]:
+        """Stored keys within `max_distance` (default: the index's), closest then earliest first."""
+        limit = self.max_distance if max_distance is None else max_distance
+        found = []
+        checked = set()
+        for b, piece in self._slices(h):
+            for key in self._buckets[b].get(piece, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                distance = hamming(h, self._hashes[key])
+                if distance <= limit:
+                    found.append((distance, self._seq[key], key))
+        return [key for _, _, key in sorted(found)]
+
+    def distance(self, key: str, h: int) -> int:
+        return hamming(h, self._hashes[key])
+
+    def add(self, key: str, h: int) -> None:
+        self._hashes[key] = h
+        self._seq.setdefault(key, len(self._seq))
+        for b, piece in self._slices(h):
+            self._buckets[b][piece].append(key)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class NearDuplicateCollapser:
+    """
+    Incremental collapse_near_duplicates().
+
+    Usage:
+        collapser = NearDuplicateCollapser()
+        group, is_new = collapser.add(signal)   # is_new: signal is the representative
+        collapser.groups                         # same as collapse_near_duplicates()
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, bands: int = DEFAULT_BANDS,
+                 min_overlap: float = MIN_TOKEN_OVERLAP):
+        self._index = NearDuplicateIndex(max_distance=max_distance, bands=bands)
+        self.min_overlap = min_overlap
+        self._groups: Dict[str, DuplicateGroup] = {}
+        self._tokens: Dict[str, FrozenSet[str]] = {}        # representative's words
+        self._order: List[str] = []
+
+    def _match(self, h: int, tokens: FrozenSet[str]) -> Optional[str]:
+        for key in self._index.candidates(h):
+            theirs = self._tokens[key]
+            if min(len(tokens), len(theirs)) < SHORT_POST_TOKENS and \
+                    self._index.distance(key, h) > SHORT_MAX_DISTANCE:
+                continue
+            union = len(tokens | theirs)
+            if union and len(tokens & theirs) / union < self.min_overlap:
+                continue
+            return key
+        return None
+
+    def add(self, signal: Signal) -> Tuple[DuplicateGroup, bool]:
+        norm = normalize(signal.text)
+        h = _simhash(norm)
+        tokens = frozenset(norm.split())
+        rep_key = self._match(h, tokens)
+        is_new = rep_key is None
+        if is_new:
+            rep_key = str(len(self._order))
+            self._index.add(rep_key, h)
+            self._tokens[rep_key] = tokens
+            self._groups[rep_key] = DuplicateGroup(representative=signal)
+            self._order.append(rep_key)
+        group = self._groups[rep_key]
+        group.members.append(signal)
+        return group, is_new
+
+    @property
+    def groups(self) -> List[DuplicateGroup]:
+        """Groups in order of their representative's first appearance."""
+        return [self._groups[k] for k in self._order]
+
+
+def collapse_near_duplicates(
+    signals: List[Signal],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    bands: int = DEFAULT_BANDS,
+    min_overlap: float = MIN_TOKEN_OVERLAP,
+) -> List[DuplicateGroup]:
+    """
+    Group near-identical signals. Groups come back in order of their
+    representative's first appearance; members keep input order.
+    """
+    collapser = NearDuplicateCollapser(max_distance=max_distance, bands=bands,
+                                       min_overlap=min_overlap)
+    for signal in signals:
+        collapser.add(signal)
+    return collapser.groups
+
+
+def swap_actor(text: str, old: str, new: str) -> str:
+    """
+    Replace the handle `old` with `new` where it stands on its own — not
+    inside a longer word ("ing" in "pricing" stays).
+    """
+    if not old or old == new:
+        return text
+    return re.sub(rf"(?<!\w){re.escape(old)}(?!\w)", lambda _: new, text)
+
+
+def for_member(cls: Classification, representative: Signal, member: Signal) -> Classification:
+    """
+    The representative's classification, re-targeted at `member`: its
+    signal_id, and the representative's handle in recommended_action
+    swapped for the member's.
+    """
+    return replace(cls, signal_id=member.id, recommended_action=swap_actor(
+        cls.recommended_action, representative.actor, member.actor))
+
+
+def fan_out(
+    groups: List[DuplicateGroup],
+    classifications: List[Classification],
+    signals: List[Signal],
+) -> List[Classification]:
+    """
+    Copy each representative's classification onto its members (for_member).
+    `classifications` align with `groups`; the result aligns with `signals`.
+    """
+    by_member: Dict[str, Classification] = {}
+    for group, cls in zip(groups, classifications):
+        for member in group.members:
+            by_member[member.id] = for_member(cls, group.representative, member)
+    return [by_member[s.id] for s in signals]
@@ -0,0 +1,286 @@
+"""
+Pain canonicalization — one key per pain, however the LLM phrases it.
+
+detect_momentum() groups on primary_pain. MockClassifier returns a fixed
+vocabulary, but LLMClassifier writes free text: "API timeouts on batch"
+one call, "batch API timing out" the next. Keyed on the raw string those
+never cluster, so live momentum almost never fires.
+
+Design:
+- normalize(): lowercase, word tokens only, stop words dropped, plurals
+  folded ("-ies" → "-y", "-es" after s/x/z/ch/sh, else "-s") — "API
+  timeouts on batches" → "api timeout batch"
+- Each token becomes character trigrams (padded with spaces, so word
+  edges count); a pain is the bag of its tokens' trigrams, independent
+  of word order
+- PainIndex.key(raw): raw string seen before → its key (dict, O(1));
+  otherwise its normalized spelling is linked to every known spelling
+  with trigram cosine ≥ `threshold` whose tokens all have a
+  counterpart on the other side (same token, same first three letters,
+  or one inside the other), found through an inverted index (trigram →
+  spellings). Cosine alone would fold pains that differ in one short
+  token: "export to PDF broken" and "export csv broken" share most of
+  their trigrams
+- Negations ("no", "not") are kept, so "export not working" never
+  joins "export working"
+- A pain is a connected group of linked spellings; its key is the
+  lexicographically smallest normalized spelling in it. Both are fixed
+  by the set of spellings seen, not their order, so the SQL path (rows
+  in DISTINCT order) and detect_momentum (classification order) agree.
+  The price: a key can change when a smaller spelling joins or a new
+  one links two groups. Stored aliases are rewritten then; stores that
+  keep raw spellings (momentum_window) re-resolve them on load
+- label(key) is the first raw spelling seen of the key's normalized form
+- Persisted next to the queue (tables pain_canonicals: normalized
+  spelling → label, pain_aliases: raw → key): a raw string resolves to
+  the same key in every run and process. Writes go through the queue
+  file's db.shared() writer, taken before the index lock
+
+Not ML — "timeouts" and "latency" stay apart. It folds rephrasings, not
+synonyms.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .db import shared
+
+DEFAULT_THRESHOLD = 0.7         # trigram cosine to link two spellings of a pain
+NGRAM = 3
+
+STOPWORDS = frozenset("""
+    a an the and or but of on in at to for from with by about into over
+    is are was were be been being it its this that these those my our your
+    their i we they he she you me us them very too so just
+""".split())
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+_SIBILANTS = ("s", "x", "z", "ch", "sh")       # "batches" → "batch", "boxes" → "box"
+_NOT_PLURAL = ("ss", "us", "is")               # "access", "status", "analysis"
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("es") and token[:-2].endswith(_SIBILANTS):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(_NOT_PLURAL):
+        return token[:-1]
+    return token
+
+
+def normalize(raw: str) -> str:
+    """Token-normalized form of a pain. Falls back to lower().strip() if no words remain."""
+    tokens = [_stem(t) for t in _WORD.findall(raw.lower())]
+    tokens = [t for t in tokens if t not in STOPWORDS]
+    return " ".join(tokens) if tokens else raw.lower().strip()
+
+
+def _covered(token: str, others: List[str]) -> bool:
+    for other in others:
+        if token == other:
+            return True
+        if len(token) >= 3 and len(other) >= 3 and (
+                token[:3] == other[:3] or token in other or other in token):
+            return True
+    return False
+
+
+def tokens_match(a: str, b: str) -> bool:
+    """Every token of each normalized pain has a counterpart in the other."""
+    ta, tb = a.split(), b.split()
+    return all(_covered(t, tb) for t in ta) and all(_covered(t, ta) for t in tb)
+
+
+def trigrams(normalized: str) -> Counter:
+    """Character n-grams of each token, padded so word starts and ends count."""
+    grams: Counter = Counter()
+    for token in normalized.split():
+        padded = f" {token} "
+        if len(padded) <= NGRAM:
+            grams[padded] += 1
+            continue
+        for i in range(len(padded) - NGRAM + 1):
+            grams[padded[i:i + NGRAM]] += 1
+    return grams
+
+
+def cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(w * b[g] for g, w in a.items() if g in b)
+    return dot / math.sqrt(sum(w * w for w in a.values()) * sum(w * w for w in b.values()))
+
+
+class PainIndex:
+    """
+    Usage:
+        pains = PainIndex(queue.db_path)        # or PainIndex() in memory
+        pains.key("API timeouts on batch")      # "api timeout batch"
+        pains.key("batch API timing out")       # "api timeout batch"
+        pains.label("api timeout batch")        # "API timeouts on batch"
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: float = DEFAULT_THRESHOLD):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.db_path = Path(db_path) if db_path else None
+        self.threshold = threshold
+        self._aliases: Dict[str, str] = {}              # raw → key
+        self._raws: Dict[str, Set[str]] = defaultdict(set)         # key → raws
+        self._members: Dict[str, str] = {}              # normalized spelling → key
+        self._groups: Dict[str, Set[str]] = {}          # key → normalized spellings
+        self._labels: Dict[str, str] = {}               # normalized → first raw spelling
+        self._vectors: Dict[str, Counter] = {}          # normalized → trigram counts
+        self._norms: Dict[str, float] = {}
+        self._postings: Dict[str, List[str]] = defaultdict(list)   # trigram → spellings
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.merged = 0                                 # new spellings joined to a key
+        self.rekeyed = 0                                # keys retired by a smaller spelling
+
+        self._db = shared(str(self.db_path)) if self.db_path is not None else None
+        if self._db is not None:
+            with self._db.write() as conn:
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS pain_canonicals (
+                        key TEXT PRIMARY KEY,
+                        label TEXT
+                    );
+                    CREATE TABLE IF NOT EXISTS pain_aliases (
+                        raw TEXT PRIMARY KEY,
+                        key TEXT
+                    );
+                """)
+                self._labels.update(conn.execute("SELECT key, label FROM pain_canonicals"))
+                aliases = conn.execute("SELECT raw, key FROM pain_aliases").fetchall()
+            # Saved mappings win: each stored key is a group of the spellings
+            # mapped to it, as stored
+            for raw, key in aliases:
+                self._aliases[raw] = key
+                self._raws[key].add(raw)
+                for norm in (key, normalize(raw)):
+                    if norm not in self._members:
+                        self._add_member(norm, key)
+
+    def _add_member(self, norm: str, key: str) -> None:
+        vec = trigrams(norm)
+        self._members[norm] = key
+        self._groups.setdefault(key, set()).add(norm)
+        self._vectors[norm] = vec
+        self._norms[norm] = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        for gram in vec:
+            self._postings[gram].append(norm)
+
+    def _linked(self, norm: str) -> Set[str]:
+        """Keys of the groups holding a spelling `norm` links to, scored through the postings."""
+        vec = trigrams(norm)
+        if not vec:
+            return set()
+        dots: Dict[str, float] = defaultdict(float)
+        for gram, w in vec.items():
+            for member in self._postings.get(gram, ()):
+                dots[member] += w * self._vectors[member][gram]
+        length = math.sqrt(sum(w * w for w in vec.values()))
+        return {self._members[m] for m, d in dots.items()
+                if d / (length * self._norms[m]) >= self.threshold and tokens_match(norm, m)}
+
+    def _join(self, norm: str, touched: Set[str]) -> str:
+        """Add a normalized spelling; merge the groups it links. Returns its key."""
+        found = self._members.get(norm)
+        if found is not None:
+            self.merged += 1
+            return found
+        linked = self._linked(norm)
+        if linked:
+            self.merged += 1
+        key = min(linked | {norm})
+        self._add_member(norm, key)
+        for old in linked:
+            if old == key or old not in self._groups:
+                continue
+            group = self._groups.pop(old) | self._groups.get(key, set())
+            self._groups[key] = group
+            for member in group:
+                self._members[member] = key
+            raws = self._raws.pop(old, set())
+            for raw in raws:
+                self._aliases[raw] = key
+            self._raws[key] |= raws
+            touched |= raws
+            self.rekeyed += 1
+        return key
+
+    # ── Lookup ──────────────────────────────────────────────────────────
+
+    def key(self, raw: str) -> str:
+        """Canonical key for one raw pain."""
+        found = self._aliases.get(raw)
+        if found is not None:
+            self.hits += 1
+            return found
+        return self.keys([raw])[raw]
+
+    def keys(self, raws: Iterable[str]) -> Dict[str, str]:
+        """Canonical keys for many raw pains; new and re-keyed mappings are saved in one write."""
+        raws = list(raws)
+        if self._db is None or all(raw in self._aliases for raw in raws):
+            write = nullcontext()
+        else:
+            # Writer first, then _lock: the queue holds its writer when it
+            # asks for keys (apply_momentum), so the reverse order deadlocks
+            write = self._db.write()
+        wanted: List[str] = []
+        touched: Set[str] = set()                       # raws whose stored key is new or changed
+        new_labels: List[tuple] = []
+        with write as conn, self._lock:
+            for raw in raws:
+                if raw in self._aliases:
+                    self.hits += 1
+                elif raw not in touched:
+                    self.misses += 1
+                    norm = normalize(raw)
+                    if norm not in self._labels:
+                        self._labels[norm] = raw.strip()
+                        new_labels.append((norm, raw.strip()))
+                    key = self._join(norm, touched)
+                    self._aliases[raw] = key
+                    self._raws[key].add(raw)
+                    touched.add(raw)
+                wanted.append(raw)
+            out = {raw: self._aliases[raw] for raw in wanted}
+            if conn is not None and touched:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO pain_canonicals (key, label) VALUES (?, ?)",
+                    new_labels)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pain_aliases (raw, key) VALUES (?, ?)",
+                    [(raw, self._aliases[raw]) for raw in touched])
+        return out
+
+    def label(self, key: str) -> str:
+        """Display form of a key: the first raw spelling seen of it."""
+        return self._labels.get(key, key)
+
+    def stats(self) -> Dict:
+        return {
+            "canonical": len(self._groups),
+            "aliases": len(self._aliases),
+            "hits": self.hits,
+            "misses": self.misses,
+            "merged": self.merged,
+            "rekeyed": self.rekeyed,
+            "threshold": self.threshold,
+        }
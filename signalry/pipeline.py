@@ -4,19 +4,38 @@ Signalry pipeline — the core loop.
 signal → interpretation → suggested action → outcome logging
 
 This is the atomic unit of the product.
+
+run() is staged (each step over the whole run before the next);
+run_stream() connects the same steps through bounded queues so items
+reach the review queue while the run is still going.
 """
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, List, Optional
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
 
 from .models import Signal, Classification, ReviewItem
+from .bloom import KnownIdIndex
 from .ingest import IngestorBase, get_ingestor
-from .filter import filter_signals
+from .dedup import DedupStore
+from .filter import FilterStats, filter_signals, filter_signals_iter, filter_signals_parallel
 from .classify import ClassifierBase, get_classifier
-from .momentum import detect_momentum, get_momentum_summary
+from .momentum import (
+    DEFAULT_WINDOW_HOURS, MomentumSketches, MomentumWindow, detect_momentum, get_momentum_summary,
+)
+from .burst import BurstDetector
+from .escalation import EscalationDetector
+from .pains import PainIndex
+from .neardup import (
+    DuplicateGroup, NearDuplicateCollapser, collapse_near_duplicates, fan_out, for_member,
+)
 from .queue import ReviewQueue
+from .streaming import DEFAULT_QUEUE_SIZE, run_stages
+
+DEFAULT_STREAM_BATCH = 16       # most posts per classify_batch call in run_stream()
+PRECHECK_CHUNK = 500            # posts per Bloom pre-check call in run_stream()
 
 
 class Pipeline:
@@ -35,10 +54,43 @@ class Pipeline:
         classifier: Optional[ClassifierBase] = None,
         queue: Optional[ReviewQueue] = None,
         live: bool = False,
+        dedup: Optional[DedupStore] = None,
+        precheck: bool = True,
+        precheck_path: Optional[str] = None,
+        collapse_near_dupes: bool = True,
+        workers: int = 1,
+        instrument: bool = False,
+        persistent_momentum: bool = False,
+        momentum_sketch: bool = False,
+        escalation: bool = False,
+        burst: bool = False,
     ):
+        if persistent_momentum and momentum_sketch:
+            raise ValueError("choose one of persistent_momentum and momentum_sketch")
         self.ingestor = ingestor or get_ingestor(live=live)
         self.classifier = classifier or get_classifier(live=live)
         self.queue = queue or ReviewQueue()
+        self.dedup = dedup              # None → dedup within each run only
+        # Bloom pre-check of already-queued source_ids: rebuilt in memory from the
+        # queue, or kept in `precheck_path` across runs (e.g. bloom.sidecar_path)
+        self.known_ids = KnownIdIndex(self.queue, path=precheck_path) if precheck else None
+        self.collapse_near_dupes = collapse_near_dupes
+        self.workers = workers          # >1 → filter gates run in a process pool
+        self.instrument = instrument    # per-rule filter counters in run output
+        # Canonical pain keys (LLM rephrasings of one pain cluster together), kept in the queue DB
+        self.pains = PainIndex(str(self.queue.db_path))
+        # Momentum window kept across runs (table next to the queue) instead of per batch
+        self.momentum_window = (MomentumWindow(str(self.queue.db_path), pains=self.pains)
+                                if persistent_momentum else None)
+        # Bounded-memory alternative: HyperLogLog / count-min sketches (same DB). Counts
+        # span runs like the window, but cannot list members, so nothing is re-flagged.
+        self.momentum_sketches = (MomentumSketches(str(self.queue.db_path))
+                                  if momentum_sketch else None)
+        # Urgency escalation (decayed fast vs slow urgency per pain), state in the same DB
+        self.escalation = (EscalationDetector(str(self.queue.db_path), pains=self.pains)
+                           if escalation else None)
+        # Burst detection: last hours vs weekly baseline, backfilled from the queue history
+        self.burst = BurstDetector.from_queue(self.queue, pains=self.pains) if burst else None
 
     def run(
         self,
@@ -47,52 +99,281 @@ class Pipeline:
     ) -> Dict:
         """
         Execute the full pipeline:
-        1. Ingest raw signals
+        1. Ingest raw signals (skipping source_ids already queued)
         2. Filter for explicit intent
-        3. Classify each signal
-        4. Detect momentum
-        5. Queue for human review
+        3. Classify each signal (one call per near-duplicate group)
+        4. Detect momentum (this batch, or the persistent window)
+        5. Queue for human review; re-flag earlier items whose cluster
+           crossed the threshold
 
         Returns summary dict with counts and items.
         """
-        # 1. Ingest
-        raw_signals = self.ingestor.fetch(keywords=keywords, since=since)
+        start = time.perf_counter()
+        self.classifier.reset_stats()
 
-        # 2. Filter
-        filtered = filter_signals(raw_signals)
+        # 1–2. Ingest, skip known posts, filter
+        raw_signals, known, filtered, filter_stats = self._ingest_and_filter(keywords, since)
 
-        # 3. Classify
-        classifications = self.classifier.classify_batch(filtered)
+        # 3. Classify — near-identical posts share one classification
+        if self.collapse_near_dupes:
+            groups = collapse_near_duplicates(filtered)
+            rep_cls = self.classifier.classify_batch([g.representative for g in groups])
+            classifications = fan_out(groups, rep_cls, filtered)
+        else:
+            groups = []
+            classifications = self.classifier.classify_batch(filtered)
 
         # 4. Momentum
-        classifications = detect_momentum(filtered, classifications)
+        classifications, reflag = self._momentum(
+            filtered, classifications,
+            new_ids=self._unqueued(filtered) if self.momentum_sketches is not None else None)
+
+        # 5. Queue for review, one transaction
+        queued = self.queue.add_many(zip(filtered, classifications))
+        added = sum(queued)
+        dupes = len(queued) - added
+        first_item = time.perf_counter() - start if added else None
+        reflagged = self.queue.set_momentum_flags(reflag) if reflag else 0
+
+        if self.known_ids is not None:
+            self.known_ids.add(s.source_id for s in filtered)
+            self.known_ids.save()
+
+        return self._result(
+            len(raw_signals), known, filtered, classifications, groups, added, dupes,
+            filter_stats, reflagged=reflagged, timing={"mode": "staged", "time_to_first_item_s": first_item,
+                                  "end_to_end_s": time.perf_counter() - start},
+        )
+
+    def run_stream(
+        self,
+        keywords: List[str],
+        since: Optional[datetime] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> Dict:
+        """
+        Streaming run(): ingest → filter → classify → persist on their own
+        threads, joined by bounded queues (streaming.run_stages). Each item
+        is in the review queue as soon as it is classified.
+
+        Same output as run(), except:
+        - the classifier gets micro-batches of whatever has been filtered
+          so far (at most `batch_size`), not the whole run at once
+        - momentum needs the whole run, so it is computed when the stream
+          ends and applied with one bulk flag update
+          (ReviewQueue.set_momentum_flags); items are queued unflagged
+        - the filter runs in one thread (`workers` only applies to run())
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        start = time.perf_counter()
+        self.classifier.reset_stats()
+        filter_stats = FilterStats() if self.instrument else None
+        collapser = NearDuplicateCollapser() if self.collapse_near_dupes else None
+        ingested: List[int] = []
+        known: List[Signal] = []
+
+        # 1. Ingest — known posts are dropped here, a chunk at a time
+        def source():
+            raw_signals = self.ingestor.fetch(keywords=keywords, since=since)
+            ingested.append(len(raw_signals))
+            for i in range(0, len(raw_signals), PRECHECK_CHUNK):
+                chunk = raw_signals[i:i + PRECHECK_CHUNK]
+                if self.known_ids is not None:
+                    chunk, skipped = self.known_ids.partition(chunk)
+                    known.extend(skipped)
+                yield from chunk
+
+        # 2. Filter
+        def filter_stage(inbox):
+            return filter_signals_iter(inbox, dedup=self.dedup, stats=filter_stats)
+
+        # 3. Classify — one call per new near-duplicate group in each micro-batch
+        def classify_stage(inbox):
+            done: Dict[str, Classification] = {}           # representative id → result
+            for batch in inbox.batches(batch_size):
+                if collapser is None:
+                    yield from zip(batch, self.classifier.classify_batch(batch))
+                    continue
+                placed = []
+                fresh: List[Signal] = []
+                for signal in batch:
+                    group, is_new = collapser.add(signal)
+                    if is_new:
+                        fresh.append(signal)
+                    placed.append((signal, group.representative))
+                if fresh:
+                    for rep, cls in zip(fresh, self.classifier.classify_batch(fresh)):
+                        done[rep.id] = cls
+                for signal, rep in placed:
+                    yield signal, for_member(done[rep.id], rep, signal)
+
+        # 4. Persist as results arrive
+        filtered: List[Signal] = []
+        classifications: List[Classification] = []
+        counts = {"added": 0, "dupes": 0}
+        first_item: List[float] = []
+        added_ids = set()
 
-        # 5. Queue for review
-        added = 0
-        dupes = 0
-        for signal, cls in zip(filtered, classifications):
+        def persist(pair):
+            signal, cls = pair
+            filtered.append(signal)
+            classifications.append(cls)
             if self.queue.add(signal, cls):
-                added += 1
+                counts["added"] += 1
+                added_ids.add(signal.id)
+                if not first_item:
+                    first_item.append(time.perf_counter() - start)
             else:
-                dupes += 1
+                counts["dupes"] += 1
+
+        run_stages(source(), [("filter", filter_stage), ("classify", classify_stage)],
+                   persist, maxsize=queue_size)
+
+        # 5. Momentum over the whole run, one bulk update
+        classifications, reflag = self._momentum(filtered, classifications, new_ids=added_ids)
+        self.queue.set_momentum_flags(
+            [c.signal_id for c in classifications if c.momentum_flag and c.signal_id in added_ids]
+            + reflag)
+
+        if self.known_ids is not None:
+            self.known_ids.add(s.source_id for s in filtered)
+            self.known_ids.save()
 
-        # Build result
-        momentum_summary = get_momentum_summary(classifications, filtered)
+        return self._result(
+            ingested[0] if ingested else 0, known, filtered, classifications,
+            collapser.groups if collapser is not None else [],
+            counts["added"], counts["dupes"], filter_stats, reflagged=len(reflag),
+            timing={"mode": "stream", "time_to_first_item_s": first_item[0] if first_item else None,
+                    "end_to_end_s": time.perf_counter() - start},
+        )
+
+    def _unqueued(self, signals: List[Signal]) -> Set[str]:
+        """Ids of the signals add_many will insert: source_id not queued, first in the batch."""
+        queued = self.queue.existing_source_ids([s.source_id for s in signals])
+        first: Dict[str, str] = {}
+        for s in signals:
+            if s.source_id not in queued:
+                first.setdefault(s.source_id, s.id)
+        return set(first.values())
+
+    def _momentum(self, signals: List[Signal], classifications: List[Classification],
+                  new_ids: Optional[Set[str]] = None):
+        """
+        Flag momentum → (classifications, ids queued earlier to re-flag).
+        `new_ids`: the signals new to the queue; only those are added to
+        the sketches, so re-ingested posts don't count twice.
+        """
+        if self.escalation is not None:
+            self.escalation.update(signals, classifications)
+            self.escalation.save()
+        if self.burst is not None:
+            self.burst.update(signals, classifications)
+        if self.momentum_sketches is not None:
+            detect_momentum(signals, classifications, pains=self.pains,
+                            sketches=self.momentum_sketches, counted=new_ids)
+            self.momentum_sketches.prune(
+                datetime.utcnow() - timedelta(hours=DEFAULT_WINDOW_HOURS + 1))
+            self.momentum_sketches.save()
+            return classifications, []
+        if self.momentum_window is None:
+            return detect_momentum(signals, classifications, pains=self.pains), []
+        reflag = self.momentum_window.update(signals, classifications)
+        return classifications, reflag
+
+    def _result(self, ingested: int, known: List[Signal], filtered: List[Signal],
+                classifications: List[Classification], groups: List[DuplicateGroup],
+                added: int, dupes: int, filter_stats: Optional[FilterStats],
+                timing: Dict, reflagged: int = 0) -> Dict:
+        collapsed = [g for g in groups if g.member_count > 1]
+        momentum_summary = get_momentum_summary(classifications, filtered, pains=self.pains)
         queue_stats = self.queue.stats()
+        classifier_stats = self.classifier.stats()
+        tokens = classifier_stats.get("tokens", {})
 
-        return {
+        result = {
             "run_at": datetime.utcnow().isoformat(),
             "counts": {
-                "ingested": len(raw_signals),
+                "ingested": ingested,
+                "known_skipped": len(known),
                 "filtered": len(filtered),
                 "classified": len(classifications),
+                "near_duplicates": sum(g.member_count - 1 for g in collapsed),
                 "queued": added,
                 "duplicates_skipped": dupes,
+                # Items from earlier runs flagged now that their cluster crossed the threshold
+                "reflagged": reflagged,
+                # LLM token usage this run (all zero for the mock classifier)
+                "input_tokens": tokens.get("input", 0),
+                "cache_read_tokens": tokens.get("cache_read", 0),
+                "cache_creation_tokens": tokens.get("cache_creation", 0),
+                "output_tokens": tokens.get("output", 0),
             },
             "momentum": momentum_summary,
+            "near_duplicate_groups": [g.to_dict() for g in collapsed],
             "queue_stats": queue_stats,
-            "items": [
-                ReviewItem(signal=s, classification=c).to_dict()
-                for s, c in zip(filtered, classifications)
-            ],
+            "items": self._items(filtered, classifications, groups),
+            # Seconds from run start: first item reviewable / run complete
+            "timing": {k: round(v, 4) if isinstance(v, float) else v for k, v in timing.items()},
+        }
+        if self.known_ids is not None:
+            result["precheck"] = self.known_ids.stats()
+        if filter_stats is not None:
+            result["filter_stats"] = filter_stats.to_dict()
+        if classifier_stats:
+            result["classifier"] = classifier_stats
+        if self.escalation is not None:
+            result["escalation"] = self.escalation.escalating()
+        if self.burst is not None:
+            result["emerging"] = self.burst.emerging()
+        return result
+
+    def _ingest_and_filter(self, keywords: List[str], since: Optional[datetime]):
+        # 1. Ingest
+        raw_signals = self.ingestor.fetch(keywords=keywords, since=since)
+
+        # 1b. Known posts never reach the filter or the classifier
+        new_signals, known = raw_signals, []
+        if self.known_ids is not None:
+            new_signals, known = self.known_ids.partition(raw_signals)
+
+        # 2. Filter
+        filter_stats = FilterStats() if self.instrument else None
+        if self.workers > 1:
+            filtered = filter_signals_parallel(new_signals, workers=self.workers,
+                                               dedup=self.dedup, stats=filter_stats)
+        else:
+            filtered = filter_signals(new_signals, dedup=self.dedup, stats=filter_stats)
+        return raw_signals, known, filtered, filter_stats
+
+    def submit_batch(self, runner, keywords: List[str], since: Optional[datetime] = None) -> Dict:
+        """
+        Backfill mode: ingest and filter as run() does, then hand the
+        signals to a BatchJobRunner instead of classifying inline.
+        Results reach the queue when the job is polled (runner.resume()).
+        """
+        raw_signals, known, filtered, _ = self._ingest_and_filter(keywords, since)
+        job_ids = runner.submit(filtered, collapse_near_dupes=self.collapse_near_dupes)
+        return {
+            "run_at": datetime.utcnow().isoformat(),
+            "counts": {
+                "ingested": len(raw_signals),
+                "known_skipped": len(known),
+                "filtered": len(filtered),
+            },
+            "jobs": job_ids,
         }
+
+    def _items(self, signals: List[Signal], classifications: List[Classification],
+               groups: List[DuplicateGroup]) -> List[Dict]:
+        """Review items, tagged with the classifier tier when one is tracked."""
+        rep_of = {m.id: g.representative.id for g in groups for m in g.members}
+        items = []
+        for s, c in zip(signals, classifications):
+            item = ReviewItem(signal=s, classification=c).to_dict()
+            tier = self.classifier.tier_of(rep_of.get(s.id, s.id))
+            if tier is not None:
+                item["tier"] = tier
+            items.append(item)
+        return items
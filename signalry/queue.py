@@ -6,22 +6,36 @@ PRD: "Queue of classified signals / Approve / discard actions / Manual override"
 Design:
 - SQLite for persistence (no external DB needed)
 - Simple CRUD: add, list, approve, discard
+- add_many for pipeline runs: one transaction, executemany per table
+- Connections from db.ConnectionManager: one long-lived writer (WAL,
+  tuned PRAGMAs) and pooled readers, so list/stats calls from API
+  threads run alongside writes and nothing reconnects per call. The
+  manager is db.shared(), so the stores kept in the same file go
+  through the same writer
 - Dedup by source_id (no duplicate interventions per actor)
 - Outcome logging built in
+- on_add(callback): called with (signal, classification) after each
+  add() commits — how in-memory indexes (crosssource) stay current
+- Momentum over the full history in SQL (momentum_clusters /
+  apply_momentum): GROUP BY / HAVING aggregates on the timestamp and
+  covering indexes; only the verdicts come back to Python
 """
 
 from __future__ import annotations
 
 import json
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+from .db import DEFAULT_PROFILE, DEFAULT_READERS, shared
 from .models import (
     Classification, IntentStage, Outcome, ResponseType, ReviewItem,
     Signal, Urgency,
 )
+from .momentum import ACTOR_REPEAT_THRESHOLD, DEFAULT_WINDOW_HOURS, MIN_CLUSTER_SIZE, _pain_keys
+from .pains import PainIndex
 
 DEFAULT_DB_PATH = "data/signalry.db"
 
@@ -29,18 +43,42 @@ DEFAULT_DB_PATH = "data/signalry.db"
 class ReviewQueue:
     """SQLite-backed review queue with outcome logging."""
 
-    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        pragmas: Union[str, Dict[str, object]] = DEFAULT_PROFILE,
+        readers: int = DEFAULT_READERS,
+    ):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One writer + pooled readers, WAL by default (see db.py)
+        self._db = shared(str(self.db_path), pragmas=pragmas, readers=readers)
+        self._on_add: List[Callable[[Signal, Classification], object]] = []
         self._init_db()
 
-    def _conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _conn(self):
+        """
+        The writer connection as a context (commits on exit). For code
+        outside this class that writes its own SQL against the queue DB;
+        read-only scans use read().
+        """
+        return self._db.write()
+
+    def read(self):
+        """
+        A pooled read connection as a context. For read-only SQL from
+        outside this class (history scans at startup): it does not take
+        the write lock, so add() keeps going meanwhile. Writes through it
+        are rolled back.
+        """
+        return self._db.read()
+
+    def close(self) -> None:
+        """Close the queue's connections."""
+        self._db.close()
 
     def _init_db(self):
-        with self._conn() as conn:
+        with self._db.write() as conn:
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS signals (
                     id TEXT PRIMARY KEY,
@@ -84,11 +122,17 @@ class ReviewQueue:
                     ON signals(actor);
                 CREATE INDEX IF NOT EXISTS idx_classifications_pain
                     ON classifications(primary_pain);
+                CREATE INDEX IF NOT EXISTS idx_signals_timestamp
+                    ON signals(timestamp, actor, id);
+                CREATE INDEX IF NOT EXISTS idx_signals_id_actor
+                    ON signals(id, actor);
+                CREATE INDEX IF NOT EXISTS idx_classifications_signal_pain
+                    ON classifications(signal_id, primary_pain);
             """)
 
     def clear(self) -> int:
         """Delete all signals, classifications, and queue entries. Returns count removed."""
-        with self._conn() as conn:
+        with self._db.write() as conn:
             count = conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
             conn.executescript("""
                 DELETE FROM review_queue;
@@ -100,43 +144,245 @@ class ReviewQueue:
 
     # ── Add signals + classifications ───────────────────────────────────
 
+    def on_add(self, callback: Callable[[Signal, Classification], object]) -> None:
+        """Call `callback(signal, classification)` after every add() that commits."""
+        self._on_add.append(callback)
+
+    _INSERT_SIGNAL = """INSERT OR IGNORE INTO signals
+        (id, source, actor, text, timestamp, source_id, reply_to, metrics)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+    _INSERT_CLASSIFICATION = """INSERT OR IGNORE INTO classifications
+        (signal_id, intent_stage, primary_pain, urgency,
+         confidence, momentum_flag, recommended_action)
+        VALUES (?, ?, ?, ?, ?, ?, ?)"""
+    _INSERT_REVIEW = "INSERT OR IGNORE INTO review_queue (signal_id, status) VALUES (?, 'pending')"
+
+    @staticmethod
+    def _signal_row(signal: Signal) -> tuple:
+        return (signal.id, signal.source, signal.actor, signal.text,
+                signal.timestamp.isoformat(), signal.source_id,
+                signal.reply_to, json.dumps(signal.metrics))
+
+    @staticmethod
+    def _classification_row(classification: Classification) -> tuple:
+        return (classification.signal_id, classification.intent_stage.value,
+                classification.primary_pain, classification.urgency.value,
+                classification.confidence, int(classification.momentum_flag),
+                classification.recommended_action)
+
     def add(self, signal: Signal, classification: Classification) -> bool:
         """
         Add a signal and its classification to the review queue.
         Returns False if duplicate (same source_id already exists).
         PRD: "No duplicate interventions per actor" — enforced via UNIQUE on source_id.
         """
-        try:
-            with self._conn() as conn:
-                conn.execute(
-                    """INSERT OR IGNORE INTO signals
-                       (id, source, actor, text, timestamp, source_id, reply_to, metrics)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (signal.id, signal.source, signal.actor, signal.text,
-                     signal.timestamp.isoformat(), signal.source_id,
-                     signal.reply_to, json.dumps(signal.metrics)),
-                )
-                conn.execute(
-                    """INSERT OR IGNORE INTO classifications
-                       (signal_id, intent_stage, primary_pain, urgency,
-                        confidence, momentum_flag, recommended_action)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (classification.signal_id, classification.intent_stage.value,
-                     classification.primary_pain, classification.urgency.value,
-                     classification.confidence, int(classification.momentum_flag),
-                     classification.recommended_action),
-                )
-                conn.execute(
-                    """INSERT OR IGNORE INTO review_queue (signal_id, status)
-                       VALUES (?, 'pending')""",
-                    (signal.id,),
-                )
-            return True
-        except sqlite3.IntegrityError:
-            return False
+        with self._db.write() as conn:
+            cur = conn.execute(self._INSERT_SIGNAL, self._signal_row(signal))
+            if cur.rowcount == 0:                   # ignored: source_id (or id) already stored
+                return False
+            conn.execute(self._INSERT_CLASSIFICATION, self._classification_row(classification))
+            conn.execute(self._INSERT_REVIEW, (signal.id,))
+        for callback in self._on_add:
+            callback(signal, classification)
+        return True
+
+    def add_many(self, pairs: Iterable[Tuple[Signal, Classification]]) -> List[bool]:
+        """
+        add() for many (signal, classification) pairs: one transaction,
+        one executemany per table. Returns added (True) / duplicate
+        (False) per pair, in order. Within the batch, the first pair
+        with a given source_id wins, as with repeated add() calls.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return []
+        ids = [signal.id for signal, _ in pairs]
+        with self._db.write() as conn:
+            before = self._stored_ids(conn, ids)
+            conn.executemany(self._INSERT_SIGNAL, [self._signal_row(s) for s, _ in pairs])
+            # Stored now but not before = inserted by this call; the rest were ignored
+            new = self._stored_ids(conn, ids) - before
+            added = [False] * len(pairs)
+            for k, signal_id in enumerate(ids):
+                if signal_id in new:
+                    added[k] = True
+                    new.discard(signal_id)          # a repeated Signal counts once
+            conn.executemany(self._INSERT_CLASSIFICATION,
+                             [self._classification_row(c)
+                              for (_, c), ok in zip(pairs, added) if ok])
+            conn.executemany(self._INSERT_REVIEW,
+                             [(s.id,) for (s, _), ok in zip(pairs, added) if ok])
+        for (signal, classification), ok in zip(pairs, added):
+            if ok:
+                for callback in self._on_add:
+                    callback(signal, classification)
+        return added
+
+    @staticmethod
+    def _stored_ids(conn: sqlite3.Connection, ids: List[str]) -> Set[str]:
+        found: Set[str] = set()
+        for i in range(0, len(ids), 500):           # stay under SQLITE_MAX_VARIABLE_NUMBER
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(row[0] for row in conn.execute(
+                f"SELECT id FROM signals WHERE id IN ({marks})", chunk))
+        return found
+
+    def set_momentum_flags(self, signal_ids: Iterable[str]) -> int:
+        """Flag momentum on already-queued classifications in one transaction."""
+        with self._db.write() as conn:
+            cur = conn.executemany(
+                "UPDATE classifications SET momentum_flag = 1 WHERE signal_id = ?",
+                [(sid,) for sid in signal_ids],
+            )
+            return cur.rowcount
+
+    # ── Momentum (SQL) ──────────────────────────────────────────────────
+
+    def _stage_momentum(
+        self,
+        conn: sqlite3.Connection,
+        window_hours: int,
+        min_cluster: int,
+        actor_threshold: int,
+        now: Optional[datetime],
+        pains: Optional[PainIndex],
+    ) -> None:
+        """
+        Fill this connection's temp tables with detect_momentum()'s verdicts:
+        pain_keys(raw, key), momentum_pains(key, actors),
+        momentum_pairs(actor, key, signals). Connections are pooled, so
+        the previous call's tables are dropped first.
+        """
+        # Pains are grouped as detect_momentum groups them — canonical key
+        # with `pains`, else lower().strip() — which SQL cannot compute
+        # (its lower() and trim() are ASCII/space only): the few distinct
+        # stored spellings are keyed in Python and joined back in.
+        raws = [r[0] for r in conn.execute(
+            "SELECT DISTINCT primary_pain FROM classifications WHERE primary_pain IS NOT NULL")]
+        keys = _pain_keys(pains, raws)
+        conn.executescript("""
+            DROP TABLE IF EXISTS temp.pain_keys;
+            DROP TABLE IF EXISTS temp.momentum_pains;
+            DROP TABLE IF EXISTS temp.momentum_pairs;
+            CREATE TEMP TABLE pain_keys (raw TEXT PRIMARY KEY, key TEXT);
+            CREATE TEMP TABLE momentum_pains (key TEXT PRIMARY KEY, actors INTEGER);
+            CREATE TEMP TABLE momentum_pairs (actor TEXT, key TEXT, signals INTEGER,
+                                              PRIMARY KEY (actor, key));
+        """)
+        conn.executemany("INSERT INTO pain_keys VALUES (?, ?)", keys.items())
+
+        # Topic clustering: distinct actors per pain within the window.
+        # Timestamps are stored as isoformat(), which sorts as it compares.
+        window_start = (now or datetime.utcnow()) - timedelta(hours=window_hours)
+        conn.execute(
+            """INSERT INTO momentum_pains
+               SELECT k.key, COUNT(DISTINCT s.actor)
+               FROM signals s
+               JOIN classifications c ON c.signal_id = s.id
+               JOIN pain_keys k ON k.raw = c.primary_pain
+               WHERE s.timestamp >= ?
+               GROUP BY k.key
+               HAVING COUNT(DISTINCT s.actor) >= ?""",
+            (window_start.isoformat(), min_cluster),
+        )
+        # Actor persistence: same actor, same pain — whole history, as in
+        # detect_momentum.
+        conn.execute(
+            """INSERT INTO momentum_pairs
+               SELECT s.actor, k.key, COUNT(*)
+               FROM classifications c
+               JOIN signals s ON s.id = c.signal_id
+               JOIN pain_keys k ON k.raw = c.primary_pain
+               GROUP BY k.key, s.actor
+               HAVING COUNT(*) >= ?""",
+            (actor_threshold,),
+        )
+
+    def momentum_clusters(
+        self,
+        window_hours: int = DEFAULT_WINDOW_HOURS,
+        min_cluster: int = MIN_CLUSTER_SIZE,
+        actor_threshold: int = ACTOR_REPEAT_THRESHOLD,
+        now: Optional[datetime] = None,
+        pains: Optional[PainIndex] = None,
+    ) -> Dict:
+        """
+        detect_momentum() over every stored signal, aggregated in SQLite.
+
+        Returns {"pains": {pain: distinct actors in window} for pains with
+        `min_cluster`+ actors, "persistent": {(actor, pain): signals} for
+        pairs seen `actor_threshold`+ times}. Pains are canonical keys from
+        `pains`, else lower().strip() of the stored spelling.
+        """
+        with self._db.read() as conn:
+            self._stage_momentum(conn, window_hours, min_cluster, actor_threshold, now, pains)
+            pains = dict(conn.execute("SELECT key, actors FROM momentum_pains").fetchall())
+            persistent = {(actor, key): n for actor, key, n in conn.execute(
+                "SELECT actor, key, signals FROM momentum_pairs")}
+        return {"pains": pains, "persistent": persistent}
+
+    def apply_momentum(
+        self,
+        window_hours: int = DEFAULT_WINDOW_HOURS,
+        min_cluster: int = MIN_CLUSTER_SIZE,
+        actor_threshold: int = ACTOR_REPEAT_THRESHOLD,
+        now: Optional[datetime] = None,
+        pains: Optional[PainIndex] = None,
+    ) -> int:
+        """
+        Set momentum_flag on every stored classification detect_momentum()
+        would flag over the full history, without leaving SQLite. Returns
+        the number newly flagged; like detect_momentum, flags are only set.
+        """
+        with self._db.write() as conn:
+            self._stage_momentum(conn, window_hours, min_cluster, actor_threshold, now, pains)
+            cur = conn.execute(
+                """UPDATE classifications SET momentum_flag = 1
+                   WHERE momentum_flag = 0 AND (
+                       primary_pain IN (
+                           SELECT k.raw FROM pain_keys k
+                           JOIN momentum_pains m ON m.key = k.key)
+                       OR signal_id IN (
+                           SELECT s.id FROM momentum_pairs p
+                           JOIN pain_keys k ON k.key = p.key
+                           JOIN classifications c ON c.primary_pain = k.raw
+                           JOIN signals s ON s.id = c.signal_id AND s.actor = p.actor))"""
+            )
+            return cur.rowcount
 
     # ── Query ───────────────────────────────────────────────────────────
 
+    def count_signals(self) -> int:
+        """Number of stored signals."""
+        with self._db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+
+    def iter_source_ids(self, batch_size: int = 5000) -> Iterator[str]:
+        """Stream every stored source_id (used to rebuild the Bloom pre-check)."""
+        with self._db.read() as conn:
+            cur = conn.execute("SELECT source_id FROM signals WHERE source_id IS NOT NULL")
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0]
+
+    def existing_source_ids(self, source_ids: List[str]) -> Set[str]:
+        """Which of `source_ids` are already stored. Uses the UNIQUE index."""
+        found: Set[str] = set()
+        unique = list(dict.fromkeys(source_ids))
+        with self._db.read() as conn:
+            for i in range(0, len(unique), 500):     # stay under SQLITE_MAX_VARIABLE_NUMBER
+                chunk = unique[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT source_id FROM signals WHERE source_id IN ({marks})", chunk,
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
     def list_pending(self, limit: int = 50) -> List[ReviewItem]:
         """List signals pending human review, ordered by urgency + confidence."""
         return self._list_by_status("pending", limit)
@@ -165,7 +411,7 @@ class ReviewQueue:
             ORDER BY c.momentum_flag DESC, {urgency_order}, c.confidence DESC
             LIMIT ?
         """
-        with self._conn() as conn:
+        with self._db.read() as conn:
             rows = conn.execute(query, (*params, limit)).fetchall()
 
         return [self._row_to_review_item(row) for row in rows]
@@ -206,7 +452,7 @@ class ReviewQueue:
         return self._update_status(signal_id, "discarded")
 
     def _update_status(self, signal_id: str, status: str) -> bool:
-        with self._conn() as conn:
+        with self._db.write() as conn:
             cur = conn.execute(
                 "UPDATE review_queue SET status = ?, reviewed_at = ? WHERE signal_id = ?",
                 (status, datetime.utcnow().isoformat(), signal_id),
@@ -220,7 +466,7 @@ class ReviewQueue:
         Log the outcome of an approved action.
         PRD: "100% of approved actions have recorded outcomes"
         """
-        with self._conn() as conn:
+        with self._db.write() as conn:
             conn.execute(
                 """INSERT OR REPLACE INTO outcomes
                    (signal_id, responded, response_type, notes, logged_at)
@@ -233,7 +479,7 @@ class ReviewQueue:
 
     def get_outcome(self, signal_id: str) -> Optional[Outcome]:
         """Retrieve outcome for a signal."""
-        with self._conn() as conn:
+        with self._db.read() as conn:
             row = conn.execute(
                 "SELECT * FROM outcomes WHERE signal_id = ?",
                 (signal_id,),
@@ -252,7 +498,7 @@ class ReviewQueue:
 
     def stats(self) -> Dict:
         """Quick stats for the review queue."""
-        with self._conn() as conn:
+        with self._db.read() as conn:
             total = conn.execute("SELECT COUNT(*) FROM review_queue").fetchone()[0]
             pending = conn.execute("SELECT COUNT(*) FROM review_queue WHERE status='pending'").fetchone()[0]
             approved = conn.execute("SELECT COUNT(*) FROM review_queue WHERE status='approved'").fetchone()[0]
@@ -0,0 +1,144 @@
+"""
+Streaming stages — one thread per stage, joined by bounded queues.
+
+Pipeline.run() is staged: nothing reaches the review queue until the
+slowest classification of the run has finished. Pipeline.run_stream()
+wires the same stages through run_stages() instead, so the first items
+are reviewable while later ones are still being classified.
+
+Design:
+- run_stages(source, stages, sink): `source` is iterated on its own
+  thread; each stage is a function Inbox → iterable of outputs on its
+  own thread; `sink` consumes the last stage on the calling thread
+- Queues are bounded (`maxsize`): a slow stage applies back-pressure
+  upstream instead of letting the run buffer everything in memory
+- Inbox.batches(n) yields what has arrived, up to n items, without
+  waiting to fill the batch — micro-batches for the classifier
+- The first exception in any stage stops every stage and is re-raised
+  from run_stages()
+
+Plain threads and queue.Queue — stages spend their time in SQLite and
+network calls, which release the GIL.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+
+DEFAULT_QUEUE_SIZE = 256
+_POLL = 0.1                     # seconds between stop checks while blocked
+
+_DONE = object()                # end-of-stream marker
+
+
+class _Stopped(Exception):
+    """Another stage failed — unwind quietly."""
+
+
+class Inbox:
+    """A stage's input: iterate it, or take it in micro-batches."""
+
+    def __init__(self, q: "queue.Queue", stop: threading.Event):
+        self._q = q
+        self._stop = stop
+        self._done = False
+
+    def _get(self, block: bool = True) -> Any:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return self._q.get(timeout=_POLL) if block else self._q.get_nowait()
+            except queue.Empty:
+                if not block:
+                    raise
+
+    def __iter__(self) -> "Inbox":
+        return self
+
+    def __next__(self) -> Any:
+        if self._done:
+            raise StopIteration
+        item = self._get()
+        if item is _DONE:
+            self._done = True
+            raise StopIteration
+        return item
+
+    def batches(self, max_size: int) -> Iterator[List[Any]]:
+        """Block for one item, then add whatever else is waiting (up to max_size)."""
+        for first in self:
+            batch = [first]
+            while len(batch) < max_size:
+                try:
+                    item = self._get(block=False)
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    self._done = True
+                    break
+                batch.append(item)
+            yield batch
+
+
+def run_stages(
+    source: Iterable[Any],
+    stages: Sequence[Tuple[str, Callable[[Inbox], Iterable[Any]]]],
+    sink: Callable[[Any], None],
+    maxsize: int = DEFAULT_QUEUE_SIZE,
+) -> None:
+    """
+    source → stages[0] → … → stages[-1] → sink. Blocks until the stream
+    is drained; re-raises the first error raised by any part.
+    """
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    queues = [queue.Queue(maxsize) for _ in range(len(stages) + 1)]
+
+    def put(q: "queue.Queue", item: Any) -> None:
+        while True:
+            if stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=_POLL)
+                return
+            except queue.Full:
+                continue
+
+    def feed() -> None:
+        for item in source:
+            put(queues[0], item)
+        put(queues[0], _DONE)
+
+    def stage(i: int, fn: Callable[[Inbox], Iterable[Any]]) -> None:
+        for out in fn(Inbox(queues[i], stop)):
+            put(queues[i + 1], out)
+        put(queues[i + 1], _DONE)
+
+    def drain() -> None:
+        for item in Inbox(queues[-1], stop):
+            sink(item)
+
+    def guarded(fn: Callable, *args) -> None:
+        try:
+            fn(*args)
+        except _Stopped:
+            pass
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+
+    threads = [threading.Thread(target=guarded, args=(feed,), name="signalry-stage-source",
+                                daemon=True)]
+    for i, (name, fn) in enumerate(stages):
+        threads.append(threading.Thread(target=guarded, args=(stage, i, fn),
+                                        name=f"signalry-stage-{name}", daemon=True))
+    for t in threads:
+        t.start()
+    guarded(drain)
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,336 @@
+"""
+Local stand-in for the Anthropic Messages API — offline tests and benchmarks.
+
+Answers POST /v1/messages with a MockClassifier result for the post in
+the prompt (or a JSON array, one object per "Post ID:" block, for packed
+prompts), in the same response shape as the real API, so
+LLMClassifier(base_url=server.base_url) runs end to end without a key
+or network.
+
+System blocks marked with cache_control are "cached" for five minutes:
+repeat requests report them as cache_read_input_tokens, the first as
+cache_creation_input_tokens. Unlike the real API there is no minimum
+cacheable length unless `cache_min_tokens` is set.
+
+Throttling can be injected for the adaptive limiter: with `capacity`
+set, requests beyond that many in flight get a 429 rate_limit_error
+(with a Retry-After header when `retry_after` is set); `fail_status`
+answers every message request with that status (529 overloaded, 500)
+to simulate an outage.
+
+Also serves the Message Batches endpoints (create, retrieve, results).
+A batch stays "in_progress" for `batch_delay` seconds, then every
+request in it is answered like POST /v1/messages.
+
+Usage:
+    with StubAnthropicServer(latency=0.05) as server:
+        clf = LLMClassifier(api_key="test", base_url=server.base_url)
+        clf.classify_batch(signals)
+
+    python -m signalry.stub_server --port 8765     # standalone
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from .classify import MockClassifier
+from .models import Signal
+
+_TEXT_LINE = re.compile(r"^Text: (.*)$", re.M)
+_AUTHOR_LINE = re.compile(r"^Author: (.*)$", re.M)
+_POST_ID_LINE = re.compile(r"^Post ID: (.*)$", re.M)
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(content) -> str:
+    """Flatten a message `content` (string or list of blocks) to text."""
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+class StubAnthropicServer:
+    """
+    Threaded HTTP server speaking enough of the Messages API for LLMClassifier.
+
+    `latency` adds a fixed delay per request. `requests`,
+    `max_in_flight`, `throttled` and `failed` record load for assertions.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 batch_delay: float = 0.0, cache_min_tokens: int = 0,
+                 capacity: Optional[int] = None, retry_after: Optional[float] = None,
+                 fail_status: Optional[int] = None):
+        self.latency = latency
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.fail_status = fail_status
+        self.batch_delay = batch_delay
+        self.cache_min_tokens = cache_min_tokens
+        self._prompt_cache: Dict[str, float] = {}     # cached prefix → expiry
+        self.batches: Dict[str, Dict] = {}
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttled = 0
+        self.failed = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._mock = MockClassifier()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ── Lifecycle ───────────────────────────────────────────────────────
+
+    def start(self) -> "StubAnthropicServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StubAnthropicServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ── Responses ───────────────────────────────────────────────────────
+
+    def _classify_prompt(self, prompt: str) -> Dict:
+        text = _TEXT_LINE.search(prompt)
+        author = _AUTHOR_LINE.search(prompt)
+        signal = Signal(actor=author.group(1) if author else "", text=text.group(1) if text else prompt)
+        cls = self._mock.classify(signal).to_dict()
+        return {k: cls[k] for k in ("intent_stage", "primary_pain", "urgency",
+                                     "confidence", "recommended_action")}
+
+    def _classify_packed(self, prompt: str) -> List[Dict]:
+        ids = list(_POST_ID_LINE.finditer(prompt))
+        items = []
+        for i, match in enumerate(ids):
+            end = ids[i + 1].start() if i + 1 < len(ids) else len(prompt)
+            block = prompt[match.start():end]
+            items.append({"id": match.group(1), **self._classify_prompt(block)})
+        return items
+
+    def _cache_usage(self, body: Dict, system_text: str, system_tokens: int) -> Dict:
+        system = body.get("system")
+        marked = isinstance(system, list) and any(
+            isinstance(b, dict) and b.get("cache_control") for b in system)
+        if not marked or system_tokens < self.cache_min_tokens:
+            return {"input_tokens": system_tokens,
+                    "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+        key = f"{body.get('model')}\x00{system_text}"
+        now = time.time()
+        with self._lock:
+            hit = self._prompt_cache.get(key, 0) > now
+            self._prompt_cache[key] = now + 300         # 5-minute TTL, refreshed on use
+        return {"input_tokens": 0,
+                "cache_read_input_tokens": system_tokens if hit else 0,
+                "cache_creation_input_tokens": 0 if hit else system_tokens}
+
+    def message_response(self, body: Dict) -> Dict:
+        prompt = _prompt_text(body["messages"][-1]["content"])
+        if _POST_ID_LINE.search(prompt):
+            answer = json.dumps(self._classify_packed(prompt))
+        else:
+            answer = json.dumps(self._classify_prompt(prompt))
+        system = body.get("system", "")
+        system_text = system if isinstance(system, str) else _prompt_text(system)
+        usage = self._cache_usage(body, system_text, _approx_tokens(system_text))
+        usage["input_tokens"] += _approx_tokens(prompt)
+        usage["output_tokens"] = _approx_tokens(answer)
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [{"type": "text", "text": answer}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+    # ── Message Batches ─────────────────────────────────────────────────
+
+    @staticmethod
+    def _iso(ts: float) -> str:
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat().replace("+00:00", "Z")
+
+    def create_batch(self, body: Dict) -> Dict:
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.batches[batch_id] = {"requests": body["requests"], "created": time.time()}
+        return self.batch_status(batch_id)
+
+    def batch_status(self, batch_id: str) -> Optional[Dict]:
+        batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+        n = len(batch["requests"])
+        ends = batch["created"] + self.batch_delay
+        ended = time.time() >= ends
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {"processing": 0 if ended else n, "succeeded": n if ended else 0,
+                               "errored": 0, "canceled": 0, "expired": 0},
+            "created_at": self._iso(batch["created"]),
+            "expires_at": self._iso(batch["created"] + 24 * 3600),
+            "ended_at": self._iso(ends) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def batch_results(self, batch_id: str) -> bytes:
+        lines = []
+        for req in self.batches[batch_id]["requests"]:
+            message = self.message_response(req["params"])
+            lines.append(json.dumps({"custom_id": req["custom_id"],
+                                     "result": {"type": "succeeded", "message": message}}))
+        return ("\n".join(lines) + "\n").encode()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"       # keep-alive, like the real API
+            disable_nagle_algorithm = True      # headers + body go out without a 40ms stall
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args):      # keep test output quiet
+                pass
+
+            def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> Dict:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _error(self, status: int, error_type: str, headers: Optional[Dict] = None):
+                self._send(status, {"type": "error", "error": {"type": error_type,
+                                                               "message": "stub " + error_type}},
+                           headers)
+
+            def _not_found(self):
+                self._send(404, {"type": "error", "error": {"type": "not_found_error",
+                                                            "message": self.path}})
+
+            def do_GET(self):
+                parts = self.path.split("?")[0].strip("/").split("/")
+                if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+                    return self._not_found()
+                status = server.batch_status(parts[3])
+                if status is None:
+                    return self._not_found()
+                if len(parts) == 4:
+                    return self._send(200, status)
+                if parts[4] != "results" or status["processing_status"] != "ended":
+                    return self._not_found()
+                data = server.batch_results(parts[3])
+                self.send_response(200)
+                self.send_header("Content-Type", "application/binary")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = self._body()
+                if self.path.rstrip("/") == "/v1/messages/batches":
+                    return self._send(200, server.create_batch(body))
+                if self.path.rstrip("/") != "/v1/messages":
+                    return self._not_found()
+                with server._lock:
+                    server.requests += 1
+                    if server.fail_status is not None:
+                        server.failed += 1
+                        status = server.fail_status
+                    elif server.capacity is not None and server.in_flight >= server.capacity:
+                        server.throttled += 1
+                        status = 429
+                    else:
+                        status = 200
+                        server.in_flight += 1
+                        server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                if status != 200:
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["retry-after"] = str(server.retry_after)
+                    kind = {429: "rate_limit_error", 529: "overloaded_error"}.get(status, "api_error")
+                    return self._error(status, kind, headers)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    self._send(200, server.message_response(body))
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per request")
+    parser.add_argument("--batch-delay", type=float, default=0.0,
+                        help="Seconds a message batch stays in progress")
+    parser.add_argument("--cache-min-tokens", type=int, default=0,
+                        help="Smallest system prompt that gets cached (real API: 1024+)")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Requests in flight before answering 429")
+    parser.add_argument("--retry-after", type=float, default=None,
+                        help="Retry-After seconds sent with 429/529/5xx answers")
+    args = parser.parse_args()
+
+    server = StubAnthropicServer(host=args.host, port=args.port, latency=args.latency,
+                                 batch_delay=args.batch_delay,
+                                 cache_min_tokens=args.cache_min_tokens,
+                                 capacity=args.capacity, retry_after=args.retry_after)
+    print(f"Stub Messages API on {server.base_url} (Ctrl-C to stop)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Tests for the adaptive limiter, circuit breaker and LLM fail-over."""
+
+import asyncio
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+
+from signalry.adaptive import AdaptiveLimiter, CircuitBreaker, CircuitOpenError
+from signalry.classify import MockClassifier
+from signalry.models import Signal
+
+HAS_ANTHROPIC = importlib.util.find_spec("anthropic") is not None
+
+
+def _signals(n):
+    texts = ["Need a CSV export, the current one is broken", "Please add dark mode",
+             "Just cancelled, switching back to the old tool", "Love the new release"]
+    return [Signal(id=f"s{i}", actor=f"user{i}", text=f"{texts[i % 4]} #{i}") for i in range(n)]
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+
+    def test_additive_increase_on_stable_latency(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=4)
+
+        async def run():
+            for _ in range(20):
+                started = await limiter.acquire()
+                limiter.on_success(started, 0.05)
+                limiter.release()
+
+        asyncio.run(run())
+        self.assertEqual(limiter.limit, 4)                  # capped at max_limit
+        self.assertEqual([l for _, l in limiter.history], [2, 3, 4])
+
+    def test_no_increase_when_latency_climbs(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=8)
+        for _ in range(3):
+            limiter.on_success(0.0, 0.05)
+        self.assertEqual(limiter.limit, 3)
+        for _ in range(10):
+            limiter.on_success(0.0, 0.5)                    # 10× the baseline
+        self.assertEqual(limiter.limit, 3)
+
+    def test_halves_once_per_round_trip(self):
+        limiter = AdaptiveLimiter(initial=16)
+        started = time.monotonic()
+        for _ in range(5):                                  # a burst of 429s
+            limiter.on_throttle(started)
+        self.assertEqual(limiter.limit, 8)
+        limiter.on_timeout(time.monotonic())                # a later request times out
+        self.assertEqual(limiter.limit, 4)
+        stats = limiter.stats()
+        self.assertEqual((stats["throttles"], stats["timeouts"], stats["decreases"]), (5, 1, 2))
+
+    def test_never_below_min(self):
+        limiter = AdaptiveLimiter(initial=2, min_limit=1)
+        for _ in range(5):
+            limiter.on_throttle(time.monotonic())
+        self.assertEqual(limiter.limit, 1)
+
+    def test_caps_in_flight_and_honors_retry_after(self):
+        limiter = AdaptiveLimiter(initial=2, max_limit=2)
+        peak = 0
+
+        async def task():
+            nonlocal peak
+            started = await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            limiter.release()
+            return started
+
+        async def run():
+            await asyncio.gather(*(task() for _ in range(10)))
+            limiter.on_throttle(time.monotonic(), retry_after=0.2)
+            t0 = time.monotonic()
+            await task()
+            return time.monotonic() - t0
+
+        waited = asyncio.run(run())
+        self.assertEqual(peak, 2)
+        self.assertGreaterEqual(waited, 0.19)
+        self.assertEqual(limiter.in_flight, 0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_open_half_open_closed(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_after=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())                    # the probe
+        self.assertFalse(breaker.allow())                   # only one at a time
+        breaker.record_failure()                            # probe failed → open again
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.stats()["opens"], 2)
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "anthropic SDK not installed")
+class TestAdaptiveLLMClassifier(unittest.TestCase):
+
+    def _classifier(self, server, **kwargs):
+        from signalry.classify import LLMClassifier
+
+        clf = LLMClassifier(api_key="test", base_url=server.base_url, adaptive=True, **kwargs)
+        self.addCleanup(clf.close)
+        return clf
+
+    def test_backs_off_under_throttling(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        signals = _signals(120)
+        with StubAnthropicServer(latency=0.02, capacity=4, retry_after=0.01) as server:
+            clf = self._classifier(server, concurrency=12, max_concurrency=32)
+            results = clf.classify_batch(signals)
+
+        mock = MockClassifier()
+        self.assertEqual([r.to_dict() for r in results],
+                         [mock.classify(s).to_dict() for s in signals])
+        stats = clf.stats()
+        self.assertGreater(server.throttled, 0)
+        self.assertEqual(stats["adaptive"]["throttles"], server.throttled)
+        self.assertGreater(stats["adaptive"]["decreases"], 0)
+        self.assertLess(min(l for _, l in stats["adaptive"]["history"]), 12)
+        self.assertEqual(stats["fallbacks"], 0)
+        self.assertIsNone(clf.tier_of("s0"))
+
+    def test_outage_fails_over_to_mock_and_recovers(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        signals = _signals(30)
+        with StubAnthropicServer(fail_status=529, retry_after=0) as server:
+            clf = self._classifier(server, concurrency=2)
+            results = clf.classify_batch(signals)
+            self.assertEqual(clf.breaker.state, CircuitBreaker.OPEN)
+            self.assertEqual({clf.tier_of(s.id) for s in signals}, {"fallback"})
+            self.assertEqual(clf.stats()["fallbacks"], 30)
+            # Once open, calls stop reaching the API
+            self.assertLess(server.requests, 30 * (clf.THROTTLE_RETRIES + 1))
+
+            server.fail_status = None                       # the API is back
+            clf.breaker.reset_after = 0
+            clf.reset_stats()
+            again = clf.classify_batch(signals[:5])
+            self.assertEqual(clf.breaker.state, CircuitBreaker.CLOSED)
+            self.assertEqual({clf.tier_of(s.id) for s in signals[:5]}, {None})
+
+        mock = MockClassifier()
+        self.assertEqual([r.to_dict() for r in results],
+                         [mock.classify(s).to_dict() for s in signals])
+        self.assertEqual(len(again), 5)
+
+    def test_only_failed_items_fall_back(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        class GarblingStub(StubAnthropicServer):
+            def _classify_prompt(self, prompt):
+                cls = super()._classify_prompt(prompt)
+                if "#3" in prompt:
+                    cls["urgency"] = "whenever"         # unparseable for this post only
+                return cls
+
+        signals = _signals(8)
+        for pack_size in (1, 4):
+            with self.subTest(pack_size=pack_size), GarblingStub() as server:
+                clf = self._classifier(server, pack_size=pack_size)
+                results = clf.classify_batch(signals)
+                self.assertEqual([r.signal_id for r in results], [s.id for s in signals])
+                self.assertEqual([s.id for s in signals if clf.tier_of(s.id)], ["s3"])
+                self.assertEqual(clf.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_without_fallback_the_failure_is_raised(self):
+        from signalry.classify import LLMClassifier
+        from signalry.stub_server import StubAnthropicServer
+
+        class GarblingStub(StubAnthropicServer):
+            def _classify_prompt(self, prompt):
+                return {**super()._classify_prompt(prompt), "urgency": "whenever"}
+
+        with GarblingStub() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url) as clf:
+            with self.assertRaises(ValueError):
+                clf.classify_batch(_signals(3))
+
+    def test_fallback_results_are_not_cached(self):
+        from signalry.cache import CachedClassifier, ClassificationCache
+        from signalry.stub_server import StubAnthropicServer
+
+        cache = ClassificationCache(db_path=os.path.join(tempfile.mkdtemp(), "c.db"))
+        signals = _signals(3) + [Signal(id="dup", actor="x", text=_signals(1)[0].text)]
+        with StubAnthropicServer(fail_status=500) as server:
+            clf = CachedClassifier(self._classifier(server), cache)
+            clf.classify_batch(signals)
+        self.assertEqual({clf.tier_of(s.id) for s in signals}, {"fallback"})
+        self.assertEqual(cache.stats()["memory_entries"], 0)
+        self.assertIsNone(cache.get(clf._key(signals[0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,307 @@
+"""Tests for the concurrent (asyncio) classification path."""
+
+import asyncio
+import importlib.util
+import time
+import unittest
+
+from signalry.classify import LLMClassifier, MockClassifier
+from signalry.concurrency import LatencyRecorder, TokenBucket, gather_bounded
+from signalry.models import Signal
+
+HAS_ANTHROPIC = importlib.util.find_spec("anthropic") is not None
+
+
+class SlowClassifier(MockClassifier):
+    """Mock classifier with an async path that sleeps and tracks concurrency."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def aclassify(self, signal):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.classify(signal)
+        finally:
+            self.in_flight -= 1
+
+
+def _signals(n):
+    return [Signal(id=f"s{i}", actor=f"u{i}", text=f"I need tool number {i}") for i in range(n)]
+
+
+class TestGatherBounded(unittest.TestCase):
+
+    def test_order_and_concurrency_cap(self):
+        clf = SlowClassifier(delay=0.02)
+        signals = _signals(12)
+        results = asyncio.run(clf.classify_batch_async(signals, concurrency=3))
+        self.assertEqual([r.signal_id for r in results], [s.id for s in signals])
+        self.assertEqual(clf.max_in_flight, 3)
+
+    def test_timeout_raises(self):
+        clf = SlowClassifier(delay=1.0)
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(clf.classify_batch_async(_signals(2), timeout=0.05))
+
+    def test_return_exceptions_keeps_the_rest(self):
+        async def fn(i):
+            if i == 1:
+                raise ValueError("bad item")
+            await asyncio.sleep(1.0 if i == 2 else 0.01)
+            return i * 10
+
+        results = asyncio.run(gather_bounded(range(4), fn, timeout=0.2, return_exceptions=True))
+        self.assertEqual(results[0], 0)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[2], asyncio.TimeoutError)
+        self.assertEqual(results[3], 30)
+
+    def test_rate_limit(self):
+        async def run():
+            bucket = TokenBucket(rate=50, burst=1)
+
+            async def noop(_):
+                return None
+            start = time.monotonic()
+            await gather_bounded(range(6), noop, concurrency=6, limiter=bucket)
+            return time.monotonic() - start
+
+        # 1 immediate + 5 more at 50/s ≈ 0.1s
+        self.assertGreaterEqual(asyncio.run(run()), 0.08)
+
+    def test_latency_percentiles(self):
+        rec = LatencyRecorder()
+        for ms in range(1, 101):
+            rec.record(ms / 1000)
+        summary = rec.summary()
+        self.assertEqual(summary["requests"], 100)
+        self.assertEqual(summary["p50_ms"], 50.0)
+        self.assertEqual(summary["p99_ms"], 99.0)
+
+    def test_default_aclassify_uses_threads(self):
+        results = asyncio.run(MockClassifier().classify_batch_async(_signals(4)))
+        self.assertEqual(len(results), 4)
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "anthropic SDK not installed")
+class TestLLMClassifierAgainstStub(unittest.TestCase):
+
+    def test_concurrent_batch_against_fake_endpoint(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer(latency=0.1) as server:
+            clf = LLMClassifier(api_key="test", base_url=server.base_url, concurrency=5)
+            signals = _signals(10)
+            clf.classify_batch(signals[:1])     # warm up SDK imports
+            clf.reset_stats()
+            server.requests = 0
+            start = time.monotonic()
+            results = clf.classify_batch(signals)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual([r.signal_id for r in results], [s.id for s in signals])
+        self.assertEqual(server.requests, 10)
+        self.assertLessEqual(server.max_in_flight, 5)
+        self.assertLess(elapsed, 1.0)      # sequential would take ≥ 1s
+        self.assertEqual(clf.stats()["latency"]["requests"], 10)
+
+    def test_matches_mock_semantics(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        sig = Signal(actor="a", text="Feature request: please add real-time alerts")
+        with StubAnthropicServer() as server:
+            result = LLMClassifier(api_key="test", base_url=server.base_url).classify(sig)
+        self.assertEqual(result.intent_stage, MockClassifier().classify(sig).intent_stage)
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "anthropic SDK not installed")
+class TestClientPool(unittest.TestCase):
+
+    def test_sync_calls_reuse_one_connection(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url) as clf:
+            for sig in _signals(5):
+                clf.classify(sig)
+            self.assertEqual(server.requests, 5)
+            self.assertEqual(server.connections, 1)
+
+    def test_threads_share_the_sync_client(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer(latency=0.02) as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url,
+                              concurrency=4, max_connections=4) as clf:
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                results = list(ex.map(clf.classify, _signals(16)))
+            self.assertEqual(len(results), 16)
+            self.assertLessEqual(server.connections, 4)
+            self.assertEqual(clf.pool.clients_created, 1)
+
+    def test_batches_reuse_async_connections(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer(latency=0.02) as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url, concurrency=4) as clf:
+            clf.classify_batch(_signals(8))
+            first = server.connections
+            clf.classify_batch(_signals(8))
+            clf.classify_batch(_signals(8))
+            self.assertLessEqual(first, 4)
+            self.assertEqual(server.connections, first)
+            self.assertEqual(clf.pool.clients_created, 1)
+
+    def test_close_then_reuse(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer() as server:
+            clf = LLMClassifier(api_key="test", base_url=server.base_url)
+            clf.classify_batch(_signals(2))
+            clf.close()
+            self.assertEqual(len(clf.classify_batch(_signals(2))), 2)
+            clf.close()
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "anthropic SDK not installed")
+class TestPackedClassification(unittest.TestCase):
+
+    def test_packed_matches_single(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        signals = _signals(10)
+        with StubAnthropicServer() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url, pack_size=4) as clf:
+            packed = clf.classify_batch(signals)
+            self.assertEqual(server.requests, 3)        # 4 + 4 + 2
+            single = [clf.classify(s) for s in signals]
+        self.assertEqual([c.to_dict() for c in packed], [c.to_dict() for c in single])
+        self.assertEqual(clf.stats()["pack_retries"], 0)
+
+    def test_packed_requests_use_the_array_system_prompt(self):
+        signals = _signals(3)
+        with LLMClassifier(api_key="test", pack_size=3, prompt_cache=False) as clf, \
+                LLMClassifier(api_key="test") as single:
+            self.assertEqual(clf._request(signals[0])["system"], clf.SYSTEM_PROMPT)
+            packed = clf._packed_request(signals)["system"]
+            self.assertEqual(packed, clf.PACKED_SYSTEM_PROMPT)
+            self.assertIn("JSON array", packed)
+            self.assertNotIn("JSON array", clf.SYSTEM_PROMPT)
+            self.assertNotEqual(clf.version, single.version)    # packed results cached apart
+
+    def test_missing_and_malformed_items_retried_alone(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        class LossyStub(StubAnthropicServer):
+            def _classify_packed(self, prompt):
+                items = super()._classify_packed(prompt)
+                items[0]["urgency"] = "whenever"     # malformed
+                return items[2:] + [items[0]]        # items[1] missing
+
+        signals = _signals(4)
+        with LossyStub() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url, pack_size=4) as clf:
+            results = clf.classify_batch(signals)
+            self.assertEqual(server.requests, 3)        # 1 packed + 2 retries
+        self.assertEqual([r.signal_id for r in results], [s.id for s in signals])
+        self.assertEqual(clf.stats()["pack_retries"], 2)
+
+    def test_retries_run_concurrently_outside_the_pack_timeout(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        class DroppingStub(StubAnthropicServer):
+            def _classify_packed(self, prompt):
+                return []                            # every item missing
+
+        signals = _signals(4)
+        with DroppingStub(latency=0.2) as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url, pack_size=4,
+                              timeout=0.5) as clf:
+            start = time.perf_counter()
+            results = clf.classify_batch(signals)   # sequential retries: 1.0s in a 0.5s task
+            elapsed = time.perf_counter() - start
+            self.assertEqual(server.requests, 5)
+        self.assertEqual([r.signal_id for r in results], [s.id for s in signals])
+        self.assertLess(elapsed, 0.8)
+
+    def test_tokens_recorded(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url, pack_size=5) as clf:
+            clf.classify_batch(_signals(5))
+            tokens = clf.stats()["tokens"]
+        self.assertGreater(tokens["input"], 0)
+        self.assertGreater(tokens["output"], 0)
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "anthropic SDK not installed")
+class TestPromptCaching(unittest.TestCase):
+
+    def test_system_block_cached_after_first_call(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url) as clf:
+            self.assertEqual(clf._request(_signals(1)[0])["system"][0]["cache_control"],
+                             {"type": "ephemeral"})
+            for sig in _signals(4):
+                clf.classify(sig)
+            stats = clf.stats()
+        tokens = stats["tokens"]
+        self.assertGreater(tokens["cache_creation"], 0)
+        self.assertEqual(tokens["cache_read"], 3 * tokens["cache_creation"])
+        self.assertGreater(tokens["cache_hit_ratio"], 0.5)
+        self.assertEqual(stats["latency_cache_hit"]["requests"], 3)
+        self.assertEqual(stats["latency_cache_miss"]["requests"], 1)
+
+    def test_cached_block_clears_the_minimum(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        for prompt in (LLMClassifier.SYSTEM_PROMPT, LLMClassifier.PACKED_SYSTEM_PROMPT):
+            self.assertGreaterEqual(len(prompt) // 4, LLMClassifier.CACHE_MIN_TOKENS)
+        with StubAnthropicServer(cache_min_tokens=LLMClassifier.CACHE_MIN_TOKENS) as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url) as clf:
+            for sig in _signals(3):
+                clf.classify(sig)
+            tokens = clf.stats()["tokens"]
+        self.assertEqual(tokens["cache_read"], 2 * tokens["cache_creation"])
+        self.assertGreater(tokens["cache_creation"], 0)
+
+    def test_disabled(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        with StubAnthropicServer() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url, prompt_cache=False) as clf:
+            clf.classify_batch(_signals(3))
+            tokens = clf.stats()["tokens"]
+        self.assertEqual(tokens["cache_read"] + tokens["cache_creation"], 0)
+        self.assertGreater(tokens["input"], 0)
+
+    def test_pipeline_counts_tokens(self):
+        import os
+        import tempfile
+        from pathlib import Path
+        from signalry.ingest import MockIngestor
+        from signalry.pipeline import Pipeline
+        from signalry.queue import ReviewQueue
+        from signalry.stub_server import StubAnthropicServer
+
+        data_path = Path(__file__).parent.parent / "data" / "mock_posts.json"
+        db_path = os.path.join(tempfile.mkdtemp(), "pipe.db")
+        with StubAnthropicServer() as server, \
+                LLMClassifier(api_key="test", base_url=server.base_url) as clf:
+            counts = Pipeline(ingestor=MockIngestor(str(data_path)), classifier=clf,
+                              queue=ReviewQueue(db_path)).run(keywords=["need", "bug"])["counts"]
+        self.assertGreater(counts["cache_read_tokens"], 0)
+        self.assertGreater(counts["output_tokens"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Tests for batch-job classification against the local stub server."""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from signalry.batch_jobs import BatchJobStore
+from signalry.models import Signal
+from signalry.queue import ReviewQueue
+
+HAS_ANTHROPIC = importlib.util.find_spec("anthropic") is not None
+
+
+def _signals():
+    return [
+        Signal(id="a1", actor="alice", source_id="tw_1", text="Need a tool that exports CSV, bug in mine"),
+        Signal(id="a2", actor="bob", source_id="tw_2", text="Need a tool that exports CSV, bug in mine!"),
+        Signal(id="b1", actor="carol", source_id="tw_3", text="Please add dark mode, feature request"),
+    ]
+
+
+class TestBatchJobStore(unittest.TestCase):
+
+    def test_roundtrip_and_pending_ids(self):
+        store = BatchJobStore(os.path.join(tempfile.mkdtemp(), "q.db"))
+        sigs = _signals()
+        store.record_job("job1", [(s, s.id) for s in sigs], requests=3)
+        self.assertEqual(store.open_jobs(), ["job1"])
+        restored = [s for s, _ in store.items("job1")]
+        self.assertEqual([s.to_dict() for s in restored], [s.to_dict() for s in sigs])
+        self.assertEqual(store.pending_source_ids(["tw_1", "tw_9"]), {"tw_1"})
+        store.mark_items("job1", {"a1": "merged"})
+        self.assertEqual(store.pending_source_ids(["tw_1"]), set())
+
+
+@unittest.skipUnless(HAS_ANTHROPIC, "anthropic SDK not installed")
+class TestBatchJobRunner(unittest.TestCase):
+
+    def setUp(self):
+        from signalry.stub_server import StubAnthropicServer
+
+        self.server = StubAnthropicServer(batch_delay=60).start()
+        self.db_path = os.path.join(tempfile.mkdtemp(), "q.db")
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _runner(self):
+        from signalry.batch_jobs import BatchJobRunner
+        from signalry.classify import LLMClassifier
+
+        clf = LLMClassifier(api_key="test", base_url=self.server.base_url)
+        self.addCleanup(clf.close)
+        return BatchJobRunner(clf, ReviewQueue(self.db_path))
+
+    def test_submit_then_resume_in_new_process(self):
+        runner = self._runner()
+        (job_id,) = runner.submit(_signals())
+        self.assertEqual(len(self.server.batches[job_id]["requests"]), 2)   # a2 rides on a1
+        self.assertEqual(runner.submit(_signals()), [])                      # already pending
+
+        report = runner.poll(job_id)
+        self.assertEqual(report["status"], "in_progress")
+        self.assertEqual(runner.queue.count_signals(), 0)
+
+        self.server.batch_delay = 0             # the batch ends
+        reports = self._runner().resume()       # fresh runner = restarted process
+        self.assertEqual([(r["job_id"], r["status"], r["queued"]) for r in reports],
+                         [(job_id, "merged", 3)])
+        queue = ReviewQueue(self.db_path)
+        items = {i.signal.id: i.classification for i in queue.list_pending()}
+        self.assertEqual(set(items), {"a1", "a2", "b1"})
+        self.assertEqual(items["a1"].primary_pain, items["a2"].primary_pain)
+        self.assertIn("alice", items["a1"].recommended_action)
+        self.assertEqual(items["a2"].recommended_action,                    # a2's own actor
+                         items["a1"].recommended_action.replace("alice", "bob"))
+        self.assertEqual(self._runner().resume(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for the Bloom filter pre-check of already-queued source_ids."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from signalry.bloom import BloomFilter, KnownIdIndex, sidecar_path
+from signalry.models import Classification, Signal
+from signalry.queue import ReviewQueue
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives(self):
+        bf = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"tw_{i}" for i in range(1000)]
+        for k in keys:
+            bf.add(k)
+        self.assertTrue(all(k in bf for k in keys))
+
+    def test_false_positive_rate_near_target(self):
+        bf = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bf.add(f"in_{i}")
+        fp = sum(1 for i in range(20000) if f"out_{i}" in bf)
+        self.assertLess(fp / 20000, 0.03)
+        self.assertAlmostEqual(bf.estimated_fp_rate(), 0.01, delta=0.005)
+
+    def test_roundtrip(self):
+        bf = BloomFilter(capacity=100)
+        bf.add("a")
+        path = Path(tempfile.mkdtemp()) / "x.bloom"
+        bf.save(path)
+        loaded = BloomFilter.load(path)
+        self.assertIn("a", loaded)
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded.num_bits, bf.num_bits)
+
+    def test_count_ignores_keys_already_present(self):
+        bf = BloomFilter(capacity=100)
+        self.assertTrue(bf.add("a"))
+        self.assertFalse(bf.add("a"))
+        bf.add("b")
+        self.assertEqual(len(bf), 2)
+
+
+class TestKnownIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.queue = ReviewQueue(db_path=os.path.join(self.tmp, "test.db"))
+        sig = Signal(source_id="tw_known", actor="a", text="known post")
+        self.queue.add(sig, Classification(signal_id=sig.id))
+
+    def test_rebuilds_from_signals_table(self):
+        index = KnownIdIndex(self.queue, path=sidecar_path(self.queue))
+        self.assertTrue(index.path.exists())
+        self.assertEqual(index.path.suffix, ".bloom")
+        new, known = index.partition([
+            Signal(source_id="tw_known", text="again"),
+            Signal(source_id="tw_new", text="fresh"),
+        ])
+        self.assertEqual([s.source_id for s in known], ["tw_known"])
+        self.assertEqual([s.source_id for s in new], ["tw_new"])
+
+    def test_in_memory_by_default(self):
+        index = KnownIdIndex(self.queue)
+        index.add(["tw_other"])
+        index.save()
+        self.assertIsNone(index.path)
+        self.assertFalse(sidecar_path(self.queue).exists())
+        _, known = index.partition([Signal(source_id="tw_known", text="again")])
+        self.assertEqual(len(known), 1)
+
+    def test_stale_filter_is_confirmed_in_sql(self):
+        index = KnownIdIndex(self.queue)
+        index.add(["tw_ghost"])           # in the filter, not in the DB
+        new, known = index.partition([Signal(source_id="tw_ghost", text="x")])
+        self.assertEqual(len(new), 1)
+        self.assertEqual(index.stats()["false_positives"], 1)
+
+
+class TestPipelinePrecheck(unittest.TestCase):
+
+    def test_second_run_skips_known(self):
+        from signalry.ingest import MockIngestor
+        from signalry.pipeline import Pipeline
+
+        data_path = Path(__file__).parent.parent / "data" / "mock_posts.json"
+        db_path = os.path.join(tempfile.mkdtemp(), "pipe.db")
+        keywords = ["need", "broken", "scam", "looking", "token", "bug"]
+
+        first = Pipeline(ingestor=MockIngestor(str(data_path)),
+                         queue=ReviewQueue(db_path=db_path)).run(keywords=keywords)
+        second = Pipeline(ingestor=MockIngestor(str(data_path)),
+                          queue=ReviewQueue(db_path=db_path)).run(keywords=keywords)
+
+        self.assertGreater(first["counts"]["classified"], 0)
+        self.assertEqual(second["counts"]["known_skipped"], first["counts"]["filtered"])
+        self.assertEqual(second["counts"]["classified"], 0)
+        self.assertIn("memory_bytes", second["precheck"])
+        self.assertEqual(list(Path(db_path).parent.glob("*.bloom")), [])   # no sidecar unasked
+
+
+if __name__ == "__main__":
+    unittest.main()
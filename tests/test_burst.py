@@ -0,0 +1,124 @@
+"""Tests for ring-buffer burst detection (emerging pains)."""
+
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from signalry.burst import BurstDetector
+from signalry.models import Classification, Signal
+from signalry.momentum import detect_momentum
+from signalry.queue import ReviewQueue
+
+
+def _batch(pain, hours_ago, now):
+    signals, classifications = [], []
+    for i, h in enumerate(hours_ago):
+        sig = Signal(actor=f"user{i}_{h}", text=pain, source_id=f"{pain}-{i}",
+                     timestamp=now - timedelta(hours=h))
+        signals.append(sig)
+        classifications.append(Classification(signal_id=sig.id, primary_pain=pain))
+    return signals, classifications
+
+
+class TestBurstDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2025, 3, 10, 12, 0)
+
+    def test_spike_emerges_and_trickle_does_not(self):
+        detector = BurstDetector()
+        # One post an hour all week on "slow sync": steady, never a burst
+        for h in range(0, 160):
+            detector.add("slow sync", self.now - timedelta(hours=h))
+        # "export broken": quiet week, then eight posts in the last two hours
+        for h in (150, 100, 40):
+            detector.add("export broken", self.now - timedelta(hours=h))
+        for m in range(0, 120, 15):
+            detector.add("export broken", self.now - timedelta(minutes=m))
+
+        emerging = detector.emerging(now=self.now)
+        self.assertEqual([e["pain_key"] for e in emerging], ["export broken"])
+        top = emerging[0]
+        self.assertEqual(top["recent"], 8)
+        self.assertGreaterEqual(top["z"], detector.z_threshold)
+        self.assertGreaterEqual(top["level"], 3)
+        self.assertLess(detector.score("slow sync", now=self.now)["z"], 1.0)
+
+    def test_few_arrivals_are_not_emerging(self):
+        detector = BurstDetector()
+        detector.add("new pain", self.now)
+        detector.add("new pain", self.now)
+        self.assertFalse(detector.is_emerging("new pain", now=self.now))
+        detector.add("new pain", self.now)
+        self.assertTrue(detector.is_emerging("new pain", now=self.now))
+
+    def test_burst_fades_as_time_passes(self):
+        detector = BurstDetector()
+        for _ in range(10):
+            detector.add("export broken", self.now)
+        self.assertTrue(detector.is_emerging("export broken", now=self.now))
+        later = self.now + timedelta(hours=6)
+        self.assertFalse(detector.is_emerging("export broken", now=later))
+        # Past the ring's span the old counts are gone entirely
+        much_later = self.now + detector.span + timedelta(hours=1)
+        self.assertEqual(detector.score("export broken", now=much_later)["recent"], 0)
+
+    def test_ring_wraps_and_drops_stale_arrivals(self):
+        detector = BurstDetector(buckets=24, recent_buckets=2)
+        self.assertTrue(detector.add("p", self.now))
+        self.assertFalse(detector.add("p", self.now - timedelta(hours=30)))
+        detector.add("p", self.now + timedelta(hours=30))      # wraps past every slot
+        self.assertEqual(sum(detector._rings["p"].counts), 1)
+        self.assertEqual(detector.memory_bytes, 4 * 24)
+
+    def test_arrival_order_does_not_matter(self):
+        rng = random.Random(7)
+        arrivals = [(rng.choice(["a", "b", "c", "d"]),
+                     self.now - timedelta(minutes=rng.randrange(0, 60 * 24 * 9)))
+                    for _ in range(3000)]
+        arrivals += [("d", self.now - timedelta(minutes=m)) for m in range(0, 150, 5)]
+        batch, incremental = BurstDetector(), BurstDetector()
+        batch.add_many(arrivals)
+        for pain, ts in sorted(arrivals, key=lambda a: a[1]):
+            incremental.add(pain, ts)
+        for pain in "abcd":
+            self.assertEqual(batch._rings[pain].counts, incremental._rings[pain].counts)
+        for pain in "abcd":
+            self.assertEqual(batch.score(pain, now=self.now), incremental.score(pain, now=self.now))
+        self.assertEqual(batch.emerging(now=self.now), incremental.emerging(now=self.now))
+        self.assertEqual([e["pain_key"] for e in batch.emerging(now=self.now)], ["d"])
+
+    def test_update_flags_emerging_batch(self):
+        detector = BurstDetector()
+        signals, cls = _batch("export broken", [0, 0.5, 1, 1.5], self.now)
+        self.assertEqual(detector.update(signals, cls, now=self.now), {"export broken"})
+        self.assertTrue(all(c.momentum_flag for c in cls))
+
+    def test_detect_momentum_burst_rule(self):
+        now = datetime.utcnow()
+        # Three actors is below min_cluster, but from nothing to three in an hour is a burst
+        signals, cls = _batch("export broken", [0, 0.2, 0.4], now)
+        detect_momentum(signals, cls, min_cluster=10, burst=BurstDetector())
+        self.assertTrue(all(c.momentum_flag for c in cls))
+
+    def test_from_queue_backfill(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = ReviewQueue(os.path.join(tmp, "q.db"))
+            now = datetime.utcnow()
+            signals, cls = _batch("export broken", [0, 0.3, 0.6, 200], now)
+            for s, c in zip(signals, cls):
+                queue.add(s, c)
+            detector = BurstDetector.from_queue(queue, now=now)
+            self.assertEqual(detector.observed, 3)                # 200h ago is off the ring
+            self.assertEqual([e["pain"] for e in detector.emerging(now=now)], ["export broken"])
+
+            live = BurstDetector()
+            live.add_many((c.primary_pain, s.timestamp) for s, c in zip(signals, cls))
+            self.assertEqual(detector.score("export broken", now=now),
+                             live.score("export broken", now=now))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Tests for the content-addressed classification cache."""
+
+import os
+import tempfile
+import unittest
+
+from signalry.cache import CachedClassifier, ClassificationCache, cache_key
+from signalry.classify import MockClassifier
+from signalry.models import Signal
+
+
+class CountingClassifier(MockClassifier):
+    def __init__(self):
+        self.calls = 0
+
+    def classify(self, signal):
+        self.calls += 1
+        return super().classify(signal)
+
+
+def _db():
+    return os.path.join(tempfile.mkdtemp(), "cache.db")
+
+
+CHURN = "Leaving this tool, too many bugs and nobody answers support"
+
+
+class TestCachedClassifier(unittest.TestCase):
+
+    def test_repeat_text_classified_once(self):
+        inner = CountingClassifier()
+        with ClassificationCache(_db()) as cache:
+            clf = CachedClassifier(inner, cache)
+            a = clf.classify(Signal(id="a", actor="alice", text=CHURN))
+            b = clf.classify(Signal(id="b", actor="bob", text="  " + CHURN.replace(" ", "\n", 1)))
+            self.assertEqual(inner.calls, 1)
+            self.assertEqual(cache.stats()["memory_hits"], 1)
+        self.assertEqual((a.signal_id, b.signal_id), ("a", "b"))
+        self.assertIn("alice", a.recommended_action)
+        self.assertIn("bob", b.recommended_action)
+        self.assertNotIn("alice", b.recommended_action)
+        expected = MockClassifier().classify(Signal(id="b", actor="bob", text=CHURN))
+        self.assertEqual(b.to_dict(), expected.to_dict())
+
+    def test_short_actor_inside_words_is_kept(self):
+        text = "Leaving this tool, the pricing is way too expensive"
+        with ClassificationCache(_db()) as cache:
+            clf = CachedClassifier(MockClassifier(), cache)
+            a = clf.classify(Signal(id="a", actor="ing", text=text))
+            b = clf.classify(Signal(id="b", actor="bob", text=text))
+        self.assertEqual(a.recommended_action, "Engage ing — address pricing before they leave")
+        self.assertEqual(b.recommended_action, "Engage bob — address pricing before they leave")
+
+    def test_batch_dedups_within_and_across_batches(self):
+        inner = CountingClassifier()
+        signals = [Signal(id=f"s{i}", actor=f"u{i}", text=CHURN if i % 2 else f"I need tool {i}")
+                   for i in range(6)]
+        with ClassificationCache(_db()) as cache:
+            clf = CachedClassifier(inner, cache)
+            first = clf.classify_batch(signals)
+            self.assertEqual(inner.calls, 4)          # 3 distinct "need" posts + 1 churn
+            second = clf.classify_batch(signals)
+            self.assertEqual(inner.calls, 4)
+        self.assertEqual([c.signal_id for c in first], [s.id for s in signals])
+        self.assertEqual([c.to_dict() for c in first], [c.to_dict() for c in second])
+
+    def test_persists_across_instances(self):
+        path = _db()
+        sig = Signal(id="x", actor="a", text=CHURN)
+        with ClassificationCache(path) as cache:
+            CachedClassifier(CountingClassifier(), cache).classify(sig)
+        inner = CountingClassifier()
+        with ClassificationCache(path) as cache:
+            CachedClassifier(inner, cache).classify(sig)
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+        self.assertEqual(inner.calls, 0)
+
+    def test_ttl_expiry(self):
+        inner = CountingClassifier()
+        with ClassificationCache(_db(), ttl=0) as cache:
+            clf = CachedClassifier(inner, cache)
+            clf.classify(Signal(text=CHURN))
+            clf.classify(Signal(text=CHURN))
+            self.assertEqual(cache.stats()["hits"], 0)
+        self.assertEqual(inner.calls, 2)
+
+    def test_size_eviction(self):
+        with ClassificationCache(_db(), memory_size=2, max_rows=3) as cache:
+            for i in range(5):
+                cache.put(f"k{i}", {"n": i})
+            self.assertEqual(cache.stats()["memory_entries"], 2)
+            self.assertEqual(len(cache), 3)
+            self.assertIsNone(cache.get("k0"))
+            self.assertEqual(cache.get("k4"), {"n": 4})
+
+    def test_version_in_key(self):
+        self.assertNotEqual(cache_key("same text", "v1"), cache_key("same text", "v2"))
+        self.assertEqual(cache_key("same  text ", "v1"), cache_key("same text", "v1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for the heuristic → LLM classifier cascade."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from signalry.classify import CascadeClassifier, MockClassifier
+from signalry.models import IntentStage, Signal, Urgency
+
+
+class FakeLLM(MockClassifier):
+    """Stands in for LLMClassifier: marks its results and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def classify(self, signal):
+        self.calls += 1
+        cls = super().classify(signal)
+        cls.urgency = Urgency.LOW
+        cls.confidence = 0.99
+        return cls
+
+
+def _sig(sid, text):
+    return Signal(id=sid, actor="user", text=text)
+
+
+class TestCascade(unittest.TestCase):
+
+    def setUp(self):
+        self.llm = FakeLLM()
+        self.clf = CascadeClassifier(self.llm, threshold=0.6)
+
+    def test_explicit_churn_stays_on_heuristics(self):
+        result = self.clf.classify(_sig("c", "Just cancelled my subscription, done with this"))
+        self.assertEqual(result.intent_stage, IntentStage.CHURNING)
+        self.assertEqual(self.clf.tier_of("c"), "heuristic")
+        self.assertEqual(self.llm.calls, 0)
+
+    def test_escalation_rules(self):
+        signals = [
+            _sig("explore", "Thinking about the roadmap for next quarter"),             # exploring
+            _sig("weak", "Anyone recommend a good analytics tool?"),                  # 0.45
+            _sig("strong", "I need a tool, looking for something I want to recommend"),  # ≥ 0.6
+        ]
+        results = self.clf.classify_batch(signals)
+        self.assertEqual([r.signal_id for r in results], ["explore", "weak", "strong"])
+        self.assertEqual([self.clf.tier_of(s.id) for s in signals], ["llm", "llm", "heuristic"])
+        self.assertEqual(results[0].confidence, 0.99)
+        self.assertEqual(self.llm.calls, 2)
+
+    def test_stats(self):
+        self.clf.classify_batch([
+            _sig("a", "Please add dark mode, feature request"),
+            _sig("b", "Thinking about the roadmap for next quarter"),
+        ])
+        cascade = self.clf.stats()["cascade"]
+        self.assertEqual(cascade["llm"], 1)
+        self.assertEqual(cascade["llm_calls_saved"], 1)
+        self.assertEqual(cascade["escalation_rate"], 0.5)
+        self.clf.reset_stats()
+        self.assertEqual(self.clf.stats()["cascade"]["signals"], 0)
+
+    def test_calls_saved_counts_requests_not_signals(self):
+        class PackedLLM(FakeLLM):
+            pack_size = 4
+
+            def __init__(self):
+                super().__init__()
+                self.requests = 0
+
+            def classify_batch(self, signals):
+                self.requests += -(-len(signals) // self.pack_size)
+                return super().classify_batch(signals)
+
+            def stats(self):
+                return {"requests": self.requests}
+
+        clf = CascadeClassifier(PackedLLM(), threshold=0.6)
+        signals = ([_sig(f"c{i}", "Please add dark mode, feature request") for i in range(5)]
+                   + [_sig(f"e{i}", "Thinking about the roadmap for next quarter") for i in range(3)])
+        clf.classify_batch(signals)
+        cascade = clf.stats()["cascade"]
+        self.assertEqual(cascade["llm"], 3)
+        self.assertEqual(cascade["llm_requests"], 1)         # 3 posts, one pack
+        self.assertEqual(cascade["llm_calls_saved"], 1)      # 8 posts would take 2 packs
+
+    def test_version_covers_stage_rules(self):
+        other = CascadeClassifier(self.llm, threshold=0.6, trust_stages=(IntentStage.CHURNING,))
+        self.assertNotEqual(self.clf.version, other.version)
+        wider = CascadeClassifier(self.llm, threshold=0.6,
+                                  escalate_stages=(IntentStage.EXPLORING, IntentStage.EVALUATING))
+        self.assertNotEqual(self.clf.version, wider.version)
+
+    def test_pipeline_items_carry_tier(self):
+        from signalry.ingest import MockIngestor
+        from signalry.pipeline import Pipeline
+        from signalry.queue import ReviewQueue
+
+        data_path = Path(__file__).parent.parent / "data" / "mock_posts.json"
+        db_path = os.path.join(tempfile.mkdtemp(), "pipe.db")
+        result = Pipeline(ingestor=MockIngestor(str(data_path)), classifier=self.clf,
+                          queue=ReviewQueue(db_path=db_path)).run(keywords=["need", "bug"])
+        tiers = {item["tier"] for item in result["items"]}
+        self.assertTrue(tiers <= {"heuristic", "llm"})
+        self.assertEqual(result["classifier"]["cascade"]["signals"],
+                         result["counts"]["classified"] - result["counts"]["near_duplicates"])
+
+
+if __name__ == "__main__":
+    unittest.main()
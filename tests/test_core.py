@@ -331,9 +331,38 @@ class TestReviewQueue(unittest.TestCase):
         result2 = self.queue.add(sig2, cls2)
 
         self.assertTrue(result1)
+        self.assertFalse(result2)
         # Second add with same source_id should not create duplicate
         items = self.queue.list_all()
         self.assertEqual(len(items), 1)
+        self.assertEqual(self.queue.stats()["total"], 1)
+
+    def test_add_many(self):
+        old = Signal(source_id="tw_old", actor="user0", text="queued earlier")
+        self.queue.add(old, Classification(signal_id=old.id))
+        sigs = [Signal(source_id=f"tw_{i}", actor=f"user{i}", text="post") for i in range(3)]
+        sigs.append(Signal(source_id="tw_1", actor="user9", text="same post, new id"))
+        sigs.append(Signal(source_id="tw_old", actor="user0", text="queued earlier"))
+        pairs = [(s, Classification(signal_id=s.id, primary_pain="p")) for s in sigs]
+        pairs.append(pairs[0])                              # same Signal twice in one batch
+
+        self.assertEqual(self.queue.add_many(pairs), [True, True, True, False, False, False])
+        self.assertEqual(self.queue.add_many(pairs[:3]), [False, False, False])
+        self.assertEqual(self.queue.add_many([]), [])
+        stats = self.queue.stats()
+        self.assertEqual(stats["total"], 4)
+        self.assertEqual(len(self.queue.list_pending()), 4)
+
+    def test_add_many_matches_add(self):
+        """Same rows and same results as add() in a loop."""
+        sigs = [Signal(source_id=f"tw_{i % 7}", actor=f"user{i}", text="post") for i in range(20)]
+        pairs = [(s, Classification(signal_id=s.id, primary_pain=f"p{i}"))
+                 for i, s in enumerate(sigs)]
+        one_by_one = ReviewQueue(db_path=os.path.join(self.tmp, "loop.db"))
+        expected = [one_by_one.add(s, c) for s, c in pairs]
+        self.assertEqual(self.queue.add_many(pairs), expected)
+        dump = lambda q: [(i.signal.id, i.classification.primary_pain) for i in q.list_all()]
+        self.assertEqual(sorted(dump(self.queue)), sorted(dump(one_by_one)))
 
     def test_approve_and_discard(self):
         sig = Signal(source_id="tw_action", actor="user1", text="test")
@@ -0,0 +1,107 @@
+"""Tests for the cross-source (pain, source) correlation index."""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from signalry.connectors.realistic_mock import RealisticMockConnector
+from signalry.classify import MockClassifier
+from signalry.crosssource import CrossSourceIndex
+from signalry.filter import filter_signals
+from signalry.models import Classification, Signal
+from signalry.queue import ReviewQueue
+
+
+def _item(i, source, pain, ts):
+    sig = Signal(source=source, actor=f"user{i}", text=pain, source_id=f"{source}-{i}",
+                 timestamp=ts)
+    return sig, Classification(signal_id=sig.id, primary_pain=pain)
+
+
+class TestCrossSourceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2025, 3, 10, 12, 0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = ReviewQueue(os.path.join(self.tmp.name, "q.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _queue(self, rows):
+        items = [_item(i, source, pain, self.now - timedelta(hours=h))
+                 for i, (source, pain, h) in enumerate(rows, len(self.queue.list_all()))]
+        for sig, cls in items:
+            self.queue.add(sig, cls)
+        return items
+
+    def test_multi_source_window(self):
+        index = CrossSourceIndex().attach(self.queue)
+        self._queue([
+            ("slack", "export broken", 1), ("intercom", "export broken", 2),
+            ("hubspot", "export broken", 30), ("slack", "slow sync", 1),
+            ("slack", "slow sync", 3),
+        ])
+        clusters = index.multi_source(hours=48, now=self.now)
+        self.assertEqual([c["pain_key"] for c in clusters], ["export broken"])
+        self.assertEqual(clusters[0]["sources"], {"hubspot": 1, "intercom": 1, "slack": 1})
+
+        # Hubspot falls out of a 24h window; the pain is still on two sources
+        self.assertEqual(index.sources("export broken", hours=24, now=self.now),
+                         {"intercom": 1, "slack": 1})
+        self.assertEqual(index.multi_source(hours=24, min_sources=3, now=self.now), [])
+        self.assertEqual(index.multi_source(hours=1.5, now=self.now), [])
+
+        # min_sources=1 also lists single-channel pains
+        single = index.multi_source(hours=48, min_sources=1, now=self.now)
+        self.assertEqual([c["pain_key"] for c in single], ["export broken", "slow sync"])
+        self.assertEqual(single[1]["sources"], {"slack": 2})
+        with self.assertRaises(ValueError):
+            index.multi_source(min_sources=0)
+
+    def test_attach_loads_history_and_follows_adds(self):
+        early = self._queue([("slack", "export broken", 5)])
+        index = CrossSourceIndex().attach(self.queue)
+        self.assertEqual(index.stats()["signals"], 1)
+        self.assertEqual(index.multi_source(now=self.now), [])
+
+        late = self._queue([("intercom", "Export is broken", 1)])   # rephrased: same key
+        clusters = index.multi_source(now=self.now)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["pain"], "export broken")
+        self.assertEqual(index.signal_ids("export broken"), [early[0][0].id, late[0][0].id])
+
+    def test_duplicates_and_late_arrivals(self):
+        index = CrossSourceIndex().attach(self.queue)
+        (sig, cls), = self._queue([("slack", "export broken", 1)])
+        self.assertFalse(index.add(sig, cls))                    # already indexed
+        self.queue.add(sig, cls)                                 # re-queued: still one entry
+        self.assertEqual(index.stats()["signals"], 1)
+
+        older = self._queue([("slack", "export broken", 10)])    # arrives after, happened before
+        self.assertEqual(index.signal_ids("export broken", source="slack"),
+                         [older[0][0].id, sig.id])
+        self.assertEqual(index.signal_ids("export broken", hours=5, now=self.now), [sig.id])
+
+    def test_realistic_mock_channels(self):
+        index = CrossSourceIndex().attach(self.queue)
+        signals = filter_signals(RealisticMockConnector().fetch(keywords=[]))
+        for sig, cls in zip(signals, MockClassifier().classify_batch(signals)):
+            self.queue.add(sig, cls)
+        clusters = index.multi_source(hours=None)
+        self.assertTrue(clusters)
+        for c in clusters:
+            self.assertGreaterEqual(len(c["sources"]), 2)
+            self.assertEqual(c["signal_count"], len(index.signal_ids(c["pain_key"])))
+
+    def test_clear(self):
+        index = CrossSourceIndex().attach(self.queue)
+        self._queue([("slack", "export broken", 1), ("intercom", "export broken", 1)])
+        index.clear()
+        self.assertEqual(index.multi_source(now=self.now), [])
+        self.assertEqual(index.stats()["signals"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+"""Tests for the SQLite connection manager (writer + reader pool, PRAGMA profiles)."""
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+from signalry.db import ConnectionManager, shared
+from signalry.cache import ClassificationCache
+from signalry.models import Classification, IntentStage, Signal
+from signalry.pains import PainIndex
+from signalry.queue import ReviewQueue
+
+
+class TestConnectionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "t.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _db(self, **kwargs):
+        db = ConnectionManager(self.path, **kwargs)
+        self.addCleanup(db.close)
+        with db.write() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS t (x INTEGER)")
+        return db
+
+    def test_profiles(self):
+        db = self._db()
+        self.assertEqual(db.journal_mode, "wal")
+        with db.read() as conn:
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)   # NORMAL
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)    # MEMORY
+        legacy = ConnectionManager(os.path.join(self.tmp.name, "legacy.db"), pragmas="legacy")
+        self.addCleanup(legacy.close)
+        self.assertEqual(legacy.journal_mode, "delete")
+        custom = ConnectionManager(os.path.join(self.tmp.name, "c.db"),
+                                   pragmas={"cache_size": -1024})
+        self.addCleanup(custom.close)
+        with custom.read() as conn:
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -1024)
+        with self.assertRaises(ValueError):
+            ConnectionManager(self.path, pragmas="fast")
+
+    def test_write_commits_or_rolls_back(self):
+        db = self._db()
+        with db.write() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+        with self.assertRaises(RuntimeError):
+            with db.write() as conn:
+                conn.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError("boom")
+        with db.read() as conn:
+            self.assertEqual([tuple(r) for r in conn.execute("SELECT x FROM t")], [(1,)])
+
+    def test_readers_not_blocked_by_open_write(self):
+        db = self._db()
+        with db.write() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            seen = []
+            reader = threading.Thread(target=lambda: seen.append(self._count(db)))
+            reader.start()
+            reader.join(timeout=2)
+            self.assertEqual(seen, [0])                  # last committed state, no wait
+        self.assertEqual(self._count(db), 1)
+
+    @staticmethod
+    def _count(db):
+        with db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+    def test_reader_pool_is_bounded_and_shared_across_threads(self):
+        db = self._db(readers=2)
+        with db.write() as conn:
+            conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+        errors = []
+
+        def work():
+            try:
+                for _ in range(50):
+                    assert self._count(db) == 100
+            except Exception as exc:                     # noqa: BLE001 — surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(db.stats()["readers_open"], 2)
+        self.assertEqual(db.stats()["reads"], 400)
+
+    def test_memory_database_reads_through_writer(self):
+        db = ConnectionManager(":memory:")
+        with db.write() as conn:
+            conn.execute("CREATE TABLE t (x)")
+            conn.execute("INSERT INTO t VALUES (1)")
+        with db.read() as conn:
+            self.assertEqual([tuple(r) for r in conn.execute("SELECT x FROM t")], [(1,)])
+        db.close()
+
+
+class TestReviewQueueConnections(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = ReviewQueue(os.path.join(self.tmp.name, "q.db"))
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_queue_uses_wal_and_survives_repeat_sql_momentum(self):
+        self.assertEqual(self.queue._db.journal_mode, "wal")
+        now = datetime.utcnow()
+        for i in range(4):
+            sig = Signal(actor=f"user{i}", text="export", source_id=f"s{i}", timestamp=now)
+            self.queue.add(sig, Classification(signal_id=sig.id, primary_pain="export broken"))
+        first = self.queue.momentum_clusters(now=now)
+        second = self.queue.momentum_clusters(now=now)      # temp tables on a pooled reader
+        self.assertEqual(first, second)
+        self.assertEqual(first["pains"], {"export broken": 4})
+
+    def test_read_does_not_wait_for_the_writer(self):
+        now = datetime.utcnow()
+        seen = []
+
+        def scan():
+            with self.queue.read() as conn:
+                seen.append(conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0])
+
+        with self.queue._conn() as conn:                     # a long write holds the lock
+            conn.execute("INSERT INTO signals (id, source, actor, text, timestamp) "
+                         "VALUES ('x', 's', 'a', 't', ?)", (now.isoformat(),))
+            reader = threading.Thread(target=scan)
+            reader.start()
+            reader.join(timeout=2)
+            self.assertEqual(seen, [0])
+        with self.queue.read() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0], 1)
+
+    def test_concurrent_adds_and_reads(self):
+        now = datetime.utcnow()
+
+        def writer(offset):
+            for i in range(offset, offset + 25):
+                sig = Signal(actor=f"user{i}", text="t", source_id=f"src{i}", timestamp=now)
+                self.queue.add(sig, Classification(signal_id=sig.id, primary_pain="p"))
+
+        def reader():
+            for _ in range(25):
+                self.queue.stats()
+                self.queue.list_pending(limit=10)
+
+        threads = ([threading.Thread(target=writer, args=(k * 25,)) for k in range(4)]
+                   + [threading.Thread(target=reader) for _ in range(4)])
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.queue.stats()["total"], 100)
+
+    def test_stores_in_the_queue_file_share_its_manager(self):
+        pains = PainIndex(str(self.queue.db_path))
+        cache = ClassificationCache(str(self.queue.db_path))
+        self.assertIs(pains._db, self.queue._db)
+        self.assertIs(cache._db, self.queue._db)
+        cache.close()
+        self.assertFalse(self.queue._db.closed)          # the queue still holds it
+        self.assertEqual(self.queue.stats()["total"], 0)
+
+    def test_shared_closes_with_its_last_holder(self):
+        path = os.path.join(self.tmp.name, "s.db")
+        first, second = shared(path), shared(path)
+        self.assertIs(first, second)
+        first.close()
+        self.assertFalse(second.closed)
+        second.close()
+        self.assertTrue(second.closed)
+        third = shared(path)
+        self.addCleanup(third.close)
+        self.assertIsNot(third, first)
+
+    def test_pain_index_and_sql_momentum_do_not_deadlock(self):
+        pains = PainIndex(str(self.queue.db_path))
+        now = datetime.utcnow()
+        for i in range(30):
+            sig = Signal(actor=f"user{i % 5}", text="t", source_id=f"src{i}", timestamp=now)
+            self.queue.add(sig, Classification(signal_id=sig.id, intent_stage=IntentStage.CHURNING,
+                                               primary_pain=f"pain number {i % 7}"))
+
+        def keyer():
+            for i in range(200):
+                pains.keys([f"fresh spelling {i}"])
+
+        def momentum():
+            for _ in range(20):
+                self.queue.apply_momentum(pains=pains)
+
+        threads = [threading.Thread(target=keyer, daemon=True),
+                   threading.Thread(target=momentum, daemon=True)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=30)
+        self.assertFalse(any(t.is_alive() for t in threads))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests for dedup stores and the streaming filter."""
+
+import os
+import tempfile
+import unittest
+
+from signalry.dedup import LRUDedup, MemoryDedup, SQLiteDedup
+from signalry.filter import filter_signals, filter_signals_iter
+from signalry.models import Signal
+
+
+def _sig(text, source_id):
+    return Signal(text=text, source_id=source_id, actor="user")
+
+
+class TestDedupStores(unittest.TestCase):
+
+    def test_memory(self):
+        store = MemoryDedup()
+        self.assertFalse(store.check_and_add("a"))
+        self.assertTrue(store.check_and_add("a"))
+        self.assertIn("a", store)
+
+    def test_lru_evicts_oldest(self):
+        store = LRUDedup(max_size=2)
+        store.check_and_add("a")
+        store.check_and_add("b")
+        store.check_and_add("a")          # refresh a
+        store.check_and_add("c")          # evicts b
+        self.assertIn("a", store)
+        self.assertNotIn("b", store)
+        self.assertEqual(len(store), 2)
+
+    def test_sqlite_persists_across_instances(self):
+        path = os.path.join(tempfile.mkdtemp(), "dedup.db")
+        with SQLiteDedup(path) as store:
+            self.assertFalse(store.check_and_add("tw_1"))
+        with SQLiteDedup(path) as store:
+            self.assertTrue(store.check_and_add("tw_1"))
+            self.assertFalse(store.check_and_add("tw_2"))
+
+
+class TestStreamingFilter(unittest.TestCase):
+
+    def test_yields_lazily(self):
+        def source():
+            yield _sig("I need a better analytics tool", "s1")
+            raise AssertionError("consumed too far")
+
+        it = filter_signals_iter(source())
+        self.assertEqual(next(it).source_id, "s1")
+
+    def test_matches_list_variant(self):
+        signals = [
+            _sig("I need a better analytics tool", "s1"),
+            _sig("gm wagmi", "s2"),
+            _sig("I need a better analytics tool", "s1"),
+            _sig("Can anyone recommend a signal detector?", "s3"),
+        ]
+        self.assertEqual(
+            [s.source_id for s in filter_signals_iter(signals)],
+            [s.source_id for s in filter_signals(signals)],
+        )
+
+    def test_dedup_across_runs(self):
+        store = LRUDedup(max_size=10)
+        first = filter_signals([_sig("I need a better analytics tool", "s1")], dedup=store)
+        second = filter_signals([_sig("I need a better analytics tool", "s1")], dedup=store)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the decayed urgency-escalation detector."""
+
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from signalry.escalation import EscalationDetector
+from signalry.models import Classification, Signal, Urgency
+from signalry.momentum import detect_momentum
+
+
+def _batch(rows, now):
+    """rows: (hours_ago, urgency) on the pain "export broken", distinct actors."""
+    signals, classifications = [], []
+    for i, (hours_ago, urgency) in enumerate(rows):
+        sig = Signal(actor=f"user{i}_{hours_ago}", text="export",
+                     timestamp=now - timedelta(hours=hours_ago))
+        signals.append(sig)
+        classifications.append(Classification(signal_id=sig.id, primary_pain="export broken",
+                                              urgency=urgency))
+    return signals, classifications
+
+
+class TestEscalation(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2025, 3, 10, 12, 0)
+
+    def test_rising_urgency_escalates(self):
+        detector = EscalationDetector()
+        baseline = [(h, Urgency.LOW) for h in range(10, 60, 5)]
+        signals, cls = _batch(baseline, self.now)
+        self.assertEqual(detector.update(signals, cls, now=self.now), set())
+        self.assertFalse(any(c.momentum_flag for c in cls))
+
+        signals, cls = _batch([(2, Urgency.CRITICAL), (1, Urgency.CRITICAL), (0, Urgency.HIGH)],
+                              self.now)
+        self.assertEqual(detector.update(signals, cls, now=self.now), {"export broken"})
+        self.assertTrue(all(c.momentum_flag for c in cls))
+        score = detector.score("export broken", now=self.now)
+        self.assertGreater(score["fast_urgency"], score["slow_urgency"])
+        self.assertEqual(detector.escalating(now=self.now)[0]["pain"], "export broken")
+
+    def test_steady_or_falling_urgency_does_not(self):
+        for rows in ([(h, Urgency.HIGH) for h in range(0, 60, 3)],
+                     [(h, Urgency.CRITICAL) for h in range(12, 60, 4)]
+                     + [(h, Urgency.LOW) for h in range(3)]):
+            detector = EscalationDetector()
+            detector.update(*_batch(rows, self.now), now=self.now)
+            self.assertLess(detector.score("export broken", now=self.now)["slope"], 0.75)
+            self.assertEqual(detector.escalating(now=self.now), [])
+
+    def test_one_critical_post_is_not_a_trend(self):
+        detector = EscalationDetector()
+        detector.update(*_batch([(h, Urgency.LOW) for h in range(10, 60, 5)]
+                                + [(0, Urgency.CRITICAL)], self.now), now=self.now)
+        self.assertLess(detector.score("export broken", now=self.now)["fast_volume"], 2.0)
+        self.assertEqual(detector.escalating(now=self.now), [])
+
+    def test_escalation_fades(self):
+        detector = EscalationDetector()
+        detector.update(*_batch([(h, Urgency.LOW) for h in range(10, 60, 5)]
+                                + [(h, Urgency.CRITICAL) for h in range(3)], self.now))
+        self.assertTrue(detector.is_escalating("export broken", now=self.now))
+        self.assertFalse(detector.is_escalating("export broken", now=self.now + timedelta(days=1)))
+
+    def test_arrival_order_does_not_matter(self):
+        rng = random.Random(0)
+        rows = [(rng.uniform(0, 72), rng.choice(list(Urgency))) for _ in range(40)]
+        forward, shuffled = EscalationDetector(), EscalationDetector()
+        signals, cls = _batch(rows, self.now)
+        forward.update(signals, cls, now=self.now)
+        order = list(range(len(cls)))
+        random.Random(3).shuffle(order)
+        for i in order:
+            shuffled.update([signals[i]], [cls[i]], now=self.now)
+        a = forward.score("export broken", now=self.now)
+        b = shuffled.score("export broken", now=self.now)
+        for key in a:
+            self.assertAlmostEqual(a[key], b[key], places=3)
+
+    def test_state_persists_between_runs(self):
+        db = os.path.join(tempfile.mkdtemp(), "q.db")
+        first = EscalationDetector(db)
+        first.update(*_batch([(h, Urgency.LOW) for h in range(10, 60, 5)], self.now), now=self.now)
+        first.save()
+
+        second = EscalationDetector(db)                 # next run: no history rescan
+        escalating = second.update(*_batch([(2, Urgency.CRITICAL), (1, Urgency.CRITICAL)],
+                                           self.now), now=self.now)
+        self.assertEqual(escalating, {"export broken"})
+        self.assertEqual(second.stats()["pains"], 1)
+
+    def test_detect_momentum_rule_three(self):
+        now = datetime.utcnow()
+        detector = EscalationDetector()
+        detector.update(*_batch([(h, Urgency.LOW) for h in range(10, 60, 5)], now))
+        signals, cls = _batch([(1, Urgency.CRITICAL), (0.5, Urgency.CRITICAL)], now)
+        self.assertFalse(any(c.momentum_flag for c in detect_momentum(signals, list(cls))))
+        detect_momentum(signals, cls, escalation=detector)
+        self.assertTrue(all(c.momentum_flag for c in cls))
+
+    def test_half_lives_validated(self):
+        with self.assertRaises(ValueError):
+            EscalationDetector(fast_half_life_hours=48, slow_half_life_hours=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
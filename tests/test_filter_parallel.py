@@ -0,0 +1,105 @@
+"""Parallel filter mode must match the serial path exactly."""
+
+import unittest
+
+from signalry.dedup import MemoryDedup
+from signalry.filter import filter_signals, filter_signals_parallel
+from signalry.models import Signal
+
+TEXTS = [
+    "I need a better analytics tool",
+    "gm wagmi 🚀🚀🚀🚀",
+    "Beautiful day in Miami, had great coffee",
+    "Can anyone recommend a signal detector?",
+    "hi",
+    "FREE AIRDROP follow + retweet!",
+    "Leaving Productboard, the feedback loop is too slow",
+]
+
+
+def _signals(n):
+    return [
+        Signal(id=f"sig_{i}", text=TEXTS[i % len(TEXTS)], source_id=f"src_{i % (n - 5)}")
+        for i in range(n)
+    ]
+
+
+class TestParallelFilter(unittest.TestCase):
+
+    def test_matches_serial_with_workers(self):
+        signals = _signals(500)
+        serial = [s.id for s in filter_signals(signals)]
+        parallel = [s.id for s in filter_signals_parallel(signals, workers=2, chunk_size=64)]
+        self.assertEqual(parallel, serial)
+
+    def test_single_worker_inline(self):
+        signals = _signals(50)
+        self.assertEqual(
+            [s.id for s in filter_signals_parallel(signals, workers=1)],
+            [s.id for s in filter_signals(signals)],
+        )
+
+    def test_shared_dedup_store(self):
+        store = MemoryDedup()
+        signals = _signals(50)
+        filter_signals_parallel(signals, workers=1, dedup=store)
+        self.assertEqual(filter_signals_parallel(signals, workers=1, dedup=store), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestFilterStats(unittest.TestCase):
+    """Instrumented filtering: same decisions, plus per-rule counters."""
+
+    def test_same_decisions_and_gate_counts(self):
+        from signalry.filter import FilterStats
+
+        signals = _signals(40)
+        stats = FilterStats()
+        instrumented = [s.id for s in filter_signals(signals, stats=stats)]
+        self.assertEqual(instrumented, [s.id for s in filter_signals(signals)])
+
+        self.assertEqual(stats.passed, len(instrumented))
+        self.assertEqual(stats.passed + sum(stats.rejected.values()), len(signals))
+        self.assertEqual(stats.rejected["dupe"], 5)
+        self.assertGreater(stats.rejected["quality"], 0)
+        self.assertGreater(stats.rejected["noise"], 0)
+        self.assertGreater(stats.rejected["intent"], 0)
+
+    def test_pattern_counters(self):
+        from signalry.filter import FilterStats
+
+        stats = FilterStats()
+        filter_signals([Signal(text="I need a better analytics tool", source_id="a")], stats=stats)
+        need = stats.intent[0]
+        self.assertEqual((need.evaluations, need.hits), (1, 1))
+        self.assertTrue(all(c.evaluations == 1 for c in stats.intent))
+        self.assertIn(stats.noise[0].pattern, stats.never_fired())
+
+    def test_parallel_merges_worker_stats(self):
+        from signalry.filter import FilterStats
+
+        signals = _signals(300)
+        serial, parallel = FilterStats(), FilterStats()
+        filter_signals(signals, stats=serial)
+        filter_signals_parallel(signals, workers=2, chunk_size=50, stats=parallel)
+        self.assertEqual(parallel.rejected, serial.rejected)
+        self.assertEqual([c.hits for c in parallel.intent], [c.hits for c in serial.intent])
+
+    def test_pipeline_reports_filter_stats(self):
+        import os
+        import tempfile
+        from pathlib import Path
+
+        from signalry.ingest import MockIngestor
+        from signalry.pipeline import Pipeline
+        from signalry.queue import ReviewQueue
+
+        data_path = Path(__file__).parent.parent / "data" / "mock_posts.json"
+        pipe = Pipeline(ingestor=MockIngestor(str(data_path)),
+                        queue=ReviewQueue(db_path=os.path.join(tempfile.mkdtemp(), "f.db")),
+                        instrument=True)
+        result = pipe.run(keywords=[])
+        self.assertEqual(result["filter_stats"]["passed"], result["counts"]["filtered"])
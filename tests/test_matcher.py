@@ -0,0 +1,69 @@
+"""Tests for the compiled single-pass matcher used by the intent filter."""
+
+import json
+import re
+import unittest
+from pathlib import Path
+
+from signalry.filter import (
+    INTENT_PATTERNS, has_explicit_intent, is_noise, matched_families,
+)
+from signalry.matcher import PatternMatcher
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def _reference(text):
+    hits = set()
+    if is_noise(text):
+        hits.add("noise")
+    if has_explicit_intent(text):
+        hits.add("intent")
+    return frozenset(hits)
+
+
+class TestPatternMatcher(unittest.TestCase):
+    """The merged matcher must agree with the per-pattern loops exactly."""
+
+    def test_matches_reference_on_bundled_data(self):
+        for name in ("mock_posts.json", "realistic_signals.json"):
+            for item in json.loads((DATA_DIR / name).read_text()):
+                text = item["text"]
+                self.assertEqual(matched_families(text), _reference(text), text)
+
+    def test_edge_cases(self):
+        texts = [
+            "", "gm", "gm wagmi 🚀🚀🚀", "GN!!", "wagmi gm",
+            "when airdrop is free I need it",   # intent match overlaps noise match
+            "free airdrop, when launch?",
+            "10x gains, need a tool",
+            "I need a better analytics tool",
+            "Beautiful day in Miami, had great coffee",
+            "why won't this load",
+            "need\nhelp with rt and follow",
+        ]
+        for text in texts:
+            self.assertEqual(matched_families(text), _reference(text), text)
+
+    def test_later_family_found_after_earlier_match(self):
+        m = PatternMatcher({
+            "a": [re.compile(r"\bfoo\b")],
+            "b": [re.compile(r"foo bar")],
+        })
+        self.assertEqual(m.scan("foo bar"), frozenset({"a", "b"}))
+        self.assertEqual(m.scan("xfoo bar"), frozenset({"b"}))
+
+    def test_flags_are_preserved(self):
+        m = PatternMatcher({
+            "ci": [re.compile(r"hello", re.I)],
+            "cs": [re.compile(r"World")],
+        })
+        self.assertEqual(m.scan("HELLO world"), frozenset({"ci"}))
+
+    def test_empty_family_never_matches(self):
+        m = PatternMatcher({"none": [], "intent": INTENT_PATTERNS})
+        self.assertEqual(m.scan("I need help"), frozenset({"intent"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""MockClassifier on the keyword automaton gives the same answers as the old scans."""
+
+import importlib.util
+import itertools
+import json
+import random
+import unittest
+from pathlib import Path
+
+from signalry.classify import MockClassifier
+from signalry.keywords import AHO_CORASICK, SCAN, KeywordAutomaton
+from signalry.models import IntentStage, Signal, Urgency
+
+HAS_PYAHOCORASICK = importlib.util.find_spec("ahocorasick") is not None
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def reference_fields(text):
+    """The pre-automaton MockClassifier rules, verbatim."""
+    text = text.lower()
+    intent = IntentStage.EXPLORING
+    if any(w in text for w in ["need", "looking for", "searching", "recommend"]):
+        intent = IntentStage.EVALUATING
+    if any(w in text for w in ["please add", "feature request", "wish", "when will"]):
+        intent = IntentStage.REQUESTING
+    if any(w in text for w in ["leaving", "left", "dropped", "cancelled", "switching back"]):
+        intent = IntentStage.CHURNING
+    if any(w in text for w in ["love", "switched to", "started using", "best tool"]):
+        intent = IntentStage.ADVOCATING
+
+    pain = "general feedback"
+    if any(w in text for w in ["bug", "broken", "error", "crash"]):
+        pain = "reliability/bugs"
+    elif any(w in text for w in ["slow", "performance", "lag"]):
+        pain = "performance"
+    elif any(w in text for w in ["confusing", "ux", "hard to use", "unintuitive"]):
+        pain = "usability"
+    elif any(w in text for w in ["price", "expensive", "cost", "pricing"]):
+        pain = "pricing"
+    elif any(w in text for w in ["missing", "no support for", "doesn't have"]):
+        pain = "missing feature"
+    elif any(w in text for w in ["scam", "rug", "honeypot", "drain"]):
+        pain = "trust/security"
+    elif any(w in text for w in ["token", "utility", "tokenomics"]):
+        pain = "token utility"
+
+    urgency = Urgency.MEDIUM
+    if any(w in text for w in ["urgent", "asap", "critical", "down", "broken now"]):
+        urgency = Urgency.CRITICAL
+    elif any(w in text for w in ["today", "right now", "immediately"]):
+        urgency = Urgency.HIGH
+    elif any(w in text for w in ["eventually", "someday", "nice to have"]):
+        urgency = Urgency.LOW
+
+    intent_words = ["need", "want", "looking", "please", "wish", "bug",
+                    "broken", "switch", "leaving", "love", "recommend"]
+    matches = sum(1 for w in intent_words if w in text)
+    confidence = round(min(0.3 + (matches * 0.15), 0.85), 2)
+    return intent, pain, urgency, confidence
+
+
+def _texts():
+    texts = []
+    for name in ("mock_posts.json", "realistic_signals.json"):
+        texts.extend(item["text"] for item in json.loads((DATA_DIR / name).read_text()))
+
+    # Overlapping / nested keywords and odd casing the scans handled by accident
+    texts += [
+        "needown", "broken now", "BROKEN NOW", "switching back", "switched to x, switching back",
+        "linux flag", "dragging", "slowly draining", "tokenomics utility", "ux", "luxury",
+        "pleased", "please add", "leftovers", "doesn't have", "asapasap", "", "   ",
+    ]
+
+    # Fuzz: random glue of keyword fragments
+    rng = random.Random(14)
+    words = list(MockClassifier._keywords.keywords)
+    for _ in range(2000):
+        parts = [rng.choice(words) for _ in range(rng.randint(1, 5))]
+        parts = [p[: rng.randint(1, len(p))] if rng.random() < 0.3 else p for p in parts]
+        glue = rng.choice(["", " ", "-", "X"])
+        texts.append(glue.join(parts))
+    return texts
+
+
+def _with_backend(backend):
+    class Mock(MockClassifier):
+        _keywords = KeywordAutomaton(MockClassifier._keywords.keywords, backend=backend)
+    return Mock()
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+
+    def test_scan_hits_are_substrings(self):
+        kw = KeywordAutomaton(["bug", "broken", "broken now", "bug"], backend=SCAN)
+        self.assertEqual(kw.keywords, ("bug", "broken", "broken now"))
+        self.assertEqual(kw.hits("it's broken now, debug it"), {"bug", "broken", "broken now"})
+        self.assertEqual(kw.mask("nothing here"), 0)
+
+    @unittest.skipUnless(HAS_PYAHOCORASICK, "pyahocorasick not installed")
+    def test_backends_agree(self):
+        words = list(MockClassifier._keywords.keywords)
+        scan = KeywordAutomaton(words, backend=SCAN)
+        auto = KeywordAutomaton(words, backend=AHO_CORASICK)
+        for text in _texts():
+            self.assertEqual(scan.mask(text.lower()), auto.mask(text.lower()), text)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            KeywordAutomaton(["ok", ""])
+        with self.assertRaises(ValueError):
+            KeywordAutomaton(["ok"], backend="regex")
+
+
+class TestMockEquivalence(unittest.TestCase):
+
+    def _check(self, clf):
+        for i, text in enumerate(_texts()):
+            cls = clf.classify(Signal(id=str(i), actor="someone", text=text))
+            self.assertEqual(
+                (cls.intent_stage, cls.primary_pain, cls.urgency, cls.confidence),
+                reference_fields(text), text,
+            )
+
+    def test_scan_backend(self):
+        self._check(_with_backend(SCAN))
+
+    @unittest.skipUnless(HAS_PYAHOCORASICK, "pyahocorasick not installed")
+    def test_aho_corasick_backend(self):
+        self._check(_with_backend(AHO_CORASICK))
+
+    def test_default_classifier(self):
+        self._check(MockClassifier())
+
+
+if __name__ == "__main__":
+    unittest.main()
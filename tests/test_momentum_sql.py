@@ -0,0 +1,144 @@
+"""Tests for momentum computed in SQL over the review-queue history."""
+
+import os
+import random
+import tempfile
+import unittest
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+from signalry.models import Classification, IntentStage, Signal, Urgency
+from signalry.momentum import detect_momentum
+from signalry.pains import PainIndex
+from signalry.queue import ReviewQueue
+
+
+def _history(n, seed=7):
+    """Random history: few actors and pain spellings, half of it outside 48h."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    pains = ["export broken", "Export broken ", "EXPORT BROKEN", "login loop",
+             "Login loop\t", "Ünïcode pain", "ünïcode pain", "slow sync", "pricing"]
+    signals, classifications = [], []
+    for i in range(n):
+        sid = f"s{i}"
+        # whole hours plus 30 min keeps every signal clear of the window edge
+        hours = rng.choice([rng.randrange(0, 47), rng.randrange(49, 200)]) + 0.5
+        signals.append(Signal(id=sid, source_id=f"src_{i}", actor=f"user{rng.randrange(40)}",
+                              text=f"post {i}", timestamp=now - timedelta(hours=hours)))
+        classifications.append(Classification(
+            signal_id=sid, intent_stage=IntentStage.CHURNING,
+            primary_pain=rng.choice(pains), urgency=Urgency.MEDIUM, confidence=0.8))
+    return signals, classifications
+
+
+class TestMomentumSQL(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = ReviewQueue(os.path.join(tempfile.mkdtemp(), "q.db"))
+
+    def _fill(self, signals, classifications):
+        for sig, cls in zip(signals, classifications):
+            self.queue.add(sig, cls)
+
+    def _flags(self):
+        return {item.signal.id: item.classification.momentum_flag
+                for item in self.queue.list_all(limit=10_000)}
+
+    def test_flags_match_detect_momentum(self):
+        for seed, n in ((1, 20), (2, 60), (3, 300)):
+            with self.subTest(seed=seed):
+                self.queue.clear()
+                signals, classifications = _history(n, seed)
+                self._fill(signals, classifications)
+                pains = PainIndex()
+                expected = detect_momentum(signals, deepcopy(classifications), pains=pains)
+
+                flagged = self.queue.apply_momentum(pains=pains)
+                want = {c.signal_id: c.momentum_flag for c in expected}
+                self.assertEqual(self._flags(), want)
+                self.assertEqual(flagged, sum(want.values()))
+
+    def test_flags_match_detect_momentum_without_an_index(self):
+        for seed, n in ((4, 60), (5, 300)):
+            with self.subTest(seed=seed):
+                self.queue.clear()
+                signals, classifications = _history(n, seed)
+                for i, pain in enumerate(["API timeouts on batch", "batch API timing out"]):
+                    sig = Signal(id=f"x{i}", source_id=f"x{i}", actor="repeat", text="t",
+                                 timestamp=datetime.utcnow())
+                    signals.append(sig)                 # one actor, two spellings: a repeat
+                    classifications.append(Classification(   # only under canonical keys
+                        signal_id=sig.id, intent_stage=IntentStage.CHURNING, primary_pain=pain,
+                        urgency=Urgency.MEDIUM, confidence=0.8))
+                self._fill(signals, classifications)
+                expected = detect_momentum(signals, deepcopy(classifications))
+
+                self.queue.apply_momentum()
+                self.assertEqual(self._flags(), {c.signal_id: c.momentum_flag for c in expected})
+
+    def test_separate_indexes_agree_whatever_the_row_order(self):
+        now = datetime.utcnow()
+        pains = ["batch API timing out", "API timeout on batches", "API timeouts on batch"]
+        signals = [Signal(id=f"s{i}", source_id=f"src_{i}", actor=f"user{i}", text="x",
+                          timestamp=now - timedelta(hours=1)) for i in range(3)]
+        classifications = [Classification(signal_id=s.id, intent_stage=IntentStage.CHURNING,
+                                          primary_pain=p, urgency=Urgency.LOW, confidence=0.5)
+                           for s, p in zip(signals, pains)]
+        self._fill(signals, classifications)
+        expected = detect_momentum(signals, deepcopy(classifications), pains=PainIndex())
+        self.assertTrue(all(c.momentum_flag for c in expected))
+        self.assertEqual(self.queue.momentum_clusters(pains=PainIndex())["pains"],
+                         {"api timeout batch": 3})
+
+    def test_clusters_are_keyed_like_detect_momentum(self):
+        now = datetime.utcnow()
+        signals = [Signal(id=f"s{i}", source_id=f"src_{i}", actor=actor, text="x",
+                          timestamp=now - timedelta(hours=1))
+                   for i, actor in enumerate(["a", "b", "c"])]
+        pains = ["Export broken", " export broken", "EXPORT BROKEN\n"]
+        classifications = [Classification(signal_id=s.id, intent_stage=IntentStage.CHURNING,
+                                          primary_pain=p, urgency=Urgency.LOW, confidence=0.5)
+                           for s, p in zip(signals, pains)]
+        self._fill(signals, classifications)
+
+        found = self.queue.momentum_clusters()
+        self.assertEqual(found["pains"], {"export broken": 3})
+        self.assertEqual(found["persistent"], {})
+
+    def test_window_only_limits_clustering(self):
+        now = datetime.utcnow()
+        old = now - timedelta(hours=100)
+        signals = [Signal(id=f"s{i}", source_id=f"src_{i}", actor=actor, text="x", timestamp=ts)
+                   for i, (actor, ts) in enumerate([("a", old), ("b", old), ("c", now), ("a", now)])]
+        classifications = [Classification(signal_id=s.id, intent_stage=IntentStage.CHURNING,
+                                          primary_pain="login loop", urgency=Urgency.LOW,
+                                          confidence=0.5) for s in signals]
+        self._fill(signals, classifications)
+
+        found = self.queue.momentum_clusters()
+        self.assertEqual(found["pains"], {})                     # 2 actors in window
+        self.assertEqual(found["persistent"], {("a", "login loop"): 2})
+        self.assertEqual(self.queue.apply_momentum(), 2)         # a's two signals
+        self.assertEqual(self.queue.momentum_clusters(window_hours=200)["pains"],
+                         {"login loop": 3})
+
+    def test_apply_is_idempotent(self):
+        signals, classifications = _history(80)
+        self._fill(signals, classifications)
+        self.assertGreater(self.queue.apply_momentum(), 0)
+        self.assertEqual(self.queue.apply_momentum(), 0)
+
+    def test_queries_use_new_indexes(self):
+        with self.queue.read() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(
+                """EXPLAIN QUERY PLAN
+                   SELECT c.primary_pain, s.actor
+                   FROM signals s JOIN classifications c ON c.signal_id = s.id
+                   WHERE s.timestamp >= ?""", ("x",)))
+        self.assertIn("idx_signals_timestamp", plan)
+        self.assertIn("COVERING INDEX", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
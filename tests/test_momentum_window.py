@@ -0,0 +1,118 @@
+"""Tests for the persistent sliding-window momentum engine."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+from signalry.classify import MockClassifier
+from signalry.connectors.realistic_mock import RealisticMockConnector
+from signalry.models import Signal
+from signalry.momentum import MomentumWindow, detect_momentum
+from signalry.pipeline import Pipeline
+from signalry.queue import ReviewQueue
+
+
+def _bug(sid, actor, hours_ago=1.0):
+    return Signal(id=sid, actor=actor, source_id=f"src_{sid}",
+                  text=f"Need help, export is broken for {actor}",
+                  timestamp=datetime.utcnow() - timedelta(hours=hours_ago))
+
+
+class ListIngestor:
+    def __init__(self, signals):
+        self.signals = signals
+
+    def fetch(self, keywords, since=None):
+        return list(self.signals)
+
+
+class TestMomentumWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(), "mw.db")
+
+    def test_single_batch_matches_detect_momentum(self):
+        now = datetime.utcnow()
+        signals = RealisticMockConnector().fetch(keywords=[])
+        for i, s in enumerate(signals):                 # keep clear of the window edge
+            s.timestamp = now - timedelta(hours=i % 40, minutes=5)
+        classifications = MockClassifier().classify_batch(signals)
+
+        expected = detect_momentum(signals, deepcopy(classifications))
+        window = MomentumWindow(self.db_path)
+        reflag = window.update(signals, classifications)
+
+        self.assertEqual([c.momentum_flag for c in classifications],
+                         [c.momentum_flag for c in expected])
+        self.assertIn(True, [c.momentum_flag for c in classifications])
+        self.assertEqual(reflag, [])
+
+    def test_cluster_across_runs_reflags_earlier_items(self):
+        window = MomentumWindow(self.db_path)
+        first = [_bug("a1", "alice"), _bug("b1", "bob")]
+        first_cls = MockClassifier().classify_batch(first)
+        self.assertEqual(window.update(first, first_cls), [])
+        self.assertFalse(any(c.momentum_flag for c in first_cls))
+
+        window = MomentumWindow(self.db_path)           # next run, new process
+        second = [_bug("c1", "carol"), _bug("d1", "dave")]
+        second_cls = MockClassifier().classify_batch(second)
+        reflag = window.update(second, second_cls)
+
+        self.assertTrue(all(c.momentum_flag for c in second_cls))
+        self.assertEqual(sorted(reflag), ["a1", "b1"])
+        self.assertEqual(window.update([], []), [])     # flagged once only
+
+    def test_actor_persistence_across_runs(self):
+        window = MomentumWindow(self.db_path)
+        window.update([_bug("a1", "alice")], MockClassifier().classify_batch([_bug("a1", "alice")]))
+        again = [_bug("a2", "alice")]
+        cls = MockClassifier().classify_batch(again)
+        self.assertEqual(window.update(again, cls), ["a1"])
+        self.assertTrue(cls[0].momentum_flag)
+
+    def test_window_slides(self):
+        window = MomentumWindow(self.db_path)
+        old = [_bug("a1", "alice", hours_ago=46), _bug("b1", "bob", hours_ago=46)]
+        window.update(old, MockClassifier().classify_batch(old))
+        self.assertEqual(window.stats()["signals"], 2)
+
+        later = datetime.utcnow() + timedelta(hours=4)
+        self.assertEqual(window.slide(now=later), 2)
+        self.assertEqual(window.stats()["signals"], 0)
+        late = [_bug("c1", "carol")]
+        self.assertEqual(window.update(late, MockClassifier().classify_batch(late), now=later), [])
+
+        with sqlite3.connect(self.db_path) as conn:
+            ids = [r[0] for r in conn.execute("SELECT signal_id FROM momentum_window")]
+        self.assertEqual(ids, ["c1"])                   # expired rows deleted
+        self.assertFalse(window.observe(_bug("z", "zed", hours_ago=60),
+                                        MockClassifier().classify(_bug("z", "zed"))))
+
+    def test_pipeline_persists_reflags_and_seeds_from_queue(self):
+        queue = ReviewQueue(db_path=self.db_path)
+        Pipeline(ingestor=ListIngestor([_bug("a1", "alice"), _bug("b1", "bob")]),
+                 classifier=MockClassifier(), queue=queue).run(keywords=[])
+
+        # First run with the window: seeded from the two items already queued
+        pipe = Pipeline(ingestor=ListIngestor([_bug("c1", "carol")]),
+                        classifier=MockClassifier(), queue=queue, persistent_momentum=True)
+        result = pipe.run(keywords=[])
+
+        self.assertEqual(result["counts"]["reflagged"], 2)
+        with sqlite3.connect(self.db_path) as conn:
+            flags = dict(conn.execute("SELECT signal_id, momentum_flag FROM classifications"))
+        self.assertEqual(flags, {"a1": 1, "b1": 1, "c1": 1})
+
+        streamed = Pipeline(ingestor=ListIngestor([_bug("d1", "dave")]),
+                            classifier=MockClassifier(), queue=queue,
+                            persistent_momentum=True).run_stream(keywords=[])
+        self.assertEqual(streamed["counts"]["reflagged"], 0)
+        self.assertTrue(streamed["items"][0]["classification"]["momentum_flag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Tests for SimHash near-duplicate collapse."""
+
+import os
+import tempfile
+import unittest
+
+from signalry.classify import MockClassifier
+from signalry.models import Classification, Signal
+from signalry.momentum import detect_momentum
+from signalry.neardup import (
+    NearDuplicateIndex, collapse_near_duplicates, fan_out, hamming, normalize, simhash,
+    swap_actor,
+)
+
+BASE = "Anyone else seeing API timeouts on the batch endpoint? Been broken all morning."
+VARIANTS = [
+    BASE,
+    "anyone else seeing api timeouts on the batch endpoint?? been broken all morning 😡",
+    "Anyone else seeing API timeouts on the batch endpoint? Been broken all morning @support",
+    "Anyone else seeing API timeouts on the batch endpoint? Been broken all morning https://t.co/x1",
+]
+
+
+class TestSimHash(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Hey @bob, see https://x.co/a — 42 errors!!"), "hey see 0 errors")
+
+    def test_small_edits_are_close(self):
+        h = simhash(BASE)
+        for v in VARIANTS[1:]:
+            self.assertLessEqual(hamming(h, simhash(v)), 6, v)
+
+    def test_unrelated_posts_are_far(self):
+        self.assertGreater(hamming(simhash(BASE), simhash("I need a better analytics tool for my team")), 6)
+
+    def test_index_finds_within_distance(self):
+        index = NearDuplicateIndex(max_distance=3, bands=4)
+        index.add("a", 0)
+        self.assertEqual(index.find(0b111), "a")
+        self.assertIsNone(index.find(0b1111))
+
+
+class TestCollapse(unittest.TestCase):
+
+    def _wave(self):
+        signals = [Signal(actor=f"bot{i}", text=t, source_id=f"s{i}") for i, t in enumerate(VARIANTS)]
+        signals.append(Signal(actor="human", text="Please add SSO support to the dashboard", source_id="s9"))
+        return signals
+
+    def test_groups_wave(self):
+        groups = collapse_near_duplicates(self._wave())
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(groups[0].member_count, 4)
+        self.assertEqual(groups[0].distinct_actors, 4)
+        self.assertEqual(groups[0].representative.source_id, "s0")
+
+    def test_swapped_entity_is_not_a_duplicate(self):
+        pairs = [
+            ("looking for an alternative to Notion", "looking for an alternative to Jira"),
+            ("We need SSO support in the dashboard", "We need SAML support in the dashboard"),
+            ("Is there an alternative to Slack for small teams?",
+             "Is there an alternative to Discord for small teams?"),
+            ("Switching from Asana to Linear next week, Asana pricing is insane",
+             "Switching from Asana to Monday next week, Asana pricing is insane"),
+        ]
+        for a, b in pairs:
+            signals = [Signal(actor="x", text=a, source_id="a"), Signal(actor="y", text=b, source_id="b")]
+            self.assertEqual(len(collapse_near_duplicates(signals)), 2, (a, b))
+
+    def test_short_posts_need_a_closer_hash(self):
+        signals = [Signal(actor="x", text="looking for an alternative to Notion", source_id="a"),
+                   Signal(actor="y", text="Looking for an alternative to Notion!!", source_id="b")]
+        self.assertEqual(len(collapse_near_duplicates(signals)), 1)       # cosmetic edit only
+
+    def test_fan_out_keeps_actors_for_momentum(self):
+        signals = self._wave()
+        groups = collapse_near_duplicates(signals)
+        reps = MockClassifier().classify_batch([g.representative for g in groups])
+        classifications = fan_out(groups, reps, signals)
+
+        self.assertEqual([c.signal_id for c in classifications], [s.id for s in signals])
+        detect_momentum(signals, classifications)
+        self.assertTrue(all(c.momentum_flag for c in classifications[:4]))
+        self.assertFalse(classifications[4].momentum_flag)
+
+    def test_fan_out_names_each_member_in_its_action(self):
+        signals = [Signal(actor="alice", text=VARIANTS[0], source_id="a"),
+                   Signal(actor="bob", text=VARIANTS[1], source_id="b")]
+        groups = collapse_near_duplicates(signals)
+        self.assertEqual(len(groups), 1)
+        reps = [Classification(signal_id=signals[0].id,
+                               recommended_action="Amplify — alice is a potential champion")]
+        alice, bob = fan_out(groups, reps, signals)
+        self.assertEqual(alice.recommended_action, reps[0].recommended_action)
+        self.assertEqual(bob.recommended_action, "Amplify — bob is a potential champion")
+        self.assertEqual(bob.signal_id, signals[1].id)
+
+    def test_swap_actor_only_whole_handles(self):
+        self.assertEqual(swap_actor("Respond to ing with info about pricing", "ing", "bob"),
+                         "Respond to bob with info about pricing")
+        self.assertEqual(swap_actor("Engage @al.b now", "@al.b", "@cy"), "Engage @cy now")
+        self.assertEqual(swap_actor("Engage alice", "", "bob"), "Engage alice")
+
+    def test_pipeline_classifies_representatives_only(self):
+        from signalry.pipeline import Pipeline
+        from signalry.queue import ReviewQueue
+
+        class Counting(MockClassifier):
+            calls = 0
+
+            def classify(self, signal):
+                Counting.calls += 1
+                return super().classify(signal)
+
+        class ListIngestor:
+            def __init__(self, signals):
+                self.signals = signals
+
+            def fetch(self, keywords, since=None):
+                return self.signals
+
+        db_path = os.path.join(tempfile.mkdtemp(), "nd.db")
+        pipe = Pipeline(ingestor=ListIngestor(self._wave()), classifier=Counting(),
+                        queue=ReviewQueue(db_path=db_path))
+        result = pipe.run(keywords=[])
+        self.assertEqual(Counting.calls, 2)
+        self.assertEqual(result["counts"]["classified"], 5)
+        self.assertEqual(result["counts"]["near_duplicates"], 3)
+        self.assertEqual(result["near_duplicate_groups"][0]["member_count"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Tests for canonical pain keys (PainIndex) and their use in momentum."""
+
+import itertools
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from signalry.classify import PAIN_KEYWORDS
+from signalry.models import Classification, Signal
+from signalry.momentum import MomentumWindow, detect_momentum, get_momentum_summary
+from signalry.pains import PainIndex, normalize
+
+
+def _pair(actor, pain, hours_ago=1.0):
+    sig = Signal(actor=actor, text=f"about {pain}",
+                 timestamp=datetime.utcnow() - timedelta(hours=hours_ago))
+    return sig, Classification(signal_id=sig.id, primary_pain=pain)
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_tokens(self):
+        self.assertEqual(normalize("  API timeouts on the Batch! "), "api timeout batch")
+        self.assertEqual(normalize("reliability/bugs"), "reliability bug")
+        self.assertEqual(normalize("access"), "access")          # "ss" is not a plural
+        self.assertEqual(normalize("export not working"), "export not working")
+
+    def test_plurals(self):
+        self.assertEqual(normalize("API timeouts on batches"), "api timeout batch")
+        self.assertEqual(normalize("duplicate entries, crashes, boxes"), "duplicate entry crash box")
+        self.assertEqual(normalize("status of issues"), "status issue")
+
+    def test_no_words_falls_back(self):
+        self.assertEqual(normalize(" ?! "), "?!")
+
+
+class TestPainIndex(unittest.TestCase):
+
+    def test_rephrasings_share_a_key(self):
+        pains = PainIndex()
+        key = pains.key("API timeouts on batch")
+        for raw in ("batch API timing out", "Batch API timeouts", "api timeouts on batch "):
+            self.assertEqual(pains.key(raw), key, raw)
+        self.assertEqual(pains.label(key), "API timeouts on batch")
+
+    def test_different_pains_stay_apart(self):
+        pains = PainIndex()
+        raws = ["login timeouts", "login broken", "slow sync", "slow search", "pricing too high"]
+        self.assertEqual(len(set(pains.keys(raws).values())), len(raws))
+
+    def test_one_token_apart_stays_apart(self):
+        pairs = [("export to PDF broken", "export csv broken"),
+                 ("export not working", "export working"),
+                 ("no SSO support", "SSO support"),
+                 ("login fails on iOS", "login fails on web")]
+        for a, b in pairs:
+            pains = PainIndex()
+            self.assertNotEqual(pains.key(a), pains.key(b), (a, b))
+
+    def test_mock_vocabulary_is_not_merged(self):
+        names = [pain for pain, _ in PAIN_KEYWORDS] + ["general feedback"]
+        self.assertEqual(len(set(PainIndex().keys(names).values())), len(names))
+
+    def test_key_does_not_depend_on_arrival_order(self):
+        raws = ["API timeout on batches", "batch API timing out", "API timeouts on batch",
+                "slow sync", "Slow syncs"]
+        seen = set()
+        for order in itertools.permutations(raws):
+            pains = PainIndex()
+            for raw in order:
+                pains.key(raw)
+            keys = {raw: pains.key(raw) for raw in raws}      # after all have arrived
+            self.assertEqual(keys, PainIndex().keys(order))
+            seen.add(tuple(sorted(keys.items())))
+        self.assertEqual(len(seen), 1)
+        keys = dict(next(iter(seen)))
+        self.assertEqual(set(keys.values()), {"api timeout batch", "slow sync"})
+
+    def test_smaller_spelling_rekeys_and_persists(self):
+        db = os.path.join(tempfile.mkdtemp(), "q.db")
+        pains = PainIndex(db)
+        self.assertEqual(pains.key("batch API timing out"), "batch api timing out")
+        self.assertEqual(pains.key("API timeouts on batch"), "api timeout batch")
+        self.assertEqual(pains.key("batch API timing out"), "api timeout batch")
+        self.assertEqual(pains.stats()["rekeyed"], 1)
+        self.assertEqual(PainIndex(db).key("batch API timing out"), "api timeout batch")
+
+    def test_threshold(self):
+        strict = PainIndex(threshold=1.0)
+        self.assertNotEqual(strict.key("API timeouts on batch"), strict.key("batch API timing out"))
+        with self.assertRaises(ValueError):
+            PainIndex(threshold=0)
+
+    def test_mapping_persists(self):
+        db = os.path.join(tempfile.mkdtemp(), "q.db")
+        first = PainIndex(db)
+        key = first.key("export broken")
+        self.assertEqual(first.key("Export is broken"), key)
+
+        again = PainIndex(db)
+        self.assertEqual(again.key("Export is broken"), key)
+        self.assertEqual(again.stats()["hits"], 1)              # resolved from the alias table
+        self.assertEqual(again.stats()["misses"], 0)
+        self.assertEqual(again.label(key), "export broken")
+
+
+class TestCanonicalMomentum(unittest.TestCase):
+
+    PHRASINGS = ["API timeouts on batch", "batch API timing out", "Batch API timeouts"]
+
+    def test_rephrased_pains_cluster(self):
+        pairs = [_pair(f"user{i}", pain) for i, pain in enumerate(self.PHRASINGS)]
+        signals = [s for s, _ in pairs]
+        pains = PainIndex()
+        classifications = detect_momentum(signals, [c for _, c in pairs], pains=pains)
+        self.assertTrue(all(c.momentum_flag for c in classifications))
+
+        summary = get_momentum_summary(classifications, signals, pains=pains)
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0]["pain"], "API timeouts on batch")
+        self.assertEqual(summary[0]["pain_key"], "api timeout batch")
+        self.assertEqual(summary[0]["unique_actors"], 3)
+
+    def test_without_index_keys_are_exact(self):
+        pairs = [_pair(f"user{i}", pain) for i, pain in enumerate(self.PHRASINGS)]
+        classifications = detect_momentum([s for s, _ in pairs], [c for _, c in pairs])
+        self.assertFalse(any(c.momentum_flag for c in classifications))
+
+        pairs = [_pair("a", "Export broken"), _pair("b", "export broken "), _pair("c", "export broken")]
+        signals = [s for s, _ in pairs]
+        classifications = detect_momentum(signals, [c for _, c in pairs])
+        self.assertTrue(all(c.momentum_flag for c in classifications))
+        summary = get_momentum_summary(classifications, signals)
+        self.assertEqual([(c["pain"], c["pain_key"], c["unique_actors"]) for c in summary],
+                         [("Export broken", "export broken", 3)])
+
+    def test_window_clusters_rephrasings_across_runs(self):
+        db = os.path.join(tempfile.mkdtemp(), "q.db")
+        first = [_pair("alice", self.PHRASINGS[0]), _pair("bob", self.PHRASINGS[1])]
+        MomentumWindow(db).update([s for s, _ in first], [c for _, c in first])
+
+        sig, cls = _pair("carol", self.PHRASINGS[2])
+        reflag = MomentumWindow(db).update([sig], [cls])
+        self.assertTrue(cls.momentum_flag)
+        self.assertEqual(sorted(reflag), sorted(s.id for s, _ in first))
+
+
+if __name__ == "__main__":
+    unittest.main()
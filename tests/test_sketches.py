@@ -0,0 +1,229 @@
+"""Tests for HyperLogLog / count-min sketches and the sketch momentum backend."""
+
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+from signalry.models import Classification, Signal
+from signalry.momentum import MomentumSketches, detect_momentum
+from signalry.pipeline import Pipeline
+from signalry.queue import ReviewQueue
+from signalry.sketches import CountMinSketch, HyperLogLog
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_small_counts_are_exact(self):
+        hll = HyperLogLog()
+        self.assertEqual(len(hll), 0)
+        for n, actor in enumerate(["alice", "bob", "carol"], start=1):
+            hll.add(actor)
+            hll.add(actor)                              # repeats don't count
+            self.assertEqual(len(hll), n)
+
+    def test_error_within_bound(self):
+        for n in (2_000, 20_000):
+            hll = HyperLogLog()
+            hll.update(f"user{i}" for i in range(n))
+            self.assertLess(abs(hll.count() / n - 1), 3 * hll.relative_error, n)
+
+    def test_sparse_then_dense_memory_bounded(self):
+        hll = HyperLogLog(precision=10)
+        hll.update(["a", "b", "c"])
+        self.assertEqual(hll.memory_bytes, 12)
+        hll.update(f"u{i}" for i in range(5_000))
+        self.assertEqual(hll.memory_bytes, 1024)
+
+    def test_merge_is_union(self):
+        a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        for i in range(3_000):
+            a.add(f"x{i}")
+            union.add(f"x{i}")
+        for i in range(1_500, 6_000):
+            b.add(f"x{i}")
+            union.add(f"x{i}")
+        self.assertEqual(a.copy().merge(b).registers(), union.registers())
+        self.assertEqual(b.copy().merge(a).registers(), union.registers())
+        with self.assertRaises(ValueError):
+            a.merge(HyperLogLog(precision=10))
+
+    def test_bytes_roundtrip(self):
+        for n in (5, 5_000):
+            hll = HyperLogLog()
+            hll.update(f"u{i}" for i in range(n))
+            again = HyperLogLog.from_bytes(hll.to_bytes())
+            self.assertEqual(again.registers(), hll.registers())
+            self.assertEqual(again.count(), hll.count())
+        with self.assertRaises(ValueError):
+            HyperLogLog.from_bytes(b"nope!\x0c\x00")
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def test_never_underestimates_and_within_bound(self):
+        rng = random.Random(1)
+        cms = CountMinSketch(width=512, depth=4)
+        truth = {}
+        for _ in range(20_000):
+            key = f"k{int(rng.paretovariate(1.1))}"
+            truth[key] = truth.get(key, 0) + 1
+            cms.add(key)
+        over = [cms.estimate(k) - n for k, n in truth.items()]
+        self.assertGreaterEqual(min(over), 0)
+        self.assertLessEqual(max(over), cms.error_bound())
+
+    def test_merge_adds_streams(self):
+        a, b = CountMinSketch(), CountMinSketch()
+        a.add("alice|bug", 2)
+        b.add("alice|bug", 3)
+        b.add("bob|bug")
+        a.merge(b)
+        self.assertEqual(a.estimate("alice|bug"), 5)
+        self.assertEqual(a.estimate("bob|bug"), 1)
+        self.assertEqual(a.total, 6)
+        with self.assertRaises(ValueError):
+            a.merge(CountMinSketch(width=10))
+
+    def test_from_error_and_roundtrip(self):
+        cms = CountMinSketch.from_error(epsilon=0.01, delta=0.01)
+        self.assertEqual((cms.width, cms.depth), (272, 5))
+        cms.add("x", 7)
+        again = CountMinSketch.from_bytes(cms.to_bytes())
+        self.assertEqual((again.estimate("x"), again.total), (7, 7))
+
+
+def _batch(pairs, hours_ago=1.0):
+    now = datetime.utcnow()
+    signals, classifications = [], []
+    for actor, pain in pairs:
+        sig = Signal(actor=actor, text=pain, timestamp=now - timedelta(hours=hours_ago))
+        signals.append(sig)
+        classifications.append(Classification(signal_id=sig.id, primary_pain=pain))
+    return signals, classifications
+
+
+class TestMomentumSketches(unittest.TestCase):
+
+    def test_matches_exact_detect_momentum(self):
+        rng = random.Random(5)
+        pairs = [(f"user{rng.randrange(30)}", f"pain {rng.randrange(12)}") for _ in range(80)]
+        signals, classifications = _batch(pairs)
+        expected = detect_momentum(signals, deepcopy(classifications))
+        detect_momentum(signals, classifications, sketches=MomentumSketches())
+        self.assertEqual([c.momentum_flag for c in classifications],
+                         [c.momentum_flag for c in expected])
+
+    def test_window_and_persistence(self):
+        sketches = MomentumSketches()
+        old_signals, old_cls = _batch([("a", "sync"), ("b", "sync")], hours_ago=100)
+        detect_momentum(old_signals, old_cls, sketches=sketches)
+        signals, cls = _batch([("c", "sync"), ("a", "sync")])
+        detect_momentum(signals, cls, sketches=sketches)
+        # 2 actors inside 48h — no cluster; "a" raised sync twice overall
+        self.assertEqual(sketches.distinct_actors("sync", since=datetime.utcnow() - timedelta(hours=48)), 2)
+        self.assertEqual(sketches.distinct_actors("sync"), 3)
+        self.assertEqual([c.momentum_flag for c in cls], [False, True])
+
+    def test_merge_across_workers(self):
+        one, two = MomentumSketches(), MomentumSketches()
+        detect_momentum(*_batch([("a", "export"), ("b", "export")]), sketches=one)
+        detect_momentum(*_batch([("c", "export"), ("a", "export")]), sketches=two)
+        one.merge(two)
+        self.assertEqual(one.distinct_actors("export"), 3)
+        self.assertEqual(one.repeat_count("a", "export"), 2)
+
+    def test_persist_and_prune(self):
+        db = os.path.join(tempfile.mkdtemp(), "q.db")
+        sketches = MomentumSketches(db)
+        detect_momentum(*_batch([("a", "login"), ("b", "login")], hours_ago=100), sketches=sketches)
+        detect_momentum(*_batch([("c", "login")]), sketches=sketches)
+        sketches.save()
+
+        again = MomentumSketches(db)
+        self.assertEqual(again.distinct_actors("login"), 3)
+        self.assertEqual(again.prune(datetime.utcnow() - timedelta(hours=49)), 2)   # hour + its day
+        again.save()
+        self.assertEqual(MomentumSketches(db).distinct_actors("login"), 1)
+        self.assertEqual(MomentumSketches(db).stats()["cms_days"], 1)
+        with self.assertRaises(ValueError):
+            MomentumSketches(db, precision=10)
+
+    def test_count_min_rotates_by_day(self):
+        sketches = MomentumSketches(cms_width=64)
+        detect_momentum(*_batch([("a", "sync")], hours_ago=100), sketches=sketches)
+        detect_momentum(*_batch([("a", "sync")]), sketches=sketches)
+        self.assertEqual(sketches.repeat_count("a", "sync"), 2)
+        self.assertEqual(sketches.stats()["cms_days"], 2)
+
+        sketches.prune(datetime.utcnow() - timedelta(hours=49))
+        self.assertEqual(sketches.repeat_count("a", "sync"), 1)        # the old one aged out
+        self.assertEqual(sketches.stats()["cms_total"], 1)
+        self.assertNotIn("cms_warning", sketches.stats())
+
+        detect_momentum(*_batch([(f"u{i}", "sync") for i in range(40)]), sketches=sketches)
+        self.assertIn("cms_warning", sketches.stats())                  # 41 > 64 / 2
+
+    def test_legacy_whole_history_count_min_is_migrated(self):
+        db = os.path.join(tempfile.mkdtemp(), "q.db")
+        MomentumSketches(db)                                            # create tables
+        legacy = CountMinSketch()
+        legacy.add("a\x1fsync")
+        with sqlite3.connect(db) as conn:
+            conn.execute("INSERT INTO momentum_cms (name, sketch) VALUES ('actor_pain', ?)",
+                         (legacy.to_bytes(),))
+        sketches = MomentumSketches(db)
+        self.assertEqual(sketches.repeat_count("a", "sync"), 1)
+        sketches.save()
+        with sqlite3.connect(db) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM momentum_cms").fetchone()[0], 0)
+        self.assertEqual(MomentumSketches(db).repeat_count("a", "sync"), 1)
+
+    def test_pipeline_sketch_backend_spans_runs(self):
+        tmp = tempfile.mkdtemp()
+
+        class ListIngestor:
+            def __init__(self, signals):
+                self.signals = signals
+
+            def fetch(self, keywords, since=None):
+                return list(self.signals)
+
+        def run(actors):
+            signals = [Signal(actor=a, source_id=f"src_{a}",
+                              text=f"Need help, export is broken again for {a}",
+                              timestamp=datetime.utcnow() - timedelta(hours=1)) for a in actors]
+            pipe = Pipeline(ingestor=ListIngestor(signals), queue=ReviewQueue(os.path.join(tmp, "q.db")),
+                            momentum_sketch=True)
+            return pipe.run(keywords=[])
+
+        self.assertEqual(run(["alice", "bob"])["momentum"], [])
+        self.assertEqual(run(["carol"])["momentum"][0]["unique_actors"], 1)   # carol, flagged
+        with self.assertRaises(ValueError):
+            Pipeline(persistent_momentum=True, momentum_sketch=True)
+
+    def test_reingested_posts_are_not_counted_again(self):
+        tmp = tempfile.mkdtemp()
+
+        class ListIngestor:
+            def fetch(self, keywords, since=None):
+                return [Signal(actor="alice", source_id="src_1",
+                               text="Need help, export is broken again",
+                               timestamp=datetime.utcnow() - timedelta(hours=1))]
+
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                queue = ReviewQueue(os.path.join(tmp, f"q{stream}.db"))
+                pipe = Pipeline(ingestor=ListIngestor(), queue=queue, precheck=False,
+                                momentum_sketch=True)
+                for _ in range(3):                      # same post, fresh Signal ids
+                    result = pipe.run_stream(keywords=[]) if stream else pipe.run(keywords=[])
+                self.assertEqual(pipe.momentum_sketches.stats()["cms_total"], 1)
+                self.assertEqual(result["momentum"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Tests for the streaming stage runner and Pipeline.run_stream()."""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from signalry.classify import MockClassifier
+from signalry.connectors.realistic_mock import RealisticMockConnector
+from signalry.ingest import MockIngestor
+from signalry.models import Signal
+from signalry.pipeline import Pipeline
+from signalry.queue import ReviewQueue
+from signalry.streaming import run_stages
+
+DATA_PATH = Path(__file__).parent.parent / "data" / "mock_posts.json"
+
+
+class ListIngestor:
+    """The same fetched signals for every run (the realistic connector stamps times)."""
+
+    def __init__(self, signals):
+        self.signals = signals
+
+    def fetch(self, keywords, since=None):
+        return list(self.signals)
+
+
+class TestRunStages(unittest.TestCase):
+
+    def test_order_and_micro_batches(self):
+        sizes = []
+
+        def double(inbox):
+            return (x * 2 for x in inbox)
+
+        def batched(inbox):
+            for batch in inbox.batches(7):
+                sizes.append(len(batch))
+                yield from batch
+
+        out = []
+        run_stages(range(100), [("double", double), ("batch", batched)], out.append, maxsize=4)
+        self.assertEqual(out, [x * 2 for x in range(100)])
+        self.assertEqual(sum(sizes), 100)
+        self.assertLessEqual(max(sizes), 7)
+
+    def test_bounded_queues_apply_back_pressure(self):
+        produced = []
+        consumed = []
+        lead = []
+
+        def source():
+            for i in range(200):
+                produced.append(i)
+                lead.append(len(produced) - len(consumed))
+                yield i
+
+        def slow_sink(item):
+            time.sleep(0.0005)
+            consumed.append(item)
+
+        run_stages(source(), [("pass", lambda inbox: inbox)], slow_sink, maxsize=5)
+        self.assertEqual(len(consumed), 200)
+        self.assertLessEqual(max(lead), 2 * 5 + 3)      # two queues + one item per thread
+
+    def test_stage_error_stops_everything(self):
+        def boom(inbox):
+            for x in inbox:
+                if x == 50:
+                    raise ValueError("bad item")
+                yield x
+
+        def endless():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        with self.assertRaises(ValueError):
+            run_stages(endless(), [("boom", boom)], lambda item: None, maxsize=4)
+
+    def test_sink_error_is_raised(self):
+        def sink(item):
+            if item == 3:
+                raise RuntimeError("disk full")
+
+        with self.assertRaises(RuntimeError):
+            run_stages(range(1000), [("pass", lambda inbox: inbox)], sink, maxsize=2)
+
+
+class TestRunStream(unittest.TestCase):
+
+    def _pipeline(self, classifier=None, ingestor=None):
+        db_path = os.path.join(tempfile.mkdtemp(), "stream.db")
+        return Pipeline(ingestor=ingestor or MockIngestor(str(DATA_PATH)),
+                        classifier=classifier or MockClassifier(),
+                        queue=ReviewQueue(db_path=db_path))
+
+    def _persisted_flags(self, pipe):
+        with sqlite3.connect(str(pipe.queue.db_path)) as conn:
+            return dict(conn.execute("SELECT signal_id, momentum_flag FROM classifications"))
+
+    def test_same_output_as_staged_run(self):
+        flagged = 0
+        for source in (MockIngestor(str(DATA_PATH)), RealisticMockConnector()):
+            ingestor = ListIngestor(source.fetch(keywords=["need", "bug"]))
+            staged = self._pipeline(ingestor=ingestor)
+            streamed = self._pipeline(ingestor=ingestor)
+            a = staged.run(keywords=["need", "bug"])
+            b = streamed.run_stream(keywords=["need", "bug"], batch_size=3)
+
+            self.assertEqual(a["counts"], b["counts"])
+            self.assertEqual(a["items"], b["items"])
+            self.assertEqual(a["momentum"], b["momentum"])
+            self.assertEqual(a["near_duplicate_groups"], b["near_duplicate_groups"])
+            self.assertEqual(self._persisted_flags(staged), self._persisted_flags(streamed))
+            flagged += sum(self._persisted_flags(streamed).values())
+        self.assertGreater(flagged, 0)                  # the bulk update did flag something
+
+    def test_near_duplicate_members_get_their_own_actor(self):
+        class Naming(MockClassifier):
+            def classify(self, signal):
+                cls = super().classify(signal)
+                cls.recommended_action = f"Amplify — {signal.actor} is a potential champion"
+                return cls
+
+        text = "Need a tool that does {} — our export bug keeps breaking every report"
+        signals = [Signal(actor=actor, text=text.format(w), source_id=f"s{i}")
+                   for i, (actor, w) in enumerate([("alice", "this"), ("bob", "that")])]
+        pipe = self._pipeline(classifier=Naming(), ingestor=ListIngestor(signals))
+        result = pipe.run_stream(keywords=["need", "bug"], batch_size=1)
+
+        self.assertEqual(len(result["near_duplicate_groups"]), 1)
+        actions = {item.signal.actor: item.classification.recommended_action
+                   for item in pipe.queue.list_all()}
+        self.assertEqual(actions, {"alice": "Amplify — alice is a potential champion",
+                                   "bob": "Amplify — bob is a potential champion"})
+
+    def test_items_reviewable_before_run_ends(self):
+        seen_mid_run = []
+
+        class Slow(MockClassifier):
+            def __init__(self, queue_ref):
+                self.queue_ref = queue_ref
+                self.calls = 0
+
+            def classify_batch(self, signals):
+                self.calls += 1
+                if self.calls == 2:                 # wait for the first batch to land
+                    deadline = time.monotonic() + 5
+                    while self.queue_ref[0].count_signals() == 0 and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                    seen_mid_run.append(self.queue_ref[0].count_signals())
+                return super().classify_batch(signals)
+
+        queue_ref = []
+        pipe = self._pipeline(classifier=Slow(queue_ref))
+        queue_ref.append(pipe.queue)
+        result = pipe.run_stream(keywords=["need", "bug"], batch_size=1)
+
+        self.assertGreater(seen_mid_run[0], 0)
+        timing = result["timing"]
+        self.assertEqual(timing["mode"], "stream")
+        self.assertLessEqual(timing["time_to_first_item_s"], timing["end_to_end_s"])
+
+    def test_classifier_error_propagates(self):
+        class Broken(MockClassifier):
+            def classify_batch(self, signals):
+                raise RuntimeError("LLM down")
+
+        with self.assertRaises(RuntimeError):
+            self._pipeline(classifier=Broken()).run_stream(keywords=["need"])
+        time.sleep(0.3)
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("signalry-stage-")])
+
+
+if __name__ == "__main__":
+    unittest.main()